@@ -0,0 +1,93 @@
+"""
+Async runtime helpers for Luna.
+
+Some of Luna's dependencies (DuckDuckGo search, Tavily, PyPDF2) only offer blocking
+APIs. `run_blocking` pushes those calls onto a bounded thread pool so async code
+paths never stall the event loop while they wait.
+
+The other direction - sync code driving async code - goes through a single
+background event loop (`run_sync`, `iterate_sync`).
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+BLOCKING_WORKERS = int(os.getenv('LUNA_BLOCKING_WORKERS', '32'))
+
+_blocking_executor = ThreadPoolExecutor(
+    max_workers=BLOCKING_WORKERS,
+    thread_name_prefix='luna-blocking'
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking callable on the shared thread pool and await its result.
+    The callable sees the caller's context variables.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _blocking_executor,
+        functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+# ============================================================================
+# BACKGROUND EVENT LOOP (sync -> async bridge)
+# ============================================================================
+# Sync callers (WSGI views, management commands) drive Luna's async pipeline on
+# one long-lived loop per process. Keeping a single loop means pooled async
+# clients are reused across requests instead of being rebuilt per call.
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get (starting on first use) the process-wide background event loop"""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever,
+                name='luna-event-loop',
+                daemon=True
+            ).start()
+    return _background_loop
+
+
+def run_sync(coro, timeout: float = None):
+    """Run a coroutine on the background loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop()).result(timeout)
+
+
+async def _anext(agen):
+    return await agen.__anext__()
+
+
+async def _aclose(agen):
+    await agen.aclose()
+
+
+def iterate_sync(agen):
+    """
+    Drive an async generator from sync code, one item at a time.
+    
+    Closing the returned generator (e.g. WSGI closing a StreamingHttpResponse)
+    closes the async generator too, so its cleanup runs on the loop.
+    """
+    try:
+        while True:
+            try:
+                yield run_sync(_anext(agen))
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(_aclose(agen))
@@ -0,0 +1,80 @@
+"""
+Per-request budget for Luna's ReAct loop.
+
+A fixed iteration cap lets a confused run make ten gpt-4o calls and dozens
+of tool calls before giving up. Each turn instead gets a budget - wall-clock
+deadline, prompt and completion tokens, tool calls and iterations - tracked
+in the graph state. When any part is nearly spent the agent stops
+researching and answers with what it has.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class AgentBudget:
+    """Limits for one agent turn"""
+    deadline_seconds: float = float(os.getenv('LUNA_AGENT_DEADLINE', '45'))
+    max_prompt_tokens: int = int(os.getenv('LUNA_AGENT_MAX_PROMPT_TOKENS', '60000'))
+    max_completion_tokens: int = int(os.getenv('LUNA_AGENT_MAX_COMPLETION_TOKENS', '4000'))
+    max_tool_calls: int = int(os.getenv('LUNA_AGENT_MAX_TOOL_CALLS', '12'))
+    max_iterations: int = 10
+
+    # Seconds kept back for the final answer call
+    answer_reserve_seconds: float = float(os.getenv('LUNA_AGENT_ANSWER_RESERVE', '8'))
+
+    # Share of a token budget after which the agent answers now
+    low_fraction: float = 0.8
+
+    def start_state(self) -> Dict[str, Any]:
+        """Budget fields for the graph input of a new turn"""
+        return {
+            "iteration_count": 0,
+            "started_at": time.time(),
+            "deadline": time.time() + self.deadline_seconds,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "tool_calls": 0,
+            "budget_reason": ""
+        }
+
+    def low_reason(self, state: Dict[str, Any], pending_tool_calls: int = 0) -> Optional[str]:
+        """
+        Why the budget is nearly spent, or None if there is room to keep researching.
+
+        Args:
+            state: Graph state with the budget fields
+            pending_tool_calls: Tool calls requested but not yet run
+        """
+        deadline = state.get("deadline")
+        if deadline and deadline - time.time() < self.answer_reserve_seconds:
+            return "deadline"
+        if state.get("iteration_count", 0) >= self.max_iterations - 1:
+            return "iterations"
+        if state.get("tool_calls", 0) + pending_tool_calls > self.max_tool_calls:
+            return "tool calls"
+        if state.get("prompt_tokens", 0) >= self.low_fraction * self.max_prompt_tokens:
+            return "prompt tokens"
+        if state.get("completion_tokens", 0) >= self.low_fraction * self.max_completion_tokens:
+            return "completion tokens"
+        return None
+
+    def usage(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Budget use of a finished turn, for the response metadata"""
+        started_at = state.get("started_at")
+        return {
+            "elapsed_ms": int((time.time() - started_at) * 1000) if started_at else None,
+            "deadline_ms": int(self.deadline_seconds * 1000),
+            "iterations": state.get("iteration_count", 0),
+            "max_iterations": self.max_iterations,
+            "tool_calls": state.get("tool_calls", 0),
+            "max_tool_calls": self.max_tool_calls,
+            "prompt_tokens": state.get("prompt_tokens", 0),
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "completion_tokens": state.get("completion_tokens", 0),
+            "max_completion_tokens": self.max_completion_tokens,
+            "stopped_early": state.get("budget_reason") or None
+        }
@@ -0,0 +1,340 @@
+"""
+Per-session LangGraph checkpointer for Luna.
+
+Without a checkpointer every chat turn reloads the conversation from the
+database, rebuilds HumanMessage/AIMessage objects and loses the tool results
+of earlier turns. SessionCheckpointer keeps the latest graph state of each
+session (thread_id = session_id):
+
+- in-process: an LRU of the most recent sessions, served without deserializing
+- durable: the AgentCheckpoint table in the app database
+
+Checkpoints are written through to the table. A cached entry is only served
+after a cheap checkpoint_id check against the table, so several workers stay
+consistent. Only the latest checkpoint per session is kept - Luna resumes
+conversations, it doesn't time-travel through them.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, AsyncIterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+)
+
+
+# Sessions whose state is kept in memory
+CHECKPOINT_CACHE_SESSIONS = int(os.getenv('LUNA_CHECKPOINT_CACHE_SESSIONS', '1000'))
+
+# 'db' persists checkpoints in the AgentCheckpoint table, 'memory' keeps them in-process only
+CHECKPOINT_STORE = os.getenv('LUNA_CHECKPOINT_STORE', 'db')
+
+
+class _Entry:
+    """Latest checkpoint of one (session, namespace) plus its pending writes"""
+
+    def __init__(self, checkpoint_tuple: CheckpointTuple):
+        self.tuple = checkpoint_tuple
+        self.writes = []
+
+    @property
+    def checkpoint_id(self) -> str:
+        return self.tuple.checkpoint['id']
+
+
+class SessionCheckpointer(BaseCheckpointSaver):
+    """LRU of each session's latest graph state, backed by the AgentCheckpoint table"""
+
+    def __init__(self, max_sessions: int = CHECKPOINT_CACHE_SESSIONS, durable: bool = True):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.durable = durable
+        self._cache: 'OrderedDict[Tuple[str, str], _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Cache helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> Tuple[str, str]:
+        configurable = config['configurable']
+        return configurable['thread_id'], configurable.get('checkpoint_ns', '')
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _remember(self, key: Tuple[str, str], entry: _Entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_sessions:
+                self._cache.popitem(last=False)
+
+    def _evict(self, key: Tuple[str, str]):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def _to_tuple(self, entry: _Entry, checkpoint_id: Optional[str]) -> Optional[CheckpointTuple]:
+        """A copy of the cached checkpoint (the graph mutates what it's given)"""
+        if checkpoint_id is not None and checkpoint_id != entry.checkpoint_id:
+            return None
+        cached = entry.tuple
+        return CheckpointTuple(
+            config=cached.config,
+            checkpoint=copy_checkpoint(cached.checkpoint),
+            metadata=cached.metadata,
+            parent_config=cached.parent_config,
+            pending_writes=list(entry.writes)
+        )
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+
+    def _entry_from_row(self, row) -> _Entry:
+        thread_id, checkpoint_ns = row.session_id, row.checkpoint_ns
+        checkpoint = self.serde.loads_typed((row.checkpoint_type, bytes(row.checkpoint)))
+        metadata = self.serde.loads_typed((row.metadata_type, bytes(row.checkpoint_metadata)))
+        parent_config = None
+        if row.parent_checkpoint_id:
+            parent_config = _config(thread_id, checkpoint_ns, row.parent_checkpoint_id)
+        return _Entry(CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, row.checkpoint_id),
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config=parent_config
+        ))
+
+    def _row_values(self, entry: _Entry) -> Dict[str, Any]:
+        checkpoint_type, checkpoint = self.serde.dumps_typed(entry.tuple.checkpoint)
+        metadata_type, metadata = self.serde.dumps_typed(entry.tuple.metadata)
+        parent = entry.tuple.parent_config
+        return {
+            'checkpoint_id': entry.checkpoint_id,
+            'parent_checkpoint_id': parent['configurable']['checkpoint_id'] if parent else None,
+            'checkpoint_type': checkpoint_type,
+            'checkpoint': checkpoint,
+            'metadata_type': metadata_type,
+            'checkpoint_metadata': metadata
+        }
+
+    def _new_entry(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata
+    ) -> Tuple[_Entry, RunnableConfig]:
+        thread_id, checkpoint_ns = self._key(config)
+        parent_id = config['configurable'].get('checkpoint_id')
+        new_config = _config(thread_id, checkpoint_ns, checkpoint['id'])
+        entry = _Entry(CheckpointTuple(
+            config=new_config,
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None
+        ))
+        return entry, new_config
+
+    # ------------------------------------------------------------------
+    # Sync API
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        key = self._key(config)
+        entry = self._cached(key)
+
+        if self.durable:
+            from agent.models import AgentCheckpoint
+            rows = AgentCheckpoint.objects.filter(session_id=key[0], checkpoint_ns=key[1])
+            latest_id = rows.values_list('checkpoint_id', flat=True).first()
+            if latest_id is None:
+                self._evict(key)
+                return None
+            if entry is None or entry.checkpoint_id != latest_id:
+                # Not cached here, or another worker moved the session on
+                self.misses += 1
+                entry = self._entry_from_row(rows.first())
+                self._remember(key, entry)
+            else:
+                self.hits += 1
+
+        return self._to_tuple(entry, get_checkpoint_id(config)) if entry is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        # Only the latest checkpoint per session is kept
+        if config is not None:
+            checkpoint_tuple = self.get_tuple(config)
+            if checkpoint_tuple is not None:
+                yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        entry, new_config = self._new_entry(config, checkpoint, metadata)
+        key = self._key(config)
+        if self.durable:
+            from agent.models import AgentCheckpoint
+            AgentCheckpoint.objects.update_or_create(
+                session_id=key[0], checkpoint_ns=key[1], defaults=self._row_values(entry)
+            )
+        self._remember(key, entry)
+        return new_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ''
+    ) -> None:
+        # Pending writes only matter within a run, so they stay in memory
+        entry = self._cached(self._key(config))
+        if entry is not None and entry.checkpoint_id == config['configurable'].get('checkpoint_id'):
+            entry.writes.extend((task_id, channel, value) for channel, value in writes)
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        key = self._key(config)
+        entry = self._cached(key)
+
+        if self.durable:
+            from agent.models import AgentCheckpoint
+            rows = AgentCheckpoint.objects.filter(session_id=key[0], checkpoint_ns=key[1])
+            latest_id = await rows.values_list('checkpoint_id', flat=True).afirst()
+            if latest_id is None:
+                self._evict(key)
+                return None
+            if entry is None or entry.checkpoint_id != latest_id:
+                self.misses += 1
+                entry = self._entry_from_row(await rows.afirst())
+                self._remember(key, entry)
+            else:
+                self.hits += 1
+
+        return self._to_tuple(entry, get_checkpoint_id(config)) if entry is not None else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is not None:
+            checkpoint_tuple = await self.aget_tuple(config)
+            if checkpoint_tuple is not None:
+                yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        entry, new_config = self._new_entry(config, checkpoint, metadata)
+        key = self._key(config)
+        if self.durable:
+            from agent.models import AgentCheckpoint
+            await AgentCheckpoint.objects.aupdate_or_create(
+                session_id=key[0], checkpoint_ns=key[1], defaults=self._row_values(entry)
+            )
+        self._remember(key, entry)
+        return new_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ''
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def forget(self, session_id: str = None):
+        """Drop the saved state of one session (or of every session)"""
+        self._forget_cached(session_id)
+        if self.durable:
+            self._checkpoint_rows(session_id).delete()
+
+    async def aforget(self, session_id: str = None):
+        """Async version of forget"""
+        self._forget_cached(session_id)
+        if self.durable:
+            await self._checkpoint_rows(session_id).adelete()
+
+    def _forget_cached(self, session_id: Optional[str]):
+        with self._lock:
+            for key in [key for key in self._cache if session_id is None or key[0] == session_id]:
+                del self._cache[key]
+
+    @staticmethod
+    def _checkpoint_rows(session_id: Optional[str]):
+        from agent.models import AgentCheckpoint
+        rows = AgentCheckpoint.objects.all()
+        if session_id is not None:
+            rows = rows.filter(session_id=session_id)
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        return {'sessions_cached': len(self._cache), 'hits': self.hits, 'misses': self.misses}
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {'configurable': {
+        'thread_id': thread_id,
+        'checkpoint_ns': checkpoint_ns,
+        'checkpoint_id': checkpoint_id
+    }}
+
+
+def session_config(session_id: str) -> RunnableConfig:
+    """Graph config that reads and writes the given session's checkpoint"""
+    return {'configurable': {'thread_id': session_id}}
+
+
+# Singleton instance
+_checkpointer = None
+
+
+def get_checkpointer() -> SessionCheckpointer:
+    """Get singleton instance of the session checkpointer"""
+    global _checkpointer
+    if _checkpointer is None:
+        _checkpointer = SessionCheckpointer(durable=CHECKPOINT_STORE == 'db')
+    return _checkpointer
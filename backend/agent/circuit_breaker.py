@@ -0,0 +1,272 @@
+"""
+Circuit breakers for Luna's external dependencies.
+
+While a dependency (Tavily, DuckDuckGo, a scraped host, OpenAI TTS, the GPU
+avatar service) is down, every request used to wait out the full timeout -
+up to 120 s for the avatar service - holding a worker the whole time. Each
+dependency gets a breaker instead:
+
+- closed: calls go through; outcomes are tracked over a rolling window
+- open: once the failure rate over the window is too high, calls fail fast
+  with CircuitOpenError for a cool-down period
+- half-open: after the cool-down one trial call goes through; success closes
+  the breaker, failure opens it again
+
+Dependencies with a health probe are also checked by a background thread and
+the result cached, so health endpoints don't hit the service per request and
+a recovered service closes its breaker without waiting for user traffic.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Failure share over the window that opens a breaker
+FAILURE_RATE = float(os.getenv('LUNA_BREAKER_FAILURE_RATE', '0.5'))
+
+# Calls needed in the window before the failure rate counts
+MIN_CALLS = int(os.getenv('LUNA_BREAKER_MIN_CALLS', '4'))
+
+# Rolling window of tracked outcomes, in seconds
+WINDOW_SECONDS = float(os.getenv('LUNA_BREAKER_WINDOW', '60'))
+
+# How long an open breaker fails fast before letting a trial call through
+OPEN_SECONDS = float(os.getenv('LUNA_BREAKER_OPEN_SECONDS', '30'))
+
+# Interval between background health probes
+HEALTH_INTERVAL = float(os.getenv('LUNA_HEALTH_INTERVAL', '30'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one dependency"""
+
+    def __init__(
+        self,
+        name: str,
+        probe: Optional[Callable[[], Tuple[bool, Any]]] = None,
+        failure_rate: float = FAILURE_RATE,
+        min_calls: int = MIN_CALLS,
+        window_seconds: float = WINDOW_SECONDS,
+        open_seconds: float = OPEN_SECONDS
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.last_error = None
+        self.health: Optional[Dict[str, Any]] = None
+        self.rejected = 0
+        self._outcomes = deque()  # (timestamp, ok)
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (claims the trial call when half-open)"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ {self.name} recovered - circuit closed")
+                self.state = CLOSED
+                self._outcomes.clear()
+            self._trial_running = False
+            self._track(True)
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self.last_error = str(error) if error is not None else None
+            self._trial_running = False
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._track(False)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                self.state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def trip(self, error: Any = None):
+        """Open the breaker now (e.g. a health probe failed)"""
+        with self._lock:
+            self.last_error = str(error) if error is not None else None
+            self._trial_running = False
+            if self.state != OPEN:
+                self._open()
+
+    def _track(self, ok: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self):
+        print(f"🔌 {self.name} circuit opened ({self.last_error or 'too many failures'})")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func through the breaker (exceptions count as failures and are re-raised)"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func: Callable, *args, **kwargs) -> Any:
+        """Await func through the breaker (exceptions count as failures and are re-raised)"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled (e.g. a tool timeout) - not the dependency's fault
+            with self._lock:
+                self._trial_running = False
+            raise
+        self.record_success()
+        return result
+
+    # ------------------------------------------------------------------
+    # Health
+    # ------------------------------------------------------------------
+
+    def check_health(self) -> Dict[str, Any]:
+        """Run the health probe now and cache the result"""
+        try:
+            healthy, detail = self.probe()
+        except Exception as e:
+            healthy, detail = False, str(e)
+
+        self.health = {'healthy': healthy, 'detail': detail, 'checked_at': time.time()}
+        if not healthy:
+            self.trip(detail)
+        elif self.state == OPEN:
+            # Let the next call through as the trial instead of waiting out the cool-down
+            with self._lock:
+                self.state = HALF_OPEN
+        return self.health
+
+    def cached_health(self) -> Dict[str, Any]:
+        """Last health probe result (probing now if it has never run)"""
+        if self.health is None and self.probe is not None:
+            return self.check_health()
+        return self.health or {'healthy': self.state != OPEN, 'detail': None, 'checked_at': None}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            'state': self.state,
+            'calls': calls,
+            'failures': failures,
+            'rejected': self.rejected,
+            'retry_in': round(self.retry_in(), 1) if self.state == OPEN else None,
+            'last_error': self.last_error,
+            'health': self.health
+        }
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+_monitor_started = False
+
+
+def get_breaker(name: str, probe: Optional[Callable[[], Tuple[bool, Any]]] = None) -> CircuitBreaker:
+    """
+    Get (creating on first use) the breaker for a dependency.
+
+    Args:
+        name: Dependency name, e.g. 'tavily' or 'scrape:oneuae.com'
+        probe: Health check returning (healthy, detail); probed in the background
+    """
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, probe=probe)
+        elif probe is not None and breaker.probe is None:
+            breaker.probe = probe
+    if breaker.probe is not None:
+        _start_health_monitor()
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State of every breaker, for the health endpoint"""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def _start_health_monitor():
+    global _monitor_started
+    with _registry_lock:
+        if _monitor_started:
+            return
+        _monitor_started = True
+    threading.Thread(target=_health_loop, name='luna-health', daemon=True).start()
+
+
+def _health_loop():
+    while True:
+        with _registry_lock:
+            probed = [breaker for breaker in _breakers.values() if breaker.probe is not None]
+        for breaker in probed:
+            breaker.check_health()
+        time.sleep(HEALTH_INTERVAL)
@@ -0,0 +1,233 @@
+"""
+Local claim-support scoring for Luna's verification.
+
+Most answers only restate what the tools already returned. Instead of asking
+the LLM fact-checker about every response, we split the response into
+sentences and score each one against the context passages in-process:
+
+1. TF-IDF weighted coverage (scikit-learn, vectorized): the share of the
+   sentence's term weight that appears in its best passage - or plain token
+   coverage when scikit-learn isn't installed
+2. Optionally, a small CPU NLI cross-encoder (LUNA_NLI_MODEL) for sentences
+   in the uncertain band
+
+Only sentences that score below the threshold are sent to the LLM checker.
+"""
+
+import os
+import re
+from typing import Dict, List, Tuple
+
+
+# Sentences scoring below this are treated as unsupported and go to the LLM
+SUPPORT_THRESHOLD = float(os.getenv('LUNA_CLAIM_SUPPORT_THRESHOLD', '0.5'))
+
+# Optional NLI model (e.g. "cross-encoder/nli-deberta-v3-xsmall"); empty disables it
+NLI_MODEL = os.getenv('LUNA_NLI_MODEL', '')
+
+# Sentences scoring within this margin of the threshold are re-scored with NLI
+NLI_BAND = 0.15
+
+# How much of the verification context is saved with an answer (tool results
+# can be whole PDF dumps): the first N results, each cut to this many chars
+SAVED_CONTEXT_ENTRIES = int(os.getenv('LUNA_SAVED_CONTEXT_ENTRIES', '8'))
+SAVED_CONTEXT_CHARS = int(os.getenv('LUNA_SAVED_CONTEXT_CHARS', '1000'))
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9,.'/%-]*[a-z0-9%]|[a-z0-9]", re.IGNORECASE)
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the',
+    'their', 'this', 'to', 'was', 'we', 'were', 'will', 'with', 'you', 'your'
+}
+
+# Sentences that carry no checkable facts (calls to action, offers of help)
+_NON_FACTUAL_PATTERNS = [
+    r'^(?:please |feel free to |i recommend |i\'d recommend |for (?:more|specific|detailed) )',
+    r'(?:contact|reach out|visit oneuae\.com|get in touch|let me know)',
+    r'\?$',
+    r':$',
+]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a markdown response into plain sentences worth checking"""
+    sentences = []
+    for line in text.splitlines():
+        # Drop markdown bullets, numbering and emphasis
+        line = re.sub(r'^\s*(?:[-*•]|\d+[.)])\s+', '', line)
+        line = line.replace('**', '').replace('__', '').strip()
+        if not line:
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+(?=[A-Z0-9"\'])', line):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= 4:
+                sentences.append(sentence)
+    return sentences
+
+
+def is_factual(sentence: str) -> bool:
+    """Whether a sentence makes a claim worth checking"""
+    lowered = sentence.lower()
+    return not any(re.search(pattern, lowered) for pattern in _NON_FACTUAL_PATTERNS)
+
+
+def split_passages(context: List[str]) -> List[str]:
+    """Split context blobs (tool results, KB chunks) into paragraph passages"""
+    passages = []
+    for blob in context:
+        for passage in re.split(r'\n\s*\n', blob or ''):
+            passage = passage.strip()
+            if len(passage) > 20:
+                passages.append(passage)
+    return passages
+
+
+def saved_context(context: List[str]) -> List[str]:
+    """The capped form of the context stored in message metadata"""
+    return [str(entry)[:SAVED_CONTEXT_CHARS] for entry in context[:SAVED_CONTEXT_ENTRIES]]
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping ("starting" -> "start", "prices" -> "price")"""
+    for suffix in ('ing', 'ed', 's'):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def _terms(text: str) -> List[str]:
+    """Stemmed content terms of a text (numbers keep their punctuation: 2.1m, 60/40)"""
+    return [
+        _stem(token.lower().replace(',', '')) for token in _WORD_RE.findall(text)
+        if token.lower() not in _STOPWORDS
+    ]
+
+
+def _tokens(text: str) -> set:
+    return set(_terms(text))
+
+
+class ClaimSupportScorer:
+    """
+    Scores how well each response sentence is supported by the context.
+
+    Scores are in [0, 1]: how much of the sentence is covered by its best
+    single passage. Terms are IDF-weighted when scikit-learn is available
+    (rare terms like names and figures count most), unweighted otherwise, and
+    borderline scores are optionally refined with an NLI model.
+    """
+
+    def __init__(self, threshold: float = SUPPORT_THRESHOLD, nli_model: str = NLI_MODEL):
+        self.threshold = threshold
+        self.nli_model_name = nli_model
+        self._nli = None
+
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer_class = TfidfVectorizer
+        except ImportError:
+            self._vectorizer_class = None
+            print("⚠️ scikit-learn not installed - claim support falls back to token overlap")
+
+    def score(self, sentences: List[str], passages: List[str]) -> List[float]:
+        """Support score for each sentence against the passages"""
+        if not sentences:
+            return []
+        if not passages:
+            return [0.0] * len(sentences)
+
+        if self._vectorizer_class is not None:
+            scores = self._tfidf_scores(sentences, passages)
+        else:
+            scores = self._overlap_scores(sentences, passages)
+
+        if self.nli_model_name:
+            scores = self._refine_with_nli(sentences, passages, scores)
+
+        return scores
+
+    def _tfidf_scores(self, sentences: List[str], passages: List[str]) -> List[float]:
+        """
+        Max IDF-weighted coverage per sentence.
+
+        Cosine similarity against a paragraph is diluted by everything else the
+        paragraph says; coverage only asks whether the sentence's terms are there.
+        """
+        vectorizer = self._vectorizer_class(analyzer=_terms, binary=True, norm=None)
+        matrix = vectorizer.fit_transform(passages + sentences)
+        passage_terms = (matrix[:len(passages)] > 0).astype(float)
+        sentence_weights = matrix[len(passages):]
+        covered = (sentence_weights @ passage_terms.T).toarray()
+        totals = sentence_weights.sum(axis=1).A.ravel()
+        return [
+            float(row.max() / total) if total else 1.0
+            for row, total in zip(covered, totals)
+        ]
+
+    def _overlap_scores(self, sentences: List[str], passages: List[str]) -> List[float]:
+        """Fraction of a sentence's content terms found in its best passage"""
+        passage_tokens = [_tokens(passage) for passage in passages]
+        scores = []
+        for sentence in sentences:
+            tokens = _tokens(sentence)
+            if not tokens:
+                scores.append(1.0)
+                continue
+            scores.append(max(len(tokens & p) / len(tokens) for p in passage_tokens))
+        return scores
+
+    def _get_nli(self):
+        if self._nli is None:
+            try:
+                from sentence_transformers import CrossEncoder
+                self._nli = CrossEncoder(self.nli_model_name)
+            except Exception as e:
+                print(f"⚠️ NLI model unavailable ({e}) - using lexical scores only")
+                self.nli_model_name = ''
+        return self._nli
+
+    def _refine_with_nli(self, sentences: List[str], passages: List[str], scores: List[float]) -> List[float]:
+        """Re-score borderline sentences by entailment against their best passages"""
+        borderline = [i for i, s in enumerate(scores) if abs(s - self.threshold) <= NLI_BAND]
+        nli = self._get_nli() if borderline else None
+        if nli is None:
+            return scores
+
+        # Entailment of each borderline sentence against the 3 most lexically similar passages
+        refined = list(scores)
+        for i in borderline:
+            sentence_tokens = _tokens(sentences[i])
+            top_passages = sorted(passages, key=lambda p: -len(sentence_tokens & _tokens(p)))[:3]
+            logits = nli.predict([(passage, sentences[i]) for passage in top_passages], apply_softmax=True)
+            # NLI cross-encoders output (contradiction, entailment, neutral)
+            refined[i] = float(max(row[1] for row in logits))
+        return refined
+
+    def check(self, response: str, context: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Split the response into factual sentences and score them.
+
+        Returns:
+            {'supported': [(sentence, score)], 'unsupported': [(sentence, score)]}
+        """
+        sentences = [s for s in split_sentences(response) if is_factual(s)]
+        scores = self.score(sentences, split_passages(context))
+
+        result = {'supported': [], 'unsupported': []}
+        for sentence, score in zip(sentences, scores):
+            bucket = 'supported' if score >= self.threshold else 'unsupported'
+            result[bucket].append((sentence, score))
+        return result
+
+
+# Singleton instance
+_claim_support_scorer = None
+
+
+def get_claim_support_scorer() -> ClaimSupportScorer:
+    """Get singleton instance of the claim support scorer"""
+    global _claim_support_scorer
+    if _claim_support_scorer is None:
+        _claim_support_scorer = ClaimSupportScorer()
+    return _claim_support_scorer
@@ -0,0 +1,336 @@
+"""
+Concurrent, polite site crawler for Luna's knowledge ingestion.
+
+The ingestor and the scrape_and_populate command used to crawl one URL at a
+time with a list frontier (O(n) `pop(0)` and membership checks) and a fixed
+one-second sleep after every page. SiteCrawler instead:
+
+- keeps the frontier in a deque plus a set of every URL ever queued
+- fetches with a bounded pool of worker threads over the shared HTTP session
+- rate-limits per host (honouring robots.txt Crawl-delay) instead of sleeping
+- skips URLs disallowed by robots.txt and seeds the frontier from sitemaps
+- can save its frontier to a JSON file and resume an interrupted crawl
+- can send per-URL validators (ETag/Last-Modified) and report 304s, so a
+  recrawl doesn't download pages that haven't changed
+
+Pages are yielded to the caller's thread, so callers can write to the
+database and vector store without worrying about the workers.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.robotparser import RobotFileParser
+
+from agent.html_extract import ExtractedPage, extract
+from agent.http_client import fetch
+
+
+CRAWL_WORKERS = int(os.getenv('LUNA_CRAWL_WORKERS', '4'))
+
+# Minimum seconds between two requests to the same host
+CRAWL_HOST_DELAY = float(os.getenv('LUNA_CRAWL_HOST_DELAY', '0.5'))
+
+# Sitemaps followed from a sitemap index
+MAX_SITEMAPS = 10
+
+# Links to these are never pages worth reading
+_SKIPPED_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
+    '.css', '.js', '.zip', '.mp4', '.mp3', '.woff', '.woff2'
+)
+
+_LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>', re.IGNORECASE)
+
+
+@dataclass
+class CrawledPage:
+    """One fetched HTML page (or a 304 for a page that hasn't changed)"""
+    url: str
+    html: str
+    extracted: Optional[ExtractedPage]
+    status_code: int
+    headers: Dict[str, str]
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
+class HostRateLimiter:
+    """Spaces out requests to each host by at least `delay` seconds"""
+
+    def __init__(self, delay: float = CRAWL_HOST_DELAY):
+        self.delay = delay
+        self._next_slot: Dict[str, float] = {}
+        self._delays: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def set_delay(self, host: str, delay: float):
+        self._delays[host] = max(self.delay, delay)
+
+    def wait(self, host: str):
+        """Block until this thread may send its request to host"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._delays.get(host, self.delay)
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SiteCrawler:
+    """Breadth-first crawler of one site"""
+
+    def __init__(
+        self,
+        base_url: str,
+        max_pages: int = 50,
+        workers: int = CRAWL_WORKERS,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 15,
+        host_delay: float = CRAWL_HOST_DELAY,
+        state_path: Optional[str] = None,
+        use_sitemaps: bool = True,
+        seeds: Iterable[str] = (),
+        validators: Optional[Callable[[str], Dict[str, str]]] = None
+    ):
+        """
+        Args:
+            base_url: Start page; only links on its host are followed
+            max_pages: Pages to fetch in this run
+            workers: Concurrent fetches
+            headers: Extra request headers
+            timeout: Per-request timeout in seconds
+            host_delay: Minimum seconds between requests to the host
+            state_path: JSON file to save progress to and resume from
+            use_sitemaps: Seed the frontier from robots.txt / sitemap.xml
+            seeds: More URLs to start from (e.g. every page already indexed)
+            validators: Conditional-GET headers for a URL (called on worker threads)
+        """
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        self.max_pages = max_pages
+        self.workers = workers
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.state_path = state_path
+        self.use_sitemaps = use_sitemaps
+        self.seeds = list(seeds)
+        self.validators = validators
+        self.user_agent = self.headers.get('User-Agent', '*')
+
+        self.frontier = deque()
+        self.queued = set()
+        self.fetched = 0
+        self.not_modified = 0
+        self.failed = 0
+        self.skipped = 0
+        self.limiter = HostRateLimiter(host_delay)
+        self.robots: Optional[RobotFileParser] = None
+
+    # ------------------------------------------------------------------
+    # Frontier
+    # ------------------------------------------------------------------
+
+    def normalize(self, url: str, base: str = None) -> Optional[str]:
+        """Absolute URL without fragment, or None if it shouldn't be crawled"""
+        url = urldefrag(urljoin(base or self.base_url, url.strip()))[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or parsed.netloc != self.host:
+            return None
+        if parsed.path.lower().endswith(_SKIPPED_EXTENSIONS):
+            return None
+        return url
+
+    def enqueue(self, url: str):
+        if url in self.queued:
+            return
+        self.queued.add(url)
+        if self.robots is not None and not self.robots.can_fetch(self.user_agent, url):
+            self.skipped += 1
+            return
+        self.frontier.append(url)
+
+    def _links(self, page_url: str, extracted: ExtractedPage) -> List[str]:
+        links = []
+        for _, href in extracted.links:
+            url = self.normalize(href, base=page_url)
+            if url is not None:
+                links.append(url)
+        return links
+
+    # ------------------------------------------------------------------
+    # Seeding
+    # ------------------------------------------------------------------
+
+    def _load_robots(self) -> List[str]:
+        """Read robots.txt (rules and crawl delay); returns the sitemaps it lists"""
+        robots_url = urljoin(self.base_url, '/robots.txt')
+        try:
+            response = fetch(robots_url, headers=self.headers, timeout=self.timeout)
+            if response.status_code != 200:
+                return []
+        except Exception as e:
+            print(f"⚠️ Could not read {robots_url}: {str(e)}")
+            return []
+
+        self.robots = RobotFileParser(robots_url)
+        self.robots.parse(response.text.splitlines())
+        crawl_delay = self.robots.crawl_delay(self.user_agent)
+        if crawl_delay:
+            self.limiter.set_delay(self.host, float(crawl_delay))
+        return list(self.robots.site_maps() or [])
+
+    def _sitemap_urls(self, sitemaps: List[str]) -> List[str]:
+        """Page URLs listed in the sitemaps (following sitemap indexes, up to MAX_SITEMAPS)"""
+        pending = deque(sitemaps or [urljoin(self.base_url, '/sitemap.xml')])
+        seen, pages = set(), []
+        while pending and len(seen) < MAX_SITEMAPS:
+            sitemap = pending.popleft()
+            if sitemap in seen:
+                continue
+            seen.add(sitemap)
+            try:
+                response = fetch(sitemap, headers=self.headers, timeout=self.timeout)
+                if response.status_code != 200:
+                    continue
+            except Exception:
+                continue
+            for loc in _LOC_RE.findall(response.text):
+                if loc.lower().endswith('.xml'):
+                    pending.append(loc)
+                else:
+                    pages.append(loc)
+        return pages
+
+    def _seed(self, sitemaps: List[str]):
+        self.enqueue(self.normalize(self.base_url) or self.base_url)
+        seeds = list(self.seeds)
+        if self.use_sitemaps:
+            seeds.extend(self._sitemap_urls(sitemaps))
+        for url in seeds:
+            url = self.normalize(url)
+            if url is not None:
+                self.enqueue(url)
+        print(f"🕸️ Crawl of {self.host} seeded with {len(self.frontier)} URLs")
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> bool:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return False
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('base_url') != self.base_url:
+            return False
+        self.frontier = deque(state['frontier'])
+        self.queued = set(state['queued'])
+        print(f"🕸️ Resuming crawl of {self.host} with {len(self.frontier)} URLs queued")
+        return True
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        state = {
+            'base_url': self.base_url,
+            'frontier': list(self.frontier),
+            'queued': list(self.queued)
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _clear_state(self):
+        if self.state_path and os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    # ------------------------------------------------------------------
+    # Crawling
+    # ------------------------------------------------------------------
+
+    def _fetch(self, url: str) -> Optional[CrawledPage]:
+        """Fetch and extract one page (runs on a worker thread)"""
+        self.limiter.wait(self.host)
+        validators = self.validators(url) if self.validators else None
+        if validators:
+            response = fetch(url, headers={**self.headers, **validators}, timeout=self.timeout, revalidate=False)
+            if response.status_code == 304:
+                return CrawledPage(url, '', None, 304, dict(response.headers))
+        else:
+            response = fetch(url, headers=self.headers, timeout=self.timeout)
+        response.raise_for_status()
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None
+        html = response.text
+        return CrawledPage(url, html, extract(html, base_url=url), response.status_code, dict(response.headers))
+
+    def crawl(self) -> Iterator[CrawledPage]:
+        """
+        Crawl the site, yielding each HTML page as it is fetched.
+
+        Pages are extracted (agent.html_extract) on the worker threads and
+        their links queued before they are yielded. With validators, unchanged pages are yielded as 304s
+        without a body. If the crawl stops early (max_pages, an error, Ctrl+C) the
+        frontier stays in state_path and the next crawl resumes from it.
+        """
+        started = time.monotonic()
+        sitemaps = self._load_robots()
+        if not self._load_state():
+            self._seed(sitemaps)
+
+        finished = False
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='luna-crawl') as pool:
+                in_flight = {}
+                try:
+                    while True:
+                        while self.frontier and len(in_flight) < self.workers and self.fetched + len(in_flight) < self.max_pages:
+                            url = self.frontier.popleft()
+                            in_flight[pool.submit(self._fetch, url)] = url
+
+                        if not in_flight:
+                            finished = not self.frontier
+                            break
+
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            url = in_flight.pop(future)
+                            self.fetched += 1
+                            try:
+                                page = future.result()
+                            except Exception as e:
+                                self.failed += 1
+                                print(f"⚠️ Error crawling {url}: {str(e)[:100]}")
+                                continue
+                            if page is None:
+                                continue
+                            if page.not_modified:
+                                # Unchanged pages' links are already known (seeds / sitemap)
+                                self.not_modified += 1
+                            else:
+                                for link in self._links(url, page.extracted):
+                                    self.enqueue(link)
+                            yield page
+                finally:
+                    # Unfinished fetches go back on the frontier for the next run
+                    for future, url in in_flight.items():
+                        future.cancel()
+                        self.frontier.appendleft(url)
+        finally:
+            if finished:
+                self._clear_state()
+            else:
+                self.save_state()
+            print(f"🕸️ Crawled {self.fetched} pages of {self.host} in {time.monotonic() - started:.1f}s "
+                  f"({self.not_modified} not modified, {self.failed} failed, {self.skipped} disallowed by robots.txt)")
@@ -3,14 +3,14 @@ Data Ingestion System for One Development Agent
 Supports multiple data sources: Website, LinkedIn, Documents, Manual
 """
 
-import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any
-import time
+from typing import List, Dict, Any, Optional
 import re
-from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
+from agent.crawler import SiteCrawler, CrawledPage
+from agent.recrawl import IncrementalIndexer
+
 
 class OneDevelopmentDataIngestor:
     """
@@ -30,90 +30,110 @@ class OneDevelopmentDataIngestor:
         }
         self.scraped_data = []
     
-    def scrape_website(self, max_pages: int = 50) -> List[Dict[str, Any]]:
+    def scrape_website(self, max_pages: int = 50, state_path: str = None) -> List[Dict[str, Any]]:
         """
         Scrape the One Development website
         
         Args:
             max_pages: Maximum number of pages to scrape
+            state_path: Optional file to save crawl progress to (and resume from)
             
         Returns:
             List of scraped content dictionaries
         """
         print(f"Starting website scrape for {self.base_url}")
         
-        visited_urls = set()
-        urls_to_visit = [self.base_url]
+        crawler = SiteCrawler(
+            self.base_url,
+            max_pages=max_pages,
+            headers=self.headers,
+            timeout=10,
+            state_path=state_path
+        )
         scraped_content = []
         
-        while urls_to_visit and len(visited_urls) < max_pages:
-            url = urls_to_visit.pop(0)
-            
-            if url in visited_urls:
-                continue
-            
-            try:
-                print(f"Scraping: {url}")
-                response = requests.get(url, headers=self.headers, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extract title
-                title = soup.find('title')
-                title_text = title.get_text() if title else url
-                
-                # Remove script and style elements
-                for script in soup(["script", "style", "nav", "footer"]):
-                    script.decompose()
-                
-                # Extract main content
-                content_areas = soup.find_all(['article', 'main', 'section', 'div'])
-                
-                text_content = []
-                for area in content_areas:
-                    text = area.get_text(separator=' ', strip=True)
-                    if len(text) > 100:  # Only substantial content
-                        text_content.append(text)
-                
-                full_content = ' '.join(text_content)
-                
-                # Clean up whitespace
-                full_content = re.sub(r'\s+', ' ', full_content).strip()
-                
-                if full_content:
-                    scraped_content.append({
-                        'url': url,
-                        'title': title_text,
-                        'content': full_content[:5000],  # Limit content length
-                        'scraped_at': datetime.now().isoformat(),
-                        'source_type': 'website'
-                    })
-                
-                visited_urls.add(url)
-                
-                # Find new links to visit
-                links = soup.find_all('a', href=True)
-                for link in links:
-                    href = link['href']
-                    full_url = urljoin(url, href)
-                    
-                    # Only follow links within the same domain
-                    if urlparse(full_url).netloc == urlparse(self.base_url).netloc:
-                        if full_url not in visited_urls and full_url not in urls_to_visit:
-                            urls_to_visit.append(full_url)
-                
-                # Be polite - don't hammer the server
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error scraping {url}: {str(e)}")
-                continue
+        for page in crawler.crawl():
+            item = self.extract_page(page)
+            if item:
+                scraped_content.append(item)
         
         self.scraped_data.extend(scraped_content)
         print(f"Scraped {len(scraped_content)} pages")
         return scraped_content
     
+    def extract_page(self, page: CrawledPage) -> Optional[Dict[str, Any]]:
+        """
+        Extract the title and main text of a crawled page
+        
+        Args:
+            page: Page from the crawler
+            
+        Returns:
+            Scraped content dictionary, or None if the page has no content
+        """
+        try:
+            print(f"Scraping: {page.url}")
+            extracted = page.extracted
+            title_text = extracted.title or page.url
+            
+            # Main content blocks (boilerplate already dropped), whitespace collapsed
+            full_content = re.sub(r'\s+', ' ', extracted.text).strip()
+            
+            if not full_content:
+                return None
+            
+            return {
+                'url': page.url,
+                'title': title_text,
+                'content': full_content[:5000],  # Limit content length
+                'scraped_at': datetime.now().isoformat(),
+                'source_type': 'website'
+            }
+            
+        except Exception as e:
+            print(f"Error scraping {page.url}: {str(e)}")
+            return None
+    
+    def recrawl_website(self, max_pages: int = 50, state_path: str = None) -> Dict[str, int]:
+        """
+        Incrementally recrawl the website into the knowledge base
+        
+        Known pages are fetched with conditional GETs, and only new or
+        changed pages are written and re-embedded.
+        
+        Args:
+            max_pages: Maximum number of new pages to fetch - every page
+                already indexed is revalidated on top of these
+            state_path: Optional file to save crawl progress to (and resume from)
+            
+        Returns:
+            Counts of added, changed, unchanged, skipped and failed pages
+        """
+        print(f"Starting incremental recrawl of {self.base_url}")
+        
+        indexer = IncrementalIndexer(source_type='website')
+        crawler = SiteCrawler(
+            self.base_url,
+            max_pages=indexer.crawl_budget(max_pages),
+            headers=self.headers,
+            timeout=10,
+            state_path=state_path,
+            seeds=indexer.known_urls(),
+            validators=indexer.validators
+        )
+        
+        for page in crawler.crawl():
+            if page.not_modified:
+                indexer.mark_not_modified(page.url, page.headers)
+                continue
+            item = self.extract_page(page)
+            if item:
+                indexer.index(page.url, item['title'], item['content'], page.headers)
+            else:
+                indexer.skip()
+        
+        return indexer.finish(crawler)
+    
     def get_initial_knowledge(self) -> List[Dict[str, Any]]:
         """
         Get initial curated knowledge about One Development
@@ -0,0 +1,400 @@
+"""
+Main-content extraction from HTML pages.
+
+The ingestor, scrape_and_populate, WebAccessTool and scrape_webpage each had
+their own BeautifulSoup variant. The ingestor's called get_text() on every
+article/main/section/div and joined the results, so each paragraph was
+copied once per enclosing block - quadratic in nesting depth, and the
+stored "content" was mostly repeats.
+
+extract() makes one streaming pass over the markup (the stdlib HTML parser,
+no tree is built):
+
+- script/style and nav/footer/aside/forms are skipped as they are read
+- the remaining text is cut into blocks at block-level tags, counting how
+  much of each block is link text
+- blocks inside elements whose class/id mark them as menus, cookie banners,
+  share bars etc. are dropped - unless that element holds most of the page's
+  text (a wrapper with a state class like "menu-open" or "has-sidebar")
+- blocks are kept by text density: long, mostly non-link blocks, headings,
+  and short non-link blocks in the same container as those or next to them
+  (a listing card's price, bedrooms and handover date). Table cells and list
+  items are judged by the container of their table or list, so a price table
+  or payment plan under a heading is kept whole (one line per table row)
+- inline elements are separated by a space ("2-3 Bedrooms" "AED 2,500,000"
+  in adjacent spans stay two words), as get_text(separator=' ') did
+- repeated long passages (carousels, duplicated mobile markup) are kept
+  once, and when the page marks its main content (<main>/<article>) only
+  that is kept
+- a page where nothing qualifies (a short note, a bare price table) keeps all
+  of its non-chrome text
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+
+# Never readable content
+_SKIPPED_TAGS = {
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe',
+    'object', 'select', 'button', 'head',
+}
+
+# Page chrome (a <header> counts only outside the main content)
+_BOILERPLATE_TAGS = {'nav', 'footer', 'aside', 'form', 'dialog'}
+
+# Never judged by their class/id - state classes on these cover the whole page
+_WRAPPER_TAGS = {'html', 'body', 'main', 'article'}
+
+_BLOCK_TAGS = {
+    'address', 'article', 'blockquote', 'body', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'li', 'main', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul',
+}
+
+# Blocks directly inside the same one of these belong together (e.g. a card)
+_CONTAINER_TAGS = {'article', 'body', 'dd', 'div', 'figure', 'li', 'main', 'section', 'td', 'th'}
+
+# Everything inside one of these (rows, cells, items) shares the container of
+# the table or list itself
+_GROUP_TAGS = {'table', 'ul', 'ol', 'dl'}
+
+_HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# Opening one of these closes an unclosed one of the same kind
+_SELF_CLOSING = {'p', 'li', 'dt', 'dd', 'tr', 'td', 'th'}
+
+_BOILERPLATE_ATTR_RE = re.compile(
+    r'(?:^|[\s_-])(?:nav|navbar|menu|footer|breadcrumbs?|sidebar|cookies?|consent|'
+    r'social|share|sharing|newsletter|popup|modal|subscribe|skip-link)(?:$|[\s_-])',
+    re.IGNORECASE
+)
+
+_BOILERPLATE_ROLES = {'navigation', 'banner', 'contentinfo', 'complementary', 'dialog', 'search'}
+
+# A block with at least this many words and little link text is content
+DENSE_BLOCK_WORDS = 10
+DENSE_MAX_LINK_DENSITY = 0.33
+
+# Short blocks next to content are kept unless they're mostly links
+MAX_LINK_DENSITY = 0.5
+
+# Main content is trusted only if it has this many words
+MIN_MAIN_WORDS = 50
+
+
+@dataclass
+class TextBlock:
+    """One block of text (paragraph, list item, heading, table row...)"""
+    text: str
+    words: int
+    link_density: float
+    heading: int = 0
+    in_main: bool = False
+    # Innermost element with a boilerplate class/id (0 = none), and innermost container
+    chrome: int = 0
+    container: int = 0
+
+    @property
+    def dense(self) -> bool:
+        return self.words >= DENSE_BLOCK_WORDS and self.link_density <= DENSE_MAX_LINK_DENSITY
+
+
+@dataclass
+class ExtractedPage:
+    """Title, main-content blocks and links of an HTML page"""
+    title: str
+    blocks: List[TextBlock] = field(default_factory=list)
+    links: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """The main content, one block per line"""
+        return '\n'.join(block.text for block in self.blocks)
+
+    def sections(self) -> List[Tuple[str, str]]:
+        """(heading, first block under it) pairs - the second is '' if none"""
+        sections = []
+        for i, block in enumerate(self.blocks):
+            if not block.heading:
+                continue
+            following = self.blocks[i + 1] if i + 1 < len(self.blocks) else None
+            sections.append((block.text, following.text if following and not following.heading else ''))
+        return sections
+
+
+class _Frame:
+    """State of an open element, inherited by its children"""
+    __slots__ = ('tag', 'skip', 'link', 'main', 'heading', 'chrome', 'container', 'group')
+
+    def __init__(
+        self,
+        tag: str,
+        skip: bool,
+        link: bool,
+        main: bool,
+        heading: int,
+        chrome: int = 0,
+        container: int = 0,
+        group: bool = False
+    ):
+        self.tag = tag
+        self.skip = skip
+        self.link = link
+        self.main = main
+        self.heading = heading
+        self.chrome = chrome
+        self.container = container
+        self.group = group
+
+
+class _BlockParser(HTMLParser):
+    """Streams markup into raw text blocks and links"""
+
+    def __init__(self, base_url: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.stack: List[_Frame] = [_Frame('', False, False, False, 0)]
+        self.blocks: List[TextBlock] = []
+        self.links: List[Tuple[str, str]] = []
+        self.title_parts: List[str] = []
+        self._in_title = False
+        self._parts: List[str] = []
+        self._link_chars = 0
+        self._block_heading = 0
+        self._block_main = False
+        self._block_chrome = 0
+        self._block_container = 0
+        self._elements = 0
+        self._anchor: Optional[Tuple[str, List[str]]] = None
+
+    # ------------------------------------------------------------------
+    # Blocks
+    # ------------------------------------------------------------------
+
+    def _flush(self):
+        if self._parts:
+            text = ' '.join(''.join(self._parts).split())
+            if text:
+                self.blocks.append(TextBlock(
+                    text=text,
+                    words=text.count(' ') + 1,
+                    link_density=min(1.0, self._link_chars / len(text)),
+                    heading=self._block_heading,
+                    in_main=self._block_main,
+                    chrome=self._block_chrome,
+                    container=self._block_container
+                ))
+            self._parts = []
+        self._link_chars = 0
+        self._block_heading = 0
+        self._block_main = False
+        self._block_chrome = 0
+        self._block_container = 0
+
+    def _boundary(self):
+        """An inline element starts or ends: separate its text from its neighbours'"""
+        if self._parts:
+            self._parts.append(' ')
+
+    def _pop(self) -> _Frame:
+        frame = self.stack.pop()
+        if frame.tag in _BLOCK_TAGS:
+            self._flush()
+        else:
+            self._boundary()
+            if frame.tag == 'a':
+                self._close_anchor()
+        return frame
+
+    def _close_anchor(self):
+        if self._anchor is not None:
+            href, parts = self._anchor
+            text = ' '.join(''.join(parts).split())
+            if text:
+                self.links.append((text, href))
+            self._anchor = None
+
+    # ------------------------------------------------------------------
+    # Parser events
+    # ------------------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            # Only the document title (not an <svg><title>)
+            self._in_title = not self.title_parts
+            return
+        if tag == 'body':
+            # Whatever is still open (e.g. an unclosed <head>) ends here
+            while len(self.stack) > 1:
+                self._pop()
+        if tag in _VOID_TAGS:
+            if tag in ('br', 'hr'):
+                self._flush()
+            return
+
+        if tag in _SELF_CLOSING and self.stack[-1].tag == tag:
+            self._pop()
+
+        parent = self.stack[-1]
+        attrs = dict(attrs)
+        skip = parent.skip or tag in _SKIPPED_TAGS or tag in _BOILERPLATE_TAGS
+        if not skip:
+            skip = (
+                (tag == 'header' and not parent.main)
+                or 'hidden' in attrs
+                or attrs.get('role') in _BOILERPLATE_ROLES
+            )
+
+        # Class/id matches are only marked here - whether they're chrome or a
+        # page wrapper is decided once their share of the text is known
+        self._elements += 1
+        chrome = parent.chrome
+        if not skip and tag not in _WRAPPER_TAGS and attrs.get('role') != 'main':
+            if _BOILERPLATE_ATTR_RE.search(f"{attrs.get('class') or ''} {attrs.get('id') or ''}"):
+                chrome = self._elements
+
+        if tag == 'a' and attrs.get('href'):
+            # Links are collected from the whole page, chrome included
+            self._close_anchor()
+            href = attrs['href'].strip()
+            self._anchor = (urljoin(self.base_url, href) if self.base_url else href, [])
+
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        else:
+            self._boundary()
+
+        self.stack.append(_Frame(
+            tag,
+            skip,
+            parent.link or tag == 'a',
+            parent.main or tag in ('main', 'article') or attrs.get('role') == 'main',
+            _HEADING_TAGS.get(tag, 0 if tag == 'p' else parent.heading),
+            chrome,
+            self._elements if tag in _CONTAINER_TAGS and not parent.group else parent.container,
+            parent.group or tag in _GROUP_TAGS
+        ))
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+            return
+        # Stray end tags are ignored; unclosed children are closed with their parent
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                while len(self.stack) > depth:
+                    self._pop()
+                return
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+            return
+        frame = self.stack[-1]
+        if self._anchor is not None and frame.tag not in _SKIPPED_TAGS:
+            self._anchor[1].append(data)
+        if frame.skip:
+            return
+        if not self._parts:
+            self._block_heading = frame.heading
+            self._block_main = frame.main
+            self._block_chrome = frame.chrome
+            self._block_container = frame.container
+        self._parts.append(data)
+        if frame.link:
+            self._link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        while len(self.stack) > 1:
+            self._pop()
+        self._flush()
+        self._close_anchor()
+
+
+def _select_blocks(blocks: List[TextBlock]) -> List[TextBlock]:
+    """Keep content blocks by text and link density, dropping repeated passages"""
+    # Boilerplate-classed elements are dropped, except one holding most of the
+    # text - that's a page wrapper with a state class, not a menu
+    total_words = sum(block.words for block in blocks)
+    chrome_words = Counter()
+    for block in blocks:
+        if block.chrome:
+            chrome_words[block.chrome] += block.words
+    wrappers = {chrome for chrome, words in chrome_words.items() if words * 2 > total_words}
+    blocks = [block for block in blocks if not block.chrome or block.chrome in wrappers]
+
+    main_words = sum(block.words for block in blocks if block.in_main and block.dense)
+    if main_words >= MIN_MAIN_WORDS:
+        blocks = [block for block in blocks if block.in_main]
+
+    # Containers (cards, sections, whole tables and lists) with a heading or real text
+    content_containers = {block.container for block in blocks if block.heading or block.dense}
+
+    kept, seen = [], set()
+    for i, block in enumerate(blocks):
+        if block.heading:
+            keep = block.words <= 30
+        elif block.dense:
+            keep = True
+        elif block.link_density > MAX_LINK_DENSITY:
+            keep = False
+        else:
+            previous = blocks[i - 1] if i > 0 else None
+            following = blocks[i + 1] if i + 1 < len(blocks) else None
+            keep = block.container in content_containers or any(
+                neighbour is not None and (neighbour.dense or neighbour.heading)
+                for neighbour in (previous, following)
+            )
+        if not keep:
+            continue
+        # Short facts repeat legitimately (two cards with the same price), passages don't
+        if block.dense:
+            key = block.text.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(block)
+
+    # Nothing reads as content (a short note, a bare price table): keep it all
+    return kept or blocks
+
+
+def extract(html: Union[str, bytes], base_url: Optional[str] = None) -> ExtractedPage:
+    """
+    Extract the title, main content and links of a page in one pass.
+
+    Args:
+        html: Page markup (bytes are decoded as UTF-8)
+        base_url: URL of the page, to make links absolute
+
+    Returns:
+        ExtractedPage with the kept blocks in document order
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+
+    parser = _BlockParser(base_url)
+    parser.feed(html)
+    parser.close()
+
+    return ExtractedPage(
+        title=' '.join(''.join(parser.title_parts).split()),
+        blocks=_select_blocks(parser.blocks),
+        links=parser.links
+    )
+
+
+def extract_text(html: Union[str, bytes]) -> str:
+    """The main content of a page, one block per line"""
+    return extract(html).text
@@ -0,0 +1,263 @@
+"""
+Shared HTTP clients for Luna's outbound requests.
+
+Every tool used to open its own connection per call. This module hands out one
+pooled async client per event loop so concurrent conversations reuse keep-alive
+connections to oneuae.com, DuckDuckGo and friends instead of paying a fresh
+TCP+TLS handshake for every fetch.
+
+Sync callers (WSGI views, the ingestor, management commands) share one pooled
+requests.Session with bounded retries and backoff. `fetch` / `afetch` also
+revalidate pages they have seen before: the last ETag/Last-Modified of each URL
+is kept in a small response store, and a 304 Not Modified is answered from it.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+DEFAULT_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# (connect, read) timeout of the sync session
+SYNC_TIMEOUT = (5.0, 20.0)
+
+# Retries of idempotent requests on connection errors and 429/502/503/504
+HTTP_RETRIES = int(os.getenv('LUNA_HTTP_RETRIES', '2'))
+HTTP_BACKOFF = float(os.getenv('LUNA_HTTP_BACKOFF', '0.5'))
+
+# Keep-alive pools (one per host) and connections per pool of the sync session
+SYNC_POOLS = 20
+SYNC_POOL_SIZE = 50
+
+# Size of the response store used for conditional GETs
+RESPONSE_STORE_ENTRIES = int(os.getenv('LUNA_HTTP_STORE_ENTRIES', '256'))
+RESPONSE_STORE_BYTES = int(os.getenv('LUNA_HTTP_STORE_BYTES', str(64 * 1024 * 1024)))
+RESPONSE_STORE_MAX_BODY = 5 * 1024 * 1024
+
+# Only text bodies are kept - PDFs and other binaries are cached as extracted text instead
+_STORED_CONTENT_TYPES = ('text/', 'html', 'xml', 'json')
+
+# Not replayed from the store - the stored body is already decoded
+_UNSTORED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+# httpx clients are bound to the loop that opened their connections, so keep one per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the pooled async HTTP client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=DEFAULT_TIMEOUT,
+            # Retries failed connects (httpx doesn't retry responses)
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_RETRIES, limits=DEFAULT_LIMITS),
+            follow_redirects=True
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Close the running loop's client (e.g. on ASGI shutdown)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ============================================================================
+# SYNC SESSION
+# ============================================================================
+
+_sync_session = None
+_sync_session_lock = threading.Lock()
+
+
+def get_sync_session() -> requests.Session:
+    """Get the process-wide pooled requests session (with retries)"""
+    global _sync_session
+    with _sync_session_lock:
+        if _sync_session is None:
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=frozenset(['GET', 'HEAD']),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=SYNC_POOLS, pool_maxsize=SYNC_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sync_session = session
+    return _sync_session
+
+
+# ============================================================================
+# CONDITIONAL GET
+# ============================================================================
+
+class _Stored:
+    """Validators and body of the last 200 response for a URL"""
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], content: bytes, headers: Dict[str, str], encoding: Optional[str]):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseStore:
+    """LRU of revalidatable responses, keyed by URL, bounded by entries and total body bytes"""
+
+    def __init__(self, max_entries: int = RESPONSE_STORE_ENTRIES, max_bytes: int = RESPONSE_STORE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, _Stored]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.refetched = 0
+
+    def get(self, url: str) -> Optional[_Stored]:
+        with self._lock:
+            stored = self._entries.get(url)
+            if stored is not None:
+                self._entries.move_to_end(url)
+            return stored
+
+    def put(self, url: str, status_code: int, headers, content: bytes, encoding: Optional[str]):
+        """Remember a response if it can be revalidated later"""
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if status_code != 200 or not (etag or last_modified):
+            return
+        if len(content) > min(RESPONSE_STORE_MAX_BODY, self.max_bytes):
+            return
+        content_type = (headers.get('Content-Type') or '').lower()
+        if not any(kind in content_type for kind in _STORED_CONTENT_TYPES):
+            return
+        kept = {name: value for name, value in headers.items() if name.lower() not in _UNSTORED_HEADERS}
+        stored = _Stored(etag, last_modified, content, kept, encoding)
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._bytes -= len(previous.content)
+            self._entries[url] = stored
+            self._bytes += len(content)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.content)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'revalidated': self.revalidated,
+            'refetched': self.refetched
+        }
+
+
+_response_store = ResponseStore()
+
+
+def get_response_store() -> ResponseStore:
+    return _response_store
+
+
+def fetch(url: str, headers: Dict[str, str] = None, timeout=SYNC_TIMEOUT, revalidate: bool = True, **kwargs) -> requests.Response:
+    """
+    GET a URL over the shared session, revalidating pages fetched before.
+
+    Args:
+        url: URL to fetch
+        headers: Extra request headers
+        timeout: Request timeout (seconds, or (connect, read))
+        revalidate: Send If-None-Match/If-Modified-Since for known pages
+
+    Returns:
+        The response - a 304 is returned as the stored 200 response
+        (with `from_store` set)
+    """
+    request_headers = dict(headers or {})
+    stored = _response_store.get(url) if revalidate and not kwargs.get('stream') else None
+    if stored is not None:
+        request_headers.update(stored.validators())
+
+    response = get_sync_session().get(url, headers=request_headers, timeout=timeout, **kwargs)
+    response.from_store = False
+
+    if stored is not None and response.status_code == 304:
+        _response_store.revalidated += 1
+        return _stored_response(url, stored)
+
+    if revalidate and not kwargs.get('stream'):
+        if stored is not None:
+            _response_store.refetched += 1
+        _response_store.put(url, response.status_code, response.headers, response.content, response.encoding)
+    return response
+
+
+def _stored_response(url: str, stored: _Stored) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(stored.headers)
+    response.encoding = stored.encoding
+    response._content = stored.content
+    response.from_store = True
+    return response
+
+
+async def afetch(url: str, timeout: float = None, revalidate: bool = True) -> httpx.Response:
+    """Async counterpart of `fetch` over the loop's pooled client"""
+    stored = _response_store.get(url) if revalidate else None
+    request_headers = stored.validators() if stored is not None else {}
+
+    kwargs = {'timeout': timeout} if timeout is not None else {}
+    response = await get_async_client().get(url, headers=request_headers, **kwargs)
+
+    if stored is not None and response.status_code == 304:
+        _response_store.revalidated += 1
+        return httpx.Response(
+            200,
+            headers=stored.headers,
+            content=stored.content,
+            request=response.request
+        )
+
+    if revalidate:
+        if stored is not None:
+            _response_store.refetched += 1
+        _response_store.put(url, response.status_code, response.headers, response.content, response.encoding)
+    return response
@@ -20,16 +20,24 @@ LangSmith tracing enabled for full visibility into agent reasoning and tool usag
 Set LANGCHAIN_TRACING_V2=true and LANGCHAIN_API_KEY in .env to enable.
 """
 
-from typing import Dict, Any, List, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal, AsyncIterator, Tuple
 from datetime import datetime
 import os
 
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage, RemoveMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END, MessagesState
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
 from langgraph.prebuilt import ToolNode
 
-from agent.tools import get_all_tools
+from agent.tools import get_all_tools, prefetch_knowledge_base
+from agent.async_runtime import run_sync
+from agent.single_flight import get_agent_flights, normalize_question
+from agent.checkpointer import get_checkpointer, session_config
+from agent.state_reduction import compact_tool_messages, apply_replacements
+from agent.budget import AgentBudget
+from agent.tool_runtime import apply_tool_policies
 from agent.subagents import get_subagent_tools
 from agent.deepagents_tools import get_deepagent_tools
 
@@ -145,7 +153,31 @@ ALWAYS search knowledge base first. It has the latest project data."""
 # SIMPLIFIED AGENT BUILDER
 # ============================================================================
 
-def create_luna_agent(tools: List, llm: ChatOpenAI, system_prompt: str, max_iterations: int = 10):
+# Earlier turns kept in a resumed session's state: their last questions and
+# answers (like the history a fresh session is built from) - their tool calls
+# and results are dropped so the prompt doesn't grow with every turn
+HISTORY_MESSAGES = 10
+
+
+class LunaAgentState(MessagesState):
+    """Graph state: the conversation plus this turn's budget use (see AgentBudget)"""
+    iteration_count: int
+    started_at: float
+    deadline: float
+    prompt_tokens: int
+    completion_tokens: int
+    tool_calls: int
+    budget_reason: str
+
+
+def create_luna_agent(
+    tools: List,
+    llm: ChatOpenAI,
+    system_prompt: str,
+    max_iterations: int = 10,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    budget: Optional[AgentBudget] = None
+):
     """
     Simplified agent creation function - inspired by deepagents but Python 3.9 compatible.
     
@@ -156,65 +188,140 @@ def create_luna_agent(tools: List, llm: ChatOpenAI, system_prompt: str, max_iter
         llm: Language model instance
         system_prompt: System prompt defining agent behavior
         max_iterations: Maximum reasoning iterations
+        checkpointer: Saves graph state per thread_id (session) between turns
+        budget: Per-turn deadline, token and tool call limits (defaults from env)
     
     Returns:
         Compiled LangGraph agent ready to use
     """
+    budget = budget or AgentBudget(max_iterations=max_iterations)
     
     # Create two versions of the LLM:
     # 1. One that FORCES tool usage (for first iteration - must research)
     # 2. One that allows choosing (for subsequent iterations - can respond)
+    # The plain llm answers without tools once the budget is nearly spent
     llm_force_tools = llm.bind_tools(tools, tool_choice="any")
     llm_optional_tools = llm.bind_tools(tools)
     
-    # Define the agent node
-    def agent_node(state: MessagesState) -> Dict:
-        """Agent reasoning node"""
+    def prepare_call(state: LunaAgentState):
+        """
+        Pick the LLM and prompt for this iteration, or a final message if we must stop.
+        
+        Returns (llm, prompt, final, compacted, low_reason): compacted are the
+        summarized tool outputs that replace the originals in the state, and
+        low_reason is set when the budget is nearly spent.
+        """
         messages = state["messages"]
         iteration_count = state.get("iteration_count", 0)
         
-        # Safety: prevent infinite loops
-        if iteration_count >= max_iterations:
-            return {
+        # Safety: the answer-now call below should always have ended the loop
+        if iteration_count > budget.max_iterations:
+            return None, None, {
                 "messages": [AIMessage(content="I apologize, but I'm having trouble processing this request. Let me connect you with our team directly. You can reach One Development at their official website or contact their sales team for immediate assistance.")]
-            }
+            }, [], None
+        
+        # Summarize tool outputs the model has already read, so later
+        # iterations don't re-send every full tool result
+        compacted = compact_tool_messages(messages)
+        if compacted:
+            messages = apply_replacements(messages, compacted)
         
         # Add system prompt
         system_message = SystemMessage(content=system_prompt)
         
-        # Check if this is the first iteration (no tool results yet)
+        # Budget nearly spent: stop researching and answer with what we have
+        low_reason = budget.low_reason(state)
+        if low_reason:
+            answer_now = SystemMessage(content=(
+                f"Your research budget for this question is spent ({low_reason}). "
+                "Answer the user now using only the information gathered above - do not call tools. "
+                "If something is still missing, say so and suggest contacting One Development."
+            ))
+            return llm, [system_message] + list(messages) + [answer_now], None, compacted, low_reason
+        
+        # Check if this is the first iteration (no tool results yet) - only
+        # this turn counts, a resumed session keeps earlier turns' messages
+        turn_start = max((i for i, msg in enumerate(messages) if isinstance(msg, HumanMessage)), default=0)
         has_tool_results = any(
-            isinstance(msg, ToolMessage) for msg in messages
+            isinstance(msg, ToolMessage) for msg in messages[turn_start:]
         )
         
         # FORCE tool usage on first call (must research before answering)
         # Allow optional tools after we have research results
         if not has_tool_results and iteration_count == 0:
             # First call: MUST use a tool to research
-            response = llm_force_tools.invoke([system_message] + list(messages))
-        else:
-            # Subsequent calls: can choose to respond or use more tools
-            response = llm_optional_tools.invoke([system_message] + list(messages))
+            return llm_force_tools, [system_message] + list(messages), None, compacted, None
+        # Subsequent calls: can choose to respond or use more tools
+        return llm_optional_tools, [system_message] + list(messages), None, compacted, None
+    
+    def record_call(state: LunaAgentState, response, compacted: List, low_reason: Optional[str]) -> Dict:
+        """State update for one LLM call: its message plus the budget it used"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        update = {
+            "messages": compacted + [response],
+            "iteration_count": state.get("iteration_count", 0) + 1,
+            "prompt_tokens": state.get("prompt_tokens", 0) + usage.get("input_tokens", 0),
+            "completion_tokens": state.get("completion_tokens", 0) + usage.get("output_tokens", 0),
+            "tool_calls": state.get("tool_calls", 0) + len(getattr(response, "tool_calls", None) or [])
+        }
+        if low_reason:
+            update["budget_reason"] = low_reason
+        return update
+    
+    # Define the agent node (sync for invoke, async for ainvoke/astream)
+    def agent_node(state: LunaAgentState) -> Dict:
+        """Agent reasoning node"""
+        bound_llm, prompt, final, compacted, low_reason = prepare_call(state)
+        if final is not None:
+            return final
+        
+        response = bound_llm.invoke(prompt)
+        return record_call(state, response, compacted, low_reason)
+    
+    async def aagent_node(state: LunaAgentState) -> Dict:
+        """Async agent reasoning node - awaits the LLM instead of blocking a thread"""
+        bound_llm, prompt, final, compacted, low_reason = prepare_call(state)
+        if final is not None:
+            return final
         
+        # The forced first call nearly always searches the KB for the raw query:
+        # start that search now so the tool can reuse it
+        if bound_llm is llm_force_tools and isinstance(prompt[-1], HumanMessage):
+            prefetch_knowledge_base(prompt[-1].content)
+        
+        response = await bound_llm.ainvoke(prompt)
+        return record_call(state, response, compacted, low_reason)
+    
+    def skip_tools_node(state: LunaAgentState) -> Dict:
+        """Answer the requested tool calls without running them - the budget is spent"""
+        reason = budget.low_reason(state) or "budget"
         return {
-            "messages": [response],
-            "iteration_count": iteration_count + 1
+            "messages": [
+                ToolMessage(
+                    content=f"Not run: the research budget for this question is spent ({reason}).",
+                    tool_call_id=call["id"],
+                    name=call["name"]
+                )
+                for call in state["messages"][-1].tool_calls
+            ],
+            "budget_reason": reason
         }
     
     # Define routing logic
-    def should_continue(state: MessagesState) -> Literal["tools", "end"]:
-        """Decide whether to continue (call tools) or end"""
+    def should_continue(state: LunaAgentState) -> Literal["tools", "skip_tools", "end"]:
+        """Decide whether to continue (call tools, or skip them when over budget) or end"""
         last_message = state["messages"][-1]
         if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-            return "tools"
+            return "skip_tools" if budget.low_reason(state) else "tools"
         return "end"
     
     # Build the graph
-    workflow = StateGraph(MessagesState)
+    workflow = StateGraph(LunaAgentState)
     
     # Add nodes
-    workflow.add_node("agent", agent_node)
+    workflow.add_node("agent", RunnableLambda(agent_node, afunc=aagent_node, name="agent"))
     workflow.add_node("tools", ToolNode(tools))
+    workflow.add_node("skip_tools", skip_tools_node)
     
     # Set entry point
     workflow.set_entry_point("agent")
@@ -223,11 +330,12 @@ def create_luna_agent(tools: List, llm: ChatOpenAI, system_prompt: str, max_iter
     workflow.add_conditional_edges(
         "agent",
         should_continue,
-        {"tools": "tools", "end": END}
+        {"tools": "tools", "skip_tools": "skip_tools", "end": END}
     )
     workflow.add_edge("tools", "agent")
+    workflow.add_edge("skip_tools", "agent")
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 # ============================================================================
@@ -258,7 +366,7 @@ class LunaDeepAgent:
         self.api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         
         # Get all available tools (core + subagents + deepagent enhancements)
-        self.tools = get_all_tools() + get_subagent_tools() + get_deepagent_tools()
+        self.tools = apply_tool_policies(get_all_tools() + get_subagent_tools() + get_deepagent_tools())
         
         # Create the LLM - using gpt-4o for better tool usage
         # Lower temperature to make it more deterministic and follow instructions
@@ -268,12 +376,20 @@ class LunaDeepAgent:
             api_key=self.api_key
         )
         
+        # Graph state per session, so follow-up turns resume instead of rebuilding history
+        self.checkpointer = get_checkpointer()
+        
+        # Per-turn deadline, token and tool call limits
+        self.budget = AgentBudget(max_iterations=10)
+        
         # Create the agent using simplified builder
         self.agent = create_luna_agent(
             tools=self.tools,
             llm=self.llm,
             system_prompt=get_luna_system_prompt(),
-            max_iterations=10
+            max_iterations=10,
+            checkpointer=self.checkpointer,
+            budget=self.budget
         )
         
         print(f"✅ Luna Agent initialized with {len(self.tools)} tools (model: gpt-4o)")
@@ -295,125 +411,9 @@ class LunaDeepAgent:
         Returns:
             Dictionary with response and metadata
         """
-        try:
-            # Build conversation history
-            messages = []
-            
-            if conversation_history:
-                for msg in conversation_history[-10:]:  # Keep last 10 for context
-                    if msg.get('message_type') == 'human':
-                        messages.append(HumanMessage(content=msg['content']))
-                    elif msg.get('message_type') == 'ai':
-                        messages.append(AIMessage(content=msg['content']))
-            
-            # Add current query
-            messages.append(HumanMessage(content=query))
-            
-            # Create initial state
-            initial_state = {
-                "messages": messages,
-                "iteration_count": 0
-            }
-            
-            # Run the agent
-            result = self.agent.invoke(initial_state)
-            
-            # Extract response
-            response_content = ""
-            if "messages" in result:
-                last_message = result["messages"][-1]
-                if hasattr(last_message, 'content'):
-                    response_content = last_message.content
-                else:
-                    response_content = str(last_message)
-            
-            # Extract thinking steps and tools used
-            thinking_steps = []
-            tools_info = []
-            
-            if "messages" in result:
-                for msg in result["messages"]:
-                    # Check for tool calls
-                    if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                        for tool_call in msg.tool_calls:
-                            tool_name = tool_call.get('name', 'unknown')
-                            tool_args = tool_call.get('args', {})
-                            
-                            # Friendly descriptions
-                            tool_descriptions = {
-                                'search_knowledge_base': '🔍 Searching knowledge base',
-                                'search_uploaded_documents': '📄 Searching documents',
-                                'search_web_for_market_data': '🌐 Fetching market data',
-                                'get_dubai_market_context': '📊 Getting market context',
-                                'get_user_context': '🧠 Checking your preferences',
-                                'save_user_information': '💾 Saving your info',
-                                'search_web': '🌐 Searching the web',
-                                'search_one_development_website': '🏢 Searching One Development site',
-                                'download_and_read_pdf': '📄 Reading PDF',
-                                'fetch_project_brochure': '📋 Fetching brochure',
-                                'get_project_details': '🏗️ Getting project details',
-                            }
-                            
-                            friendly_name = tool_descriptions.get(tool_name, f'🔧 {tool_name}')
-                            query_arg = tool_args.get('query', tool_args.get('topic', ''))
-                            
-                            thinking_steps.append({
-                                'type': 'tool_call',
-                                'tool': tool_name,
-                                'description': friendly_name,
-                                'query': query_arg[:100] if query_arg else None
-                            })
-                            
-                            tools_info.append({
-                                'name': tool_name,
-                                'friendly_name': friendly_name,
-                                'args': tool_args
-                            })
-            
-            # Add bookend thinking steps
-            if thinking_steps:
-                thinking_steps.insert(0, {
-                    'type': 'thinking',
-                    'description': '🤔 Analyzing your question...'
-                })
-                thinking_steps.append({
-                    'type': 'responding',
-                    'description': '✨ Generating response...'
-                })
-            
-            return {
-                'response': response_content,
-                'session_id': session_id,
-                'reasoning_steps': len(thinking_steps),
-                'tools_used': len(tools_info),
-                'thinking': thinking_steps,
-                'tools_info': tools_info,
-                'success': True
-            }
-            
-        except Exception as e:
-            print(f"❌ Luna error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            
-            # Graceful fallback
-            return {
-                'response': f"""I apologize, but I encountered an issue processing your request. 
-
-Here's how I can still help:
-- **Visit our website**: www.oneuae.com for property information
-- **Contact our team**: Our sales team can assist you directly
-- **Try again**: Feel free to rephrase your question
-
-Is there something specific about One Development I can try to help you with?""",
-                'session_id': session_id,
-                'reasoning_steps': 0,
-                'tools_used': 0,
-                'thinking': [{'type': 'error', 'description': '❌ Something went wrong'}],
-                'tools_info': [],
-                'success': False,
-                'error': str(e)
-            }
+        # Drive the async path on the background loop so sync callers get the
+        # same concurrency (and knowledge base prefetch) as async ones
+        return run_sync(self.aprocess_query(query, session_id, conversation_history))
     
     async def aprocess_query(
         self,
@@ -422,7 +422,11 @@ Is there something specific about One Development I can try to help you with?"""
         conversation_history: List[Dict] = None
     ) -> Dict[str, Any]:
         """
-        Async version for streaming support.
+        Async version of process_query.
+        
+        Runs the graph with ainvoke: LLM calls are awaited and tools use their async
+        implementations, so one process can hold many concurrent conversations
+        without a thread per request.
         
         Args:
             query: The user's message
@@ -432,9 +436,214 @@ Is there something specific about One Development I can try to help you with?"""
         Returns:
             Dictionary with response and metadata
         """
-        # For now, wrap the sync version
-        # Can be enhanced with true async later
-        return self.process_query(query, session_id, conversation_history)
+        try:
+            config = session_config(session_id)
+            saved = await self.checkpointer.aget_tuple(config)
+            turn_input, turn_start = self._turn_input(query, conversation_history, saved)
+            
+            if saved is None and self._is_first_turn(query, conversation_history):
+                # No history to personalise on: identical first questions asked
+                # at the same time share one graph run
+                result = await get_agent_flights().do(
+                    ('invoke', normalize_question(query)), self.agent.ainvoke, turn_input, config
+                )
+                if await self.checkpointer.aget_tuple(config) is None:
+                    # We joined another session's run - seed this session's state from it
+                    await self.agent.aupdate_state(config, {"messages": result["messages"]}, as_node="agent")
+            else:
+                result = await self.agent.ainvoke(turn_input, config)
+            return self._format_result(result, session_id, turn_start)
+            
+        except Exception as e:
+            return self._error_result(e, session_id)
+    
+    async def astream_query(
+        self,
+        query: str,
+        session_id: str = "default",
+        conversation_history: List[Dict] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the graph's progress node by node.
+        
+        Yields {"node": "agent" | "tools", "messages": [...]} as each step finishes.
+        """
+        config = session_config(session_id)
+        saved = await self.checkpointer.aget_tuple(config)
+        turn_input, _ = self._turn_input(query, conversation_history, saved)
+        async for update in self.agent.astream(turn_input, config, stream_mode="updates"):
+            for node, node_state in update.items():
+                yield {"node": node, "messages": (node_state or {}).get("messages", [])}
+    
+    def has_session_state(self, session_id: str) -> bool:
+        """True when the session has a checkpoint, so callers can skip loading its history"""
+        return self.checkpointer.get_tuple(session_config(session_id)) is not None
+    
+    async def ahas_session_state(self, session_id: str) -> bool:
+        """Async version of has_session_state"""
+        return await self.checkpointer.aget_tuple(session_config(session_id)) is not None
+    
+    def _turn_input(
+        self,
+        query: str,
+        conversation_history: List[Dict] = None,
+        saved: Optional[CheckpointTuple] = None
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Graph input for this turn, and where the turn's messages start in the final state.
+        
+        A session with a checkpoint resumes its graph state, so only the new
+        message goes in - along with removals that window the earlier turns
+        (see HISTORY_MESSAGES). Otherwise the state is rebuilt from the stored
+        history.
+        """
+        if saved is not None:
+            prior_messages = saved.checkpoint["channel_values"].get("messages", [])
+            removals = self._stale_messages(prior_messages)
+            return {
+                "messages": removals + [HumanMessage(content=query)],
+                **self.budget.start_state()
+            }, len(prior_messages) - len(removals)
+        
+        initial_state = self._build_initial_state(query, conversation_history)
+        return initial_state, len(initial_state["messages"]) - 1
+    
+    @staticmethod
+    def _stale_messages(messages: List[BaseMessage]) -> List[RemoveMessage]:
+        """Removals for earlier turns' tool traffic and all but the last HISTORY_MESSAGES of the conversation"""
+        conversation = [
+            msg for msg in messages
+            if isinstance(msg, HumanMessage) or (isinstance(msg, AIMessage) and not msg.tool_calls)
+        ]
+        kept = {id(msg) for msg in conversation[-HISTORY_MESSAGES:]}
+        return [RemoveMessage(id=msg.id) for msg in messages if id(msg) not in kept and msg.id]
+    
+    @staticmethod
+    def _is_first_turn(query: str, conversation_history: List[Dict] = None) -> bool:
+        """True when the history holds nothing but (possibly) the current query itself"""
+        return all(
+            msg.get('message_type') == 'human' and msg.get('content') == query
+            for msg in conversation_history or []
+        )
+    
+    def _build_initial_state(self, query: str, conversation_history: List[Dict] = None) -> Dict[str, Any]:
+        """Convert stored history plus the new query into the graph's input state"""
+        messages = []
+        
+        if conversation_history:
+            for msg in conversation_history[-10:]:  # Keep last 10 for context
+                if msg.get('message_type') == 'human':
+                    messages.append(HumanMessage(content=msg['content']))
+                elif msg.get('message_type') == 'ai':
+                    messages.append(AIMessage(content=msg['content']))
+        
+        # Add current query
+        messages.append(HumanMessage(content=query))
+        
+        return {
+            "messages": messages,
+            **self.budget.start_state()
+        }
+    
+    def _format_result(self, result: Dict[str, Any], session_id: str, turn_start: int = 0) -> Dict[str, Any]:
+        """Extract the response, thinking steps and tools used this turn from the final graph state"""
+        # Extract response
+        response_content = ""
+        if "messages" in result:
+            last_message = result["messages"][-1]
+            if hasattr(last_message, 'content'):
+                response_content = last_message.content
+            else:
+                response_content = str(last_message)
+        
+        # Extract thinking steps and tools used
+        thinking_steps = []
+        tools_info = []
+        
+        if "messages" in result:
+            for msg in result["messages"][turn_start:]:
+                # Check for tool calls
+                if hasattr(msg, 'tool_calls') and msg.tool_calls:
+                    for tool_call in msg.tool_calls:
+                        tool_name = tool_call.get('name', 'unknown')
+                        tool_args = tool_call.get('args', {})
+                        
+                        # Friendly descriptions
+                        tool_descriptions = {
+                            'search_knowledge_base': '🔍 Searching knowledge base',
+                            'search_uploaded_documents': '📄 Searching documents',
+                            'search_web_for_market_data': '🌐 Fetching market data',
+                            'get_dubai_market_context': '📊 Getting market context',
+                            'get_user_context': '🧠 Checking your preferences',
+                            'save_user_information': '💾 Saving your info',
+                            'search_web': '🌐 Searching the web',
+                            'search_one_development_website': '🏢 Searching One Development site',
+                            'download_and_read_pdf': '📄 Reading PDF',
+                            'fetch_project_brochure': '📋 Fetching brochure',
+                            'get_project_details': '🏗️ Getting project details',
+                        }
+                        
+                        friendly_name = tool_descriptions.get(tool_name, f'🔧 {tool_name}')
+                        query_arg = tool_args.get('query', tool_args.get('topic', ''))
+                        
+                        thinking_steps.append({
+                            'type': 'tool_call',
+                            'tool': tool_name,
+                            'description': friendly_name,
+                            'query': query_arg[:100] if query_arg else None
+                        })
+                        
+                        tools_info.append({
+                            'name': tool_name,
+                            'friendly_name': friendly_name,
+                            'args': tool_args
+                        })
+        
+        # Add bookend thinking steps
+        if thinking_steps:
+            thinking_steps.insert(0, {
+                'type': 'thinking',
+                'description': '🤔 Analyzing your question...'
+            })
+            thinking_steps.append({
+                'type': 'responding',
+                'description': '✨ Generating response...'
+            })
+        
+        return {
+            'response': response_content,
+            'session_id': session_id,
+            'reasoning_steps': len(thinking_steps),
+            'tools_used': len(tools_info),
+            'thinking': thinking_steps,
+            'tools_info': tools_info,
+            'budget': self.budget.usage(result),
+            'success': True
+        }
+    
+    def _error_result(self, e: Exception, session_id: str) -> Dict[str, Any]:
+        """Graceful fallback response when the agent run fails"""
+        print(f"❌ Luna error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        
+        return {
+            'response': f"""I apologize, but I encountered an issue processing your request. 
+
+Here's how I can still help:
+- **Visit our website**: www.oneuae.com for property information
+- **Contact our team**: Our sales team can assist you directly
+- **Try again**: Feel free to rephrase your question
+
+Is there something specific about One Development I can try to help you with?""",
+            'session_id': session_id,
+            'reasoning_steps': 0,
+            'tools_used': 0,
+            'thinking': [{'type': 'error', 'description': '❌ Something went wrong'}],
+            'tools_info': [],
+            'success': False,
+            'error': str(e)
+        }
     
     def add_knowledge(self, content: str, metadata: Dict[str, Any] = None):
         """
@@ -447,36 +656,9 @@ Is there something specific about One Development I can try to help you with?"""
             metadata: Optional metadata dict (title, source, etc.)
         """
         try:
-            import chromadb
-            from chromadb.config import Settings
-            
-            # Get or create ChromaDB client
-            chroma_db_path = os.path.join(os.path.dirname(__file__), '..', 'chroma_db')
-            os.makedirs(chroma_db_path, exist_ok=True)
-            
-            client = chromadb.PersistentClient(
-                path=chroma_db_path,
-                settings=Settings(anonymized_telemetry=False, allow_reset=False)
-            )
-            
-            # Get or create collection
-            try:
-                collection = client.get_collection("onedevelopment_knowledge")
-            except:
-                collection = client.create_collection(
-                    name="onedevelopment_knowledge",
-                    metadata={"description": "Knowledge base for One Development"}
-                )
-            
-            # Generate unique ID
-            doc_id = f"doc_{datetime.now().timestamp()}"
-            
-            # Add to collection
-            collection.add(
-                documents=[content],
-                metadatas=[metadata or {}],
-                ids=[doc_id]
-            )
+            # Go through the shared vector store so the chunk's facts are indexed
+            from knowledge.vector_store import get_vector_store
+            get_vector_store().add_texts([content], metadatas=[metadata or {}])
             
             title = metadata.get('title', 'Untitled') if metadata else 'Untitled'
             print(f"✅ Added knowledge: {title[:50]}...")
@@ -0,0 +1,150 @@
+"""
+Management command to benchmark the local claim-support scorer against the
+LLM fact-checker on recorded responses.
+
+Cases come from a JSONL file or from stored streaming answers, which keep a
+capped copy of the context they were verified against in metadata['context'].
+Both are scored against that capped form (claim_support.saved_context).
+
+Reports sentence-level agreement, how often the LLM call would be skipped
+and the latency saved.
+"""
+
+from django.core.management.base import BaseCommand
+from agent.models import Message
+from agent.claim_support import get_claim_support_scorer, split_sentences, is_factual, saved_context
+from agent.verification_guardrails import get_verification_guardrails
+import json
+import re
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark local claim-support scoring against the LLM fact-checker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            help='JSONL file of recorded cases: {"query": ..., "response": ..., "context": [...]}'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of recent AI messages (with saved context) to use when no --file is given'
+        )
+        parser.add_argument(
+            '--record',
+            type=str,
+            help='Write the cases built from the database to this JSONL file'
+        )
+
+    def handle(self, *args, **options):
+        if options['file']:
+            cases = self.load_cases(options['file'])
+        else:
+            cases = self.cases_from_db(options['limit'])
+
+        if options['record']:
+            with open(options['record'], 'w') as f:
+                for case in cases:
+                    f.write(json.dumps(case) + '\n')
+            self.stdout.write(f'💾 Recorded {len(cases)} cases to {options["record"]}')
+
+        if not cases:
+            self.stdout.write(self.style.WARNING('No cases to benchmark'))
+            return
+
+        self.stdout.write(f'\n🧪 Benchmarking {len(cases)} responses')
+        self.stdout.write('-' * 60)
+
+        scorer = get_claim_support_scorer()
+        guardrails = get_verification_guardrails()
+
+        local_times, llm_times = [], []
+        agree = total = 0
+        llm_flagged = local_caught = 0
+        skipped = 0
+
+        for case in cases:
+            start = time.perf_counter()
+            support = scorer.check(case['response'], case['context'])
+            local_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            claims = guardrails._detect_unsupported_claims(case['response'], case['context'], {})
+            llm_times.append(time.perf_counter() - start)
+
+            local_unsupported = {sentence for sentence, _ in support['unsupported']}
+            if not local_unsupported:
+                skipped += 1
+
+            for sentence in split_sentences(case['response']):
+                if not is_factual(sentence):
+                    continue
+                flagged_by_llm = any(self.claim_matches(claim, sentence) for claim in claims)
+                flagged_locally = sentence in local_unsupported
+                total += 1
+                agree += flagged_by_llm == flagged_locally
+                if flagged_by_llm:
+                    llm_flagged += 1
+                    local_caught += flagged_locally
+
+        mean_local = statistics.mean(local_times) * 1000
+        mean_llm = statistics.mean(llm_times) * 1000
+        skip_rate = skipped / len(cases)
+
+        self.stdout.write(f'📊 Sentences checked: {total}')
+        self.stdout.write(f'   Agreement with LLM checker: {agree / max(total, 1):.1%}')
+        self.stdout.write(f'   LLM-flagged sentences also flagged locally: {local_caught}/{llm_flagged}')
+        self.stdout.write(f'⏱️  Local scorer: {mean_local:.1f} ms/response')
+        self.stdout.write(f'⏱️  LLM checker:  {mean_llm:.1f} ms/response')
+        self.stdout.write(f'⚡ LLM call skipped for {skip_rate:.1%} of responses')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Estimated saving: {skip_rate * mean_llm - mean_local:.1f} ms/response'
+        ))
+
+    def load_cases(self, path):
+        """Load recorded cases from a JSONL file"""
+        with open(path) as f:
+            cases = [json.loads(line) for line in f if line.strip()]
+        for case in cases:
+            case['context'] = saved_context(case['context'])
+        return cases
+
+    def cases_from_db(self, limit):
+        """Build cases from stored AI messages and the context they were verified against"""
+        cases = []
+        ai_messages = Message.objects.filter(
+            message_type='ai',
+            metadata__has_key='context'
+        ).select_related('conversation').order_by('-created_at')[:limit]
+        for ai_message in ai_messages:
+            context = ai_message.metadata.get('context')
+            if not context:
+                continue
+            question = Message.objects.filter(
+                conversation=ai_message.conversation,
+                message_type='human',
+                created_at__lte=ai_message.created_at
+            ).order_by('-created_at').first()
+
+            # Score the answer as generated, not a verification revision
+            revisions = ai_message.metadata.get('revisions') or []
+            cases.append({
+                'query': question.content if question else '',
+                'response': revisions[0]['content'] if revisions else ai_message.content,
+                'context': saved_context(context)
+            })
+        return cases
+
+    @staticmethod
+    def claim_matches(claim, sentence):
+        """Whether an LLM-reported claim refers to this sentence"""
+        claim_words = set(re.findall(r'\w+', claim.lower()))
+        sentence_words = set(re.findall(r'\w+', sentence.lower()))
+        if not claim_words:
+            return False
+        return claim.lower() in sentence.lower() or len(claim_words & sentence_words) / len(claim_words) >= 0.6
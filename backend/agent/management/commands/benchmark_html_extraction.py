@@ -0,0 +1,197 @@
+"""
+Management command to benchmark HTML main-content extraction on saved pages.
+
+Compares agent.html_extract with the BeautifulSoup extraction the ingestor and
+WebAccessTool used before it: throughput, output size, how much of the output
+is repeated text, and fact recall - the share of the prices, areas, bedroom
+counts, years, phones and emails in the page's readable text (everything but
+scripts, nav, header and footer) that survive extraction.
+
+Pages are read from a directory of saved .html files; --fetch saves pages of
+oneuae.com there first. A few hand-written pages with the shapes extraction
+has got wrong before (price tables and payment-plan lists, facts in adjacent
+spans, pages with no long paragraph) are always added unless --no-samples.
+"""
+
+from django.core.management.base import BaseCommand
+from bs4 import BeautifulSoup
+from agent.crawler import SiteCrawler
+from agent.html_extract import extract
+from knowledge.fact_index import extract_facts
+import os
+import re
+import statistics
+import time
+
+
+SAMPLE_PAGES = [
+    # Price table and payment plan under headings
+    '<html><body><h1>Laguna Residence</h1><h2>Pricing</h2><table>'
+    '<tr><th>Unit</th><th>Size</th><th>Price</th></tr>'
+    '<tr><td>1 Bedroom</td><td>750 sq ft</td><td>AED 1,200,000</td></tr>'
+    '<tr><td>2 Bedroom</td><td>1,100 sq ft</td><td>AED 1,900,000</td></tr>'
+    '<tr><td>3 Bedroom</td><td>1,600 sq ft</td><td>AED 2,800,000</td></tr></table>'
+    '<h2>Payment plan</h2><ul><li>10% on booking</li><li>50% during construction</li>'
+    '<li>40% on handover in 2027</li></ul></body></html>',
+    # Listing cards with facts in adjacent inline elements
+    '<html><body><h2>Our projects</h2><div class="cards">'
+    '<div class="card"><h3>Sky Tower</h3><span>2-3 Bedrooms</span><span>AED 2,500,000</span></div>'
+    '<div class="card"><h3>Sea Tower</h3><span>1-2 Bedrooms</span><strong>AED 1,350,000</strong>'
+    '<span>Handover 2026</span></div></div></body></html>',
+    # No heading and no long paragraph
+    '<html><body><p>Call +971 4 123 4567 or email sales@oneuae.com</p>'
+    '<table><tr><td>Studio</td><td>AED 650,000</td></tr></table></body></html>',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark main-content extraction against the previous BeautifulSoup extraction'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages-dir',
+            type=str,
+            default='benchmark_pages',
+            help='Directory of saved HTML pages'
+        )
+        parser.add_argument(
+            '--fetch',
+            type=int,
+            default=0,
+            help='Crawl and save this many oneuae.com pages into --pages-dir first'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Times each extractor runs over the pages (the best run is reported)'
+        )
+        parser.add_argument(
+            '--no-samples',
+            action='store_true',
+            help='Leave out the built-in sample pages'
+        )
+
+    def handle(self, *args, **options):
+        pages_dir = options['pages_dir']
+        if options['fetch']:
+            self.save_pages(pages_dir, options['fetch'])
+
+        pages = self.load_pages(pages_dir)
+        if not options['no_samples']:
+            pages += SAMPLE_PAGES
+        if not pages:
+            self.stdout.write(self.style.WARNING(f'No .html pages in {pages_dir} (use --fetch to save some)'))
+            return
+
+        total_bytes = sum(len(html.encode('utf-8')) for html in pages)
+        self.stdout.write(f'\n🧪 Benchmarking {len(pages)} pages ({total_bytes / 1024:.0f} KB)')
+        self.stdout.write('-' * 60)
+
+        extractors = [
+            ('ingestor (before)', self.legacy_ingestor),
+            ('web tool (before)', self.legacy_web_tool),
+            ('html_extract', lambda html: extract(html).text),
+        ]
+        references = [self.facts(self.legacy_web_tool(html)) for html in pages]
+        timings = {}
+        for name, extractor in extractors:
+            runs, outputs = [], []
+            for _ in range(max(1, options['repeat'])):
+                start = time.perf_counter()
+                outputs = [extractor(html) for html in pages]
+                runs.append(time.perf_counter() - start)
+
+            best = min(runs)
+            timings[name] = best
+            sizes = [len(output) for output in outputs]
+            self.stdout.write(f'📄 {name}')
+            self.stdout.write(f'   ⏱️  {len(pages) / best:.1f} pages/s, {total_bytes / best / 1024 / 1024:.2f} MB/s')
+            self.stdout.write(f'   Output: {statistics.mean(sizes):.0f} chars/page (max {max(sizes)})')
+            self.stdout.write(f'   Repeated text: {self.repeated_ratio(outputs):.1%}')
+            self.stdout.write(f'   Fact recall: {self.fact_recall(outputs, references):.1%}')
+            if not options['no_samples']:
+                samples = len(SAMPLE_PAGES)
+                recall = self.fact_recall(outputs[-samples:], references[-samples:])
+                self.stdout.write(f'   Fact recall (sample pages): {recall:.1%}')
+
+        speedup = timings['ingestor (before)'] / timings['html_extract']
+        self.stdout.write(self.style.SUCCESS(f'✅ html_extract is {speedup:.1f}x the ingestor extraction'))
+
+    def save_pages(self, pages_dir, max_pages):
+        """Crawl oneuae.com and save each page's HTML"""
+        os.makedirs(pages_dir, exist_ok=True)
+        crawler = SiteCrawler('https://www.oneuae.com', max_pages=max_pages, use_sitemaps=True)
+        saved = 0
+        for page in crawler.crawl():
+            if page.not_modified or not page.html:
+                continue
+            name = re.sub(r'[^a-zA-Z0-9]+', '_', page.url.split('://', 1)[-1]).strip('_')[:150]
+            with open(os.path.join(pages_dir, f'{name}.html'), 'w', encoding='utf-8') as f:
+                f.write(page.html)
+            saved += 1
+        self.stdout.write(f'💾 Saved {saved} pages to {pages_dir}')
+
+    def load_pages(self, pages_dir):
+        if not os.path.isdir(pages_dir):
+            return []
+        pages = []
+        for filename in sorted(os.listdir(pages_dir)):
+            if filename.endswith(('.html', '.htm')):
+                with open(os.path.join(pages_dir, filename), encoding='utf-8', errors='replace') as f:
+                    pages.append(f.read())
+        return pages
+
+    @staticmethod
+    def legacy_ingestor(html):
+        """OneDevelopmentDataIngestor's extraction before html_extract (untruncated)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        for script in soup(["script", "style", "nav", "footer"]):
+            script.decompose()
+        text_content = []
+        for area in soup.find_all(['article', 'main', 'section', 'div']):
+            text = area.get_text(separator=' ', strip=True)
+            if len(text) > 100:
+                text_content.append(text)
+        return re.sub(r'\s+', ' ', ' '.join(text_content)).strip()
+
+    @staticmethod
+    def legacy_web_tool(html):
+        """WebAccessTool.extract_text_from_html before html_extract"""
+        soup = BeautifulSoup(html, 'html.parser')
+        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
+            element.decompose()
+        return re.sub(r'\s+', ' ', soup.get_text(separator=' ', strip=True)).strip()
+
+    @staticmethod
+    def facts(text):
+        """(kind, value) pairs of the facts verification checks (bare numbers aside)"""
+        return {
+            (kind, value)
+            for kind, values in extract_facts(text).items() if kind != 'numbers'
+            for value in values
+        }
+
+    def fact_recall(self, outputs, references):
+        """Share of the readable text's facts that are in the extracted text"""
+        found = total = 0
+        for output, reference in zip(outputs, references):
+            found += len(self.facts(output) & reference)
+            total += len(reference)
+        return found / total if total else 1.0
+
+    @staticmethod
+    def repeated_ratio(outputs):
+        """Share of sentences that already appeared earlier on the same page"""
+        repeated = total = 0
+        for output in outputs:
+            seen = set()
+            for sentence in re.split(r'(?<=[.!?])\s+', output):
+                sentence = sentence.strip().lower()
+                if len(sentence) < 20:
+                    continue
+                total += 1
+                if sentence in seen:
+                    repeated += 1
+                seen.add(sentence)
+        return repeated / total if total else 0.0
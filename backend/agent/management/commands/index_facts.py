@@ -0,0 +1,53 @@
+"""
+Management command to backfill the fact index for knowledge base chunks
+ingested before facts were extracted at ingestion time.
+"""
+
+from django.core.management.base import BaseCommand
+from knowledge.vector_store import get_vector_store
+from knowledge.fact_index import index_metadata, METADATA_PREFIX
+
+
+class Command(BaseCommand):
+    help = 'Extract and store structured facts (prices, sizes, bedrooms, ...) for existing chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Chunks to read and update per batch'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-index chunks that already have facts'
+        )
+
+    def handle(self, *args, **options):
+        vector_store = get_vector_store()
+        collection = vector_store.collection
+        total = collection.count()
+        batch_size = options['batch_size']
+        indexed = skipped = 0
+
+        self.stdout.write(f'\n🔎 Indexing facts for {total} chunks')
+
+        for offset in range(0, total, batch_size):
+            batch = collection.get(offset=offset, limit=batch_size, include=['documents', 'metadatas'])
+
+            ids, metadatas = [], []
+            for doc_id, document, metadata in zip(batch['ids'], batch['documents'], batch['metadatas']):
+                if not options['force'] and (metadata or {}).get(f'{METADATA_PREFIX}indexed'):
+                    skipped += 1
+                    continue
+                # Drop stale fact fields before re-indexing
+                clean = {k: v for k, v in (metadata or {}).items() if not k.startswith(METADATA_PREFIX)}
+                ids.append(doc_id)
+                metadatas.append(index_metadata(document or '', clean))
+
+            if ids:
+                vector_store.update_metadatas(ids, metadatas)
+                indexed += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {indexed} chunks ({skipped} already indexed)'))
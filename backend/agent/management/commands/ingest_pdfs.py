@@ -8,8 +8,8 @@ from django.core.files.base import ContentFile
 from agent.models import PDFDocument, KnowledgeBase
 from agent.pdf_processor import PDFProcessor
 from knowledge.vector_store import get_vector_store
+from agent.http_client import fetch
 import os
-import requests
 import time
 
 
@@ -100,7 +100,7 @@ class Command(BaseCommand):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=30)
+            response = fetch(url, headers=headers, timeout=30)
             response.raise_for_status()
             
             # Get filename from URL or headers
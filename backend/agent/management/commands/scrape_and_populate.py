@@ -10,11 +10,10 @@ This command will:
 from django.core.management.base import BaseCommand
 from agent.models import KnowledgeBase
 from knowledge.vector_store import get_vector_store
-import requests
-from bs4 import BeautifulSoup
+from agent.crawler import SiteCrawler, CRAWL_WORKERS
+from agent.recrawl import IncrementalIndexer
 import time
 import re
-from urllib.parse import urljoin, urlparse
 
 
 class Command(BaseCommand):
@@ -25,13 +24,30 @@ class Command(BaseCommand):
             '--max-pages',
             type=int,
             default=30,
-            help='Maximum number of pages to scrape'
+            help='Maximum number of pages to scrape (new pages, with --incremental)'
         )
         parser.add_argument(
             '--skip-scrape',
             action='store_true',
             help='Skip website scraping, only add curated knowledge'
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Recrawl known pages with conditional GETs and update only new or changed ones'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=CRAWL_WORKERS,
+            help='Pages fetched concurrently while scraping'
+        )
+        parser.add_argument(
+            '--crawl-state',
+            type=str,
+            default=None,
+            help='File to save crawl progress to; an interrupted crawl resumes from it'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING('🚀 Starting One Development Knowledge Base Population...'))
@@ -47,7 +63,10 @@ class Command(BaseCommand):
         # Step 2: Scrape website (unless skipped)
         if not options['skip_scrape']:
             self.stdout.write('\n🌐 Scraping One Development website...')
-            scraped_count = self.scrape_website(vector_store, options['max_pages'])
+            scrape = self.recrawl_website if options['incremental'] else self.scrape_website
+            scraped_count = scrape(
+                vector_store, options['max_pages'], options['workers'], options['crawl_state']
+            )
             total_added += scraped_count
         
         # Step 3: Add web-sourced information
@@ -490,93 +509,113 @@ For more questions, visit www.oneuae.com or contact our team.
         self.stdout.write(self.style.SUCCESS(f'  Added {count} curated entries'))
         return count
 
-    def scrape_website(self, vector_store, max_pages):
-        """Scrape the One Development website"""
+    SITE_URL = "https://www.oneuae.com"
+    SITE_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+
+    def extract_page(self, page):
+        """Title and main text of a crawled page, or None if it has little content"""
+        extracted = page.extracted
+        title_text = extracted.title or page.url
         
-        base_url = "https://www.oneuae.com"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        # Clean up
+        text_content = re.sub(r'\s+', ' ', extracted.text).strip()
         
-        visited_urls = set()
-        urls_to_visit = [base_url]
+        if len(text_content) <= 200:  # Only substantial content
+            return None
+        return title_text, text_content[:5000]
+
+    def scrape_website(self, vector_store, max_pages, workers=CRAWL_WORKERS, state_path=None):
+        """Scrape the One Development website"""
+        
+        crawler = SiteCrawler(
+            self.SITE_URL,
+            max_pages=max_pages,
+            workers=workers,
+            headers=self.SITE_HEADERS,
+            timeout=15,
+            state_path=state_path
+        )
         count = 0
         
-        while urls_to_visit and len(visited_urls) < max_pages:
-            url = urls_to_visit.pop(0)
-            
-            if url in visited_urls:
-                continue
-            
+        for page in crawler.crawl():
+            url = page.url
             try:
                 self.stdout.write(f"  Scraping: {url}")
-                response = requests.get(url, headers=headers, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extract title
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else url
+                extracted = self.extract_page(page)
                 
-                # Remove unwanted elements
-                for element in soup(['script', 'style', 'nav', 'footer', 'header', 'noscript']):
-                    element.decompose()
-                
-                # Extract main content
-                main_content = soup.find('main') or soup.find('article') or soup.find('body')
-                
-                if main_content:
-                    text_content = main_content.get_text(separator='\n', strip=True)
-                    # Clean up
-                    text_content = re.sub(r'\n+', '\n', text_content)
-                    text_content = re.sub(r'\s+', ' ', text_content)
+                if extracted:
+                    title_text, text_content = extracted
+                    # Save to database
+                    kb_entry, created = KnowledgeBase.objects.get_or_create(
+                        source_url=url,
+                        defaults={
+                            'title': title_text[:200],
+                            'content': text_content,
+                            'summary': text_content[:500],
+                            'source_type': 'website',
+                            'is_active': True
+                        }
+                    )
                     
-                    if len(text_content) > 200:  # Only substantial content
-                        # Save to database
-                        kb_entry, created = KnowledgeBase.objects.get_or_create(
-                            source_url=url,
-                            defaults={
-                                'title': title_text[:200],
-                                'content': text_content[:5000],
-                                'summary': text_content[:500],
-                                'source_type': 'website',
-                                'is_active': True
-                            }
+                    if created:
+                        vector_store.add_texts(
+                            texts=[text_content],
+                            metadatas=[{'title': title_text, 'url': url, 'source': 'website'}]
                         )
-                        
-                        if created:
-                            vector_store.add_texts(
-                                texts=[text_content[:5000]],
-                                metadatas=[{'title': title_text, 'url': url, 'source': 'website'}]
-                            )
-                            count += 1
-                            self.stdout.write(f"    ✅ Saved: {title_text[:50]}...")
-                
-                visited_urls.add(url)
-                
-                # Find links to follow
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    full_url = urljoin(url, href)
-                    
-                    # Only follow internal links
-                    if urlparse(full_url).netloc == urlparse(base_url).netloc:
-                        if full_url not in visited_urls and full_url not in urls_to_visit:
-                            # Skip common non-content pages
-                            skip_patterns = ['#', 'javascript:', 'mailto:', 'tel:', '.pdf', '.jpg', '.png']
-                            if not any(p in full_url.lower() for p in skip_patterns):
-                                urls_to_visit.append(full_url)
-                
-                time.sleep(1)  # Be polite
+                        count += 1
+                        self.stdout.write(f"    ✅ Saved: {title_text[:50]}...")
                 
             except Exception as e:
                 self.stdout.write(self.style.WARNING(f"    ⚠️ Error: {str(e)[:50]}"))
                 continue
         
-        self.stdout.write(self.style.SUCCESS(f'  Scraped {count} pages from website'))
+        self.stdout.write(self.style.SUCCESS(
+            f'  Scraped {count} pages from website ({crawler.fetched} fetched, {crawler.failed} failed)'
+        ))
         return count
 
+    def recrawl_website(self, vector_store, max_pages, workers=CRAWL_WORKERS, state_path=None):
+        """Incrementally recrawl the website, updating only new and changed pages"""
+        
+        indexer = IncrementalIndexer(source_type='website', vector_store=vector_store)
+        # Every indexed page is revalidated; max_pages limits the new ones
+        crawler = SiteCrawler(
+            self.SITE_URL,
+            max_pages=indexer.crawl_budget(max_pages),
+            workers=workers,
+            headers=self.SITE_HEADERS,
+            timeout=15,
+            state_path=state_path,
+            seeds=indexer.known_urls(),
+            validators=indexer.validators
+        )
+        
+        for page in crawler.crawl():
+            if page.not_modified:
+                indexer.mark_not_modified(page.url, page.headers)
+                continue
+            try:
+                extracted = self.extract_page(page)
+                if not extracted:
+                    indexer.skip()
+                    continue
+                title_text, text_content = extracted
+                outcome = indexer.index(page.url, title_text, text_content, page.headers)
+                if outcome != 'unchanged':
+                    self.stdout.write(f"    ✅ {outcome.capitalize()}: {title_text[:50]}...")
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"    ⚠️ Error on {page.url}: {str(e)[:50]}"))
+        
+        report = indexer.finish(crawler)
+        self.stdout.write(self.style.SUCCESS(
+            f"  Recrawl: {report['added']} added, {report['changed']} changed, "
+            f"{report['unchanged']} unchanged ({report['not_modified']} not modified), "
+            f"{report['skipped']} skipped, {report['failed']} failed"
+        ))
+        return report['added'] + report['changed']
+
     def add_web_sourced_info(self, vector_store):
         """Add information gathered from web searches"""
         
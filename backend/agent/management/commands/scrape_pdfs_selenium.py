@@ -313,7 +313,7 @@ class Command(BaseCommand):
     def download_and_save_pdf(self, url, project_name, driver):
         """Download PDF and save to database"""
         try:
-            import requests
+            from agent.http_client import fetch
             
             # Get cookies from Selenium session
             cookies = {c['name']: c['value'] for c in driver.get_cookies()}
@@ -323,7 +323,7 @@ class Command(BaseCommand):
                 'Referer': self.project_urls.get(project_name, 'https://www.oneuae.com')
             }
             
-            response = requests.get(url, headers=headers, cookies=cookies, timeout=30)
+            response = fetch(url, headers=headers, cookies=cookies, timeout=30, revalidate=False)
             response.raise_for_status()
             
             # Determine filename
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 09:12
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0002_pdfdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentCheckpoint',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('session_id', models.CharField(max_length=255)),
+                ('checkpoint_ns', models.CharField(blank=True, default='', max_length=255)),
+                ('checkpoint_id', models.CharField(max_length=64)),
+                ('parent_checkpoint_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('checkpoint_type', models.CharField(max_length=32)),
+                ('checkpoint', models.BinaryField()),
+                ('metadata_type', models.CharField(max_length=32)),
+                ('checkpoint_metadata', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='agentcheckpoint',
+            constraint=models.UniqueConstraint(fields=('session_id', 'checkpoint_ns'), name='unique_session_checkpoint'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agent', '0003_agentcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='knowledgebase',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='knowledgebase',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='knowledgebase',
+            name='last_crawled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='knowledgebase',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='knowledgebase',
+            index=models.Index(fields=['source_url'], name='agent_knowl_source__d522cc_idx'),
+        ),
+    ]
@@ -61,11 +61,18 @@ class KnowledgeBase(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    # Recrawl state: validators for conditional GETs and a hash of the stored content
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    last_crawled_at = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['source_type', 'is_active']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['source_url']),
         ]
     
     def __str__(self):
@@ -130,3 +137,25 @@ class PDFDocument(models.Model):
     def __str__(self):
         return self.title
 
+
+
+class AgentCheckpoint(models.Model):
+    """Latest LangGraph state of a chat session, so follow-up turns resume it"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session_id = models.CharField(max_length=255)
+    checkpoint_ns = models.CharField(max_length=255, blank=True, default='')
+    checkpoint_id = models.CharField(max_length=64)
+    parent_checkpoint_id = models.CharField(max_length=64, blank=True, null=True)
+    checkpoint_type = models.CharField(max_length=32)
+    checkpoint = models.BinaryField()
+    metadata_type = models.CharField(max_length=32)
+    checkpoint_metadata = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session_id', 'checkpoint_ns'], name='unique_session_checkpoint'),
+        ]
+    
+    def __str__(self):
+        return f"Checkpoint {self.session_id} @ {self.checkpoint_id}"
@@ -0,0 +1,186 @@
+"""
+Incremental recrawl of website knowledge.
+
+scrape_and_populate used to skip every URL it already had (so page updates
+were never picked up), and ingest_data(source='website') re-created every row
+and vector on each run. IncrementalIndexer keeps each page's ETag,
+Last-Modified and a hash of its normalized content on its KnowledgeBase row:
+
+- the crawler sends the stored validators, so unchanged pages come back as
+  304s without a download
+- pages that are downloaded are compared by content hash
+- only new and changed pages are written, and only their vector chunks are
+  replaced - unchanged pages cost neither a write nor an embedding
+
+The report counts added, changed and unchanged pages.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from django.utils import timezone
+
+from knowledge.vector_store import get_vector_store
+
+
+def normalize_content(text: str) -> str:
+    """Content as compared between crawls (whitespace differences don't count)"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_content(text).encode('utf-8')).hexdigest()
+
+
+@dataclass
+class RecrawlReport:
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    not_modified: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class IncrementalIndexer:
+    """Syncs crawled pages into KnowledgeBase and the vector store, re-embedding only changes"""
+
+    def __init__(self, source_type: str = 'website', vector_store=None):
+        from agent.models import KnowledgeBase
+
+        self.source_type = source_type
+        self.vector_store = vector_store or get_vector_store()
+        self.report = RecrawlReport()
+
+        # Newest row per URL (older duplicates from earlier full re-ingests are left alone)
+        self._rows: Dict[str, Any] = {}
+        rows = KnowledgeBase.objects.filter(source_type=source_type, source_url__isnull=False)
+        for row in rows.order_by('-created_at'):
+            self._rows.setdefault(row.source_url, row)
+
+    def known_urls(self) -> List[str]:
+        """Every URL already indexed, to seed the crawl with"""
+        return list(self._rows)
+
+    def crawl_budget(self, new_pages: int) -> int:
+        """Pages to fetch so every indexed page is revalidated, plus up to new_pages others"""
+        return len(self._rows) + new_pages
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional-GET headers for a known URL (safe to call from crawler threads)"""
+        row = self._rows.get(url)
+        if row is None or not row.content_hash:
+            return {}
+        headers = {}
+        if row.etag:
+            headers['If-None-Match'] = row.etag
+        if row.last_modified:
+            headers['If-Modified-Since'] = row.last_modified
+        return headers
+
+    def mark_not_modified(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """Record a 304 for a known page, keeping any validators the 304 carries"""
+        self.report.not_modified += 1
+        self.report.unchanged += 1
+        row = self._rows.get(url)
+        if row is None:
+            return
+        update_fields = ['last_crawled_at']
+        for field, value in self._validators(headers).items():
+            if value and value != getattr(row, field):
+                setattr(row, field, value)
+                update_fields.append(field)
+        row.last_crawled_at = timezone.now()
+        row.save(update_fields=update_fields)
+
+    @staticmethod
+    def _validators(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """ETag and Last-Modified of a response, as stored on the row"""
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        return {
+            'etag': headers.get('etag', '')[:255],
+            'last_modified': headers.get('last-modified', '')[:64],
+        }
+
+    def skip(self):
+        """Record a page without enough content to index"""
+        self.report.skipped += 1
+
+    def index(self, url: str, title: str, content: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        Add or update one page.
+
+        Args:
+            url: Page URL
+            title: Page title
+            content: Text to store and embed
+            headers: Response headers (for the ETag / Last-Modified)
+
+        Returns:
+            'added', 'changed' or 'unchanged'
+        """
+        from agent.models import KnowledgeBase
+
+        new_hash = content_hash(content)
+        validators = self._validators(headers)
+        now = timezone.now()
+        row = self._rows.get(url)
+
+        if row is not None and (row.content_hash or content_hash(row.content)) == new_hash:
+            # Same content - just remember the validators for the next conditional GET
+            row.content_hash = new_hash
+            row.etag, row.last_modified = validators['etag'], validators['last_modified']
+            row.last_crawled_at = now
+            row.save(update_fields=['content_hash', 'etag', 'last_modified', 'last_crawled_at'])
+            self.report.unchanged += 1
+            return 'unchanged'
+
+        if row is not None:
+            # Drop the page's old chunks (rows from before vector_ids were tracked match by URL)
+            old_ids = (row.metadata or {}).get('vector_ids')
+            self.vector_store.delete_texts(ids=old_ids, where=None if old_ids else {'url': url})
+
+        vector_ids = self.vector_store.add_texts(
+            texts=[content],
+            metadatas=[{'title': title, 'url': url, 'source': self.source_type}]
+        )
+
+        if row is None:
+            self._rows[url] = KnowledgeBase.objects.create(
+                source_type=self.source_type,
+                source_url=url,
+                title=title[:200],
+                content=content,
+                summary=content[:500],
+                content_hash=new_hash,
+                last_crawled_at=now,
+                metadata={'vector_ids': vector_ids},
+                **validators
+            )
+            self.report.added += 1
+            return 'added'
+
+        row.title = title[:200]
+        row.content = content
+        row.summary = content[:500]
+        row.content_hash = new_hash
+        row.etag, row.last_modified = validators['etag'], validators['last_modified']
+        row.last_crawled_at = now
+        row.metadata = {**(row.metadata or {}), 'vector_ids': vector_ids}
+        row.is_active = True
+        row.save()
+        self.report.changed += 1
+        return 'changed'
+
+    def finish(self, crawler=None) -> Dict[str, int]:
+        """The report, including fetch failures from the crawler"""
+        if crawler is not None:
+            self.report.failed = crawler.failed
+        print(f"🔄 Recrawl: {self.report.added} added, {self.report.changed} changed, "
+              f"{self.report.unchanged} unchanged ({self.report.not_modified} not modified)")
+        return self.report.as_dict()
@@ -0,0 +1,206 @@
+"""
+Cross-session cache for Luna's tool results.
+
+Web searches, market lookups, scraped pages and brochures are the same for
+every user, but each conversation used to fetch them again. ToolResultCache
+keeps good tool results for a per-tool TTL:
+
+- memory: a size-bounded LRU, shared by every session in the process
+- disk (optional): a SQLite file that survives restarts and is shared by
+  workers on the same host - enabled by setting LUNA_TOOL_CACHE_DB
+
+Hits, misses and evictions are counted per tool for the health endpoint.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from agent.async_runtime import run_blocking
+
+
+TOOL_CACHE_ENABLED = os.getenv('LUNA_TOOL_CACHE', 'true').lower() == 'true'
+
+# Results kept in memory
+TOOL_CACHE_ENTRIES = int(os.getenv('LUNA_TOOL_CACHE_ENTRIES', '2048'))
+
+# SQLite file for the disk tier (empty = memory only)
+TOOL_CACHE_DB = os.getenv('LUNA_TOOL_CACHE_DB', '')
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Seconds a result stays fresh, per tool (tools not listed aren't cached)
+TOOL_CACHE_TTLS = {
+    'search_web': 6 * HOUR,
+    'search_web_for_market_data': DAY,
+    'tavily_search': 6 * HOUR,
+    'tavily_research': DAY,
+    'scrape_webpage': 6 * HOUR,
+    'search_one_development_website': DAY,
+    'fetch_project_brochure': DAY,
+    'find_and_read_brochure': DAY,
+    'property_portals': DAY,
+}
+
+# Expired disk rows are purged every this many writes
+_PURGE_EVERY = 256
+
+
+class _Stats:
+    def __init__(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+class ToolResultCache:
+    """TTL + LRU cache of tool results, with an optional SQLite tier"""
+
+    def __init__(self, max_entries: int = TOOL_CACHE_ENTRIES, db_path: str = TOOL_CACHE_DB):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._memory: 'OrderedDict[Tuple[str, str], Tuple[float, Any]]' = OrderedDict()
+        self._stats: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        if db_path:
+            self._open_db()
+
+    def _open_db(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS tool_cache ('
+            'namespace TEXT, key TEXT, value TEXT, expires_at REAL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        self._db.commit()
+
+    def _stat(self, namespace: str) -> _Stats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = _Stats()
+        return stats
+
+    # ------------------------------------------------------------------
+    # Sync API
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """The cached value, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            stats = self._stat(namespace)
+            entry = self._memory.get((namespace, key))
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end((namespace, key))
+                    stats.hits += 1
+                    return entry[1]
+                del self._memory[(namespace, key)]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT value, expires_at FROM tool_cache WHERE namespace = ? AND key = ?',
+                    (namespace, key)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    value = json.loads(row[0])
+                    self._remember((namespace, key), row[1], value)
+                    stats.hits += 1
+                    stats.disk_hits += 1
+                    return value
+
+            stats.misses += 1
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        """Cache a value for ttl seconds"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._stat(namespace).sets += 1
+            self._remember((namespace, key), expires_at, value)
+
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO tool_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    (namespace, key, json.dumps(value), expires_at)
+                )
+                self._writes += 1
+                if self._writes % _PURGE_EVERY == 0:
+                    self._db.execute('DELETE FROM tool_cache WHERE expires_at <= ?', (time.time(),))
+                self._db.commit()
+
+    def _remember(self, cache_key: Tuple[str, str], expires_at: float, value: Any):
+        self._memory[cache_key] = (expires_at, value)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_entries:
+            evicted, _ = self._memory.popitem(last=False)
+            self._stat(evicted[0]).evictions += 1
+
+    def clear(self, namespace: str = None):
+        """Drop cached results (of one tool, or all)"""
+        with self._lock:
+            for cache_key in [k for k in self._memory if namespace is None or k[0] == namespace]:
+                del self._memory[cache_key]
+            if self._db is not None:
+                if namespace is None:
+                    self._db.execute('DELETE FROM tool_cache')
+                else:
+                    self._db.execute('DELETE FROM tool_cache WHERE namespace = ?', (namespace,))
+                self._db.commit()
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def aget(self, namespace: str, key: str) -> Optional[Any]:
+        if self._db is None:
+            return self.get(namespace, key)
+        # The disk tier blocks, keep it off the event loop
+        return await run_blocking(self.get, namespace, key)
+
+    async def aset(self, namespace: str, key: str, value: Any, ttl: float):
+        if self._db is None:
+            self.set(namespace, key, value, ttl)
+        else:
+            await run_blocking(self.set, namespace, key, value, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'disk': bool(self._db is not None),
+                'tools': {namespace: stats.as_dict() for namespace, stats in self._stats.items()}
+            }
+
+
+# Singleton instance
+_tool_cache = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Get singleton instance of the tool result cache"""
+    global _tool_cache
+    if _tool_cache is None:
+        _tool_cache = ToolResultCache()
+    return _tool_cache
@@ -0,0 +1,193 @@
+"""
+Single-flight deduplication for Luna.
+
+When many users ask the same question within seconds (campaign spikes), each
+request would otherwise repeat the same web searches, PDF downloads and LLM
+run. SingleFlight coalesces identical in-flight work: the first caller (the
+leader) does it, identical callers that arrive while it is still running
+(followers) await the leader's result - or, for streams, replay and then
+follow the leader's events.
+
+Only in-flight work is shared; nothing is cached once it finishes. Work is
+keyed per event loop, and is cancelled only when every caller waiting on it
+has gone away.
+"""
+
+import asyncio
+import json
+import os
+import re
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List
+
+
+SINGLE_FLIGHT_ENABLED = os.getenv('LUNA_SINGLE_FLIGHT', 'true').lower() == 'true'
+
+
+def call_key(name: str, *args, **kwargs) -> str:
+    """Stable key for a call, e.g. a tool name and its arguments"""
+    return json.dumps([name, args, kwargs], sort_keys=True, default=str)
+
+
+def normalize_question(question: str) -> str:
+    """Collapse case, whitespace and trailing punctuation so near-identical questions match"""
+    return re.sub(r'\s+', ' ', question).strip().rstrip('?!.').strip().lower()
+
+
+class _Call:
+    """One in-flight call and the number of callers awaiting it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SharedStream:
+    """An async event stream replayed to every subscriber, from the first event"""
+
+    def __init__(self, events: AsyncIterator[Any]):
+        self.events: List[Any] = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(events))
+
+    async def _pump(self, events: AsyncIterator[Any]):
+        try:
+            async for event in events:
+                self.events.append(event)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """Yield every event so far, then new ones as they arrive"""
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                changed = self._changed
+                while position < len(self.events):
+                    yield self.events[position]
+                    position += 1
+
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is listening any more
+                self.task.cancel()
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls and event streams"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[tuple, _Call] = {}
+        self._streams: Dict[tuple, SharedStream] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        Await func(*args, **kwargs), sharing the call with identical in-flight callers.
+
+        Args:
+            key: Identifies identical work (see call_key)
+            func: Coroutine function doing the work
+
+        Returns:
+            The leader's result (its exception is raised to every caller)
+        """
+        if not SINGLE_FLIGHT_ENABLED:
+            return await func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        call = self._calls.get(flight_key)
+        if call is None:
+            call = _Call(loop.create_task(func(*args, **kwargs)))
+            self._calls[flight_key] = call
+            call.task.add_done_callback(lambda _: self._forget(self._calls, flight_key, call))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            print(f"🔗 {self.name}: joined in-flight call ({call.waiters} already waiting)")
+
+        call.waiters += 1
+        try:
+            # A cancelled caller must not cancel the work for the others
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                self._forget(self._calls, flight_key, call)
+                call.task.cancel()
+
+    def stream(self, key: Hashable, func: Callable, *args, **kwargs) -> AsyncIterator[Any]:
+        """
+        Iterate func(*args, **kwargs), sharing the stream with identical in-flight callers.
+
+        Followers first get every event the leader has produced so far, then
+        follow along live. Must be called from a coroutine on the loop that
+        will iterate it.
+        """
+        if not SINGLE_FLIGHT_ENABLED:
+            return func(*args, **kwargs)
+
+        flight_key = (asyncio.get_running_loop(), key)
+        shared = self._streams.get(flight_key)
+        if shared is None or shared.done or shared.task.cancelled():
+            shared = SharedStream(func(*args, **kwargs))
+            self._streams[flight_key] = shared
+            shared.task.add_done_callback(lambda _: self._forget(self._streams, flight_key, shared))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            print(f"🔗 {self.name}: joined in-flight stream ({len(shared.events)} events to replay)")
+        return shared.subscribe()
+
+    @staticmethod
+    def _forget(registry: dict, key: tuple, entry):
+        if registry.get(key) is entry:
+            del registry[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'leaders': self.leaders,
+            'followers': self.followers,
+            'in_flight': len(self._calls) + len(self._streams)
+        }
+
+
+# Singleton instances
+_tool_flights = None
+_agent_flights = None
+
+
+def get_tool_flights() -> SingleFlight:
+    """Get singleton single-flight group for tool calls"""
+    global _tool_flights
+    if _tool_flights is None:
+        _tool_flights = SingleFlight('tools')
+    return _tool_flights
+
+
+def get_agent_flights() -> SingleFlight:
+    """Get singleton single-flight group for agent runs"""
+    global _agent_flights
+    if _agent_flights is None:
+        _agent_flights = SingleFlight('agent')
+    return _agent_flights
@@ -0,0 +1,156 @@
+"""
+State reduction for Luna's ReAct loop.
+
+Every agent iteration re-sends the whole message list, so tool outputs the
+model has already read (PDF dumps of up to 8000 chars, pages of web results)
+are paid for again on every later call and prompt size grows quadratically
+with the iteration count.
+
+Before each LLM call, tool outputs that were already consumed (a later AI
+message exists) are replaced - oldest first - with compact extractive
+summaries until all tool output fits under TOOL_CONTEXT_TOKEN_CAP. Summaries
+keep the lines that overlap the user's question, carry facts (prices, sizes,
+phones) or are references (URLs), so the final answer can still cite them.
+The replacements keep their message ids, so LangGraph's add_messages swaps
+them into the state (and the session checkpoint) in place.
+"""
+
+import os
+import re
+from typing import List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from knowledge.fact_index import extract_facts
+
+
+# Total tokens of tool output kept in the prompt
+TOOL_CONTEXT_TOKEN_CAP = int(os.getenv('LUNA_TOOL_CONTEXT_TOKENS', '3000'))
+
+# Size of one compacted tool output
+SUMMARY_TOKENS = int(os.getenv('LUNA_TOOL_SUMMARY_TOKENS', '200'))
+
+# Marks a ToolMessage that has already been compacted
+COMPACTED_KEY = 'luna_compacted'
+
+# Fact kinds that make a line worth keeping (bare numbers are too common)
+_KEY_FACT_KINDS = ('prices', 'areas', 'bedrooms', 'phones', 'emails')
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_URL_RE = re.compile(r'https?://\S+')
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding('o200k_base')
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text, disallowed_special=()))
+except Exception:
+    def count_tokens(text: str) -> int:
+        # ~4 characters per token for English text
+        return len(text) // 4 + 1
+
+
+def _words(text: str) -> set:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def extractive_summary(text: str, query: str, max_tokens: int = SUMMARY_TOKENS) -> str:
+    """
+    Keep the most useful lines of a tool output, in their original order.
+
+    Args:
+        text: Full tool output
+        query: The user's question (lines overlapping it rank higher)
+        max_tokens: Token budget for the summary
+
+    Returns:
+        The kept lines plus a note on how much was trimmed
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    query_words = _words(query)
+
+    scored = []
+    for index, line in enumerate(lines):
+        score = len(_words(line) & query_words)
+        facts = extract_facts(line)
+        if any(facts.get(kind) for kind in _KEY_FACT_KINDS):
+            score += 2
+        if _URL_RE.search(line):
+            score += 2
+        scored.append((score, index, line))
+
+    kept, used = [], 0
+    for score, index, line in sorted(scored, key=lambda item: (-item[0], item[1])):
+        cost = count_tokens(line)
+        if used + cost > max_tokens:
+            continue
+        kept.append((index, line))
+        used += cost
+
+    trimmed = len(text) - sum(len(line) for _, line in kept)
+    summary = '\n'.join(line for _, line in sorted(kept))
+    return f"{summary}\n[Summarized - {trimmed} characters of the original output omitted]"
+
+
+def _is_compacted(message: ToolMessage) -> bool:
+    return bool(message.additional_kwargs.get(COMPACTED_KEY))
+
+
+def compact_tool_messages(
+    messages: Sequence[BaseMessage],
+    query: Optional[str] = None,
+    token_cap: int = TOOL_CONTEXT_TOKEN_CAP
+) -> List[ToolMessage]:
+    """
+    Pick consumed tool outputs to summarize so tool output fits the token cap.
+
+    Args:
+        messages: The graph's message list
+        query: The user's question (defaults to the last human message)
+        token_cap: Token budget for all tool output in the prompt
+
+    Returns:
+        Replacement ToolMessages (same ids) - empty when already under the cap
+    """
+    if query is None:
+        query = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), ''
+        )
+
+    # Tool outputs followed by an AI message have been read by the model
+    last_ai = max((i for i, m in enumerate(messages) if isinstance(m, AIMessage)), default=-1)
+
+    tool_messages = [(i, m) for i, m in enumerate(messages) if isinstance(m, ToolMessage)]
+    total = sum(count_tokens(str(m.content)) for _, m in tool_messages)
+
+    replacements = []
+    for index, message in tool_messages:
+        if total <= token_cap:
+            break
+        if index > last_ai or _is_compacted(message) or message.id is None:
+            continue
+
+        original = str(message.content)
+        summary = extractive_summary(original, query)
+        saved = count_tokens(original) - count_tokens(summary)
+        if saved <= 0:
+            continue
+
+        replacements.append(ToolMessage(
+            content=summary,
+            tool_call_id=message.tool_call_id,
+            name=message.name,
+            id=message.id,
+            additional_kwargs={**message.additional_kwargs, COMPACTED_KEY: True}
+        ))
+        total -= saved
+
+    return replacements
+
+
+def apply_replacements(messages: Sequence[BaseMessage], replacements: List[ToolMessage]) -> List[BaseMessage]:
+    """The message list with replacements swapped in by id"""
+    by_id = {message.id: message for message in replacements}
+    return [by_id.get(message.id, message) for message in messages]
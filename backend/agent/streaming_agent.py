@@ -12,7 +12,8 @@ This agent:
 
 import os
 import json
-from typing import Generator, Dict, Any, List
+import asyncio
+from typing import AsyncGenerator, Generator, Dict, Any, List
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from datetime import datetime
@@ -29,6 +30,16 @@ from agent.tools import (
     download_and_read_pdf
 )
 from agent.verification_guardrails import get_verification_guardrails, VerificationLevel
+from agent.claim_support import saved_context
+from agent.verification_policy import get_verification_policy, VerificationTier
+from agent.async_runtime import iterate_sync, run_blocking
+from agent.single_flight import get_agent_flights, normalize_question
+from agent.tool_runtime import is_good_result
+from knowledge.fact_index import start_fact_collection
+
+
+# Shared deadline (seconds) for the searching phase; tools still running are dropped
+TOOL_PHASE_DEADLINE = float(os.getenv('LUNA_TOOL_PHASE_DEADLINE', '25'))
 
 
 class LunaStreamingAgent:
@@ -129,15 +140,143 @@ REMEMBER: You represent One Development. Be confident, helpful, and always guide
 
 Respond naturally and helpfully:"""
 
+    async def _astream_tools(
+        self,
+        query: str,
+        tool_results: Dict[str, str]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Run the searching phase's tools concurrently under one deadline.
+        
+        Independent tools start together; each tool's result is streamed as
+        soon as it finishes. Fallbacks start the moment their condition is
+        known (website search once the KB misses, web search once nothing
+        good can still arrive). Results are written into tool_results.
+        """
+        query_lower = query.lower()
+        
+        # Detect if this is about a specific project or brochure
+        project_keywords = ['laguna', 'residence', 'project', 'development', 'tower', 'villa']
+        brochure_keywords = ['brochure', 'pdf', 'download', 'document', 'fact sheet', 'floor plan']
+        market_keywords = ['price', 'cost', 'payment', 'plan', 'roi', 'return', 'invest', 
+                         'market', 'trend', 'average', 'typical', 'range']
+        context_keywords = ['payment', 'process', 'buy', 'invest', 'roi']
+        is_project_query = any(kw in query_lower for kw in project_keywords)
+        is_brochure_query = any(kw in query_lower for kw in brochure_keywords)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + TOOL_PHASE_DEADLINE
+        pending = {}  # task -> (result key, tool name, display query, silent)
+        
+        def launch(key, tool, args, display_query, silent=False):
+            task = asyncio.ensure_future(tool.ainvoke(args))
+            pending[task] = (key, tool.name, display_query, silent)
+            if not silent:
+                return {"type": "tool_start", "tool": tool.name, "query": display_query}
+        
+        starts = []
+        
+        # If asking about a specific project, use project tools
+        if is_project_query:
+            # Extract project name (e.g., "Laguna Residence")
+            project_name = "Laguna Residence" if 'laguna' in query_lower else query
+            starts.append(launch('project_details', get_project_details, {"project_name": project_name}, project_name))
+        
+        # If asking about brochures, try to find and read them
+        if is_brochure_query:
+            starts.append(launch('brochure_content', find_and_read_brochure, {"search_query": query}, query))
+        
+        # Always search knowledge base
+        starts.append(launch('knowledge_base', search_knowledge_base, {"query": query, "n_results": 5}, query))
+        
+        # For market/price questions, also get market data
+        if any(kw in query_lower for kw in market_keywords):
+            starts.append(launch('market_data', search_web_for_market_data, {"query": query}, query))
+        
+        # General context for certain topics (not shown to the user)
+        if any(kw in query_lower for kw in context_keywords):
+            launch('market_context', get_dubai_market_context, {"topic": query}, query, silent=True)
+        
+        for event in starts:
+            yield event
+        
+        web_search_decided = False
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                
+                for task in done:
+                    key, tool_name, _, silent = pending.pop(task)
+                    try:
+                        result = task.result()
+                        tool_results[key] = result
+                        event = {
+                            "type": "tool_result",
+                            "tool": tool_name,
+                            "content": result[:200] + "..." if len(result) > 200 else result
+                        }
+                    except Exception as e:
+                        result = None
+                        tool_results[key] = f"Error: {str(e)}"
+                        event = {"type": "tool_error", "tool": tool_name, "content": str(e)}
+                    
+                    if not silent:
+                        yield event
+                    
+                    # KB missed: search the website right away
+                    if key == 'knowledge_base' and not is_project_query:
+                        kb_has_info = bool(result) and "No relevant information" not in result and len(result) > 50
+                        if not kb_has_info:
+                            yield launch('website_search', search_one_development_website, {"query": query}, query)
+                
+                # Nothing good found and nothing left that could be good: general web search
+                if not web_search_decided:
+                    if any(is_good_result(r) for k, r in tool_results.items() if k != 'market_context'):
+                        web_search_decided = True
+                    elif all(silent for _, _, _, silent in pending.values()):
+                        web_search_decided = True
+                        web_query = f"One Development UAE {query}"
+                        yield launch('web_search', search_web, {"query": web_query}, web_query)
+            
+            # Deadline reached: report what didn't make it and answer with the rest
+            for task, (key, tool_name, _, silent) in list(pending.items()):
+                task.cancel()
+                tool_results[key] = f"Error: {tool_name} timed out"
+                if not silent:
+                    yield {"type": "tool_error", "tool": tool_name, "content": f"{tool_name} timed out"}
+        finally:
+            for task in pending:
+                task.cancel()
+    
     def stream_thinking_and_response(
         self,
         query: str,
         session_id: str = "default"
     ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Sync version of astream_thinking_and_response for WSGI views.
+        
+        Drives the async pipeline on the shared background loop, so both entry
+        points run exactly the same steps.
+        """
+        yield from iterate_sync(self.astream_thinking_and_response(query, session_id))
+    
+    async def astream_thinking_and_response(
+        self,
+        query: str,
+        session_id: str = "default"
+    ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Stream the complete thinking and response process.
         
         This is the CORE improvement: Uses multiple tools to find answers.
+        LLM streams and tools are awaited, so a single event loop can serve many
+        concurrent streams.
         
         Yields events:
         - {"type": "phase", "content": "..."} - Current phase
@@ -145,140 +284,82 @@ Respond naturally and helpfully:"""
         - {"type": "tool_start", "tool": "...", "query": "..."} - Tool being called
         - {"type": "tool_result", "content": "..."} - Tool result
         - {"type": "response_token", "content": "..."} - Response tokens
-        - {"type": "done"} - Complete
+        - {"type": "done", "full_response": "...", "verification_policy": {...}, "context": [...]} - Answer complete
+        - {"type": "verification", ...} - Verification outcome (after done)
+        - {"type": "response_improved", "content": "..."} - Corrected answer (after done)
+        - {"type": "verification_status", ...} - Tier, time spent and outcome (after done, not forwarded)
+        
+        The run doesn't depend on the session, so identical questions asked
+        while a run is in flight subscribe to that run's events instead of
+        starting their own.
         """
+        events = get_agent_flights().stream(
+            ('stream', normalize_question(query)), self._astream_thinking_and_response, query
+        )
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+    
+    async def _astream_thinking_and_response(self, query: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """One run of the thinking/tools/response pipeline (see astream_thinking_and_response)"""
         
         thinking_content = ""
         tool_results = {}
         
-        # ====================================================================
-        # PHASE 1: Stream thinking tokens
-        # ====================================================================
-        yield {"type": "phase", "content": "thinking"}
-        
-        thinking_prompt = self._get_thinking_prompt(query)
+        # Collect the indexed facts of every KB chunk the tools retrieve
+        retrieved_facts = start_fact_collection()
         
-        for chunk in self.streaming_llm.stream([
-            SystemMessage(content="You are Luna, thinking through a user's question. Plan which tools to use."),
-            HumanMessage(content=thinking_prompt)
-        ]):
-            if chunk.content:
-                thinking_content += chunk.content
-                yield {"type": "thinking_token", "content": chunk.content}
+        # Retrieval doesn't depend on the thinking stream, so start it now and
+        # buffer its events until the searching phase
+        tool_events = asyncio.Queue()
         
-        yield {"type": "thinking_complete", "content": thinking_content}
-        
-        # ====================================================================
-        # PHASE 2: Execute tools based on thinking - BE PERSISTENT!
-        # ====================================================================
-        yield {"type": "phase", "content": "searching"}
-        
-        query_lower = query.lower()
-        
-        # Detect if this is about a specific project or brochure
-        project_keywords = ['laguna', 'residence', 'project', 'development', 'tower', 'villa']
-        brochure_keywords = ['brochure', 'pdf', 'download', 'document', 'fact sheet', 'floor plan']
-        is_project_query = any(kw in query_lower for kw in project_keywords)
-        is_brochure_query = any(kw in query_lower for kw in brochure_keywords)
-        
-        # Step 1: If asking about a specific project, use project tools first
-        if is_project_query:
-            # Extract project name (e.g., "Laguna Residence")
-            project_name = query  # Use full query as search term
-            if 'laguna' in query_lower:
-                project_name = "Laguna Residence"
-            
-            yield {"type": "tool_start", "tool": "get_project_details", "query": project_name}
+        async def prefetch_tools():
             try:
-                project_result = get_project_details.invoke({"project_name": project_name})
-                tool_results['project_details'] = project_result
-                preview = project_result[:200] + "..." if len(project_result) > 200 else project_result
-                yield {"type": "tool_result", "content": preview}
-            except Exception as e:
-                tool_results['project_details'] = f"Error: {str(e)}"
-                yield {"type": "tool_error", "content": str(e)}
-        
-        # Step 2: If asking about brochures, try to find and read them
-        if is_brochure_query:
-            yield {"type": "tool_start", "tool": "find_and_read_brochure", "query": query}
-            try:
-                brochure_result = find_and_read_brochure.invoke({"search_query": query})
-                tool_results['brochure_content'] = brochure_result
-                preview = brochure_result[:200] + "..." if len(brochure_result) > 200 else brochure_result
-                yield {"type": "tool_result", "content": preview}
-            except Exception as e:
-                tool_results['brochure_content'] = f"Error: {str(e)}"
-                yield {"type": "tool_error", "content": str(e)}
-        
-        # Step 3: Always search knowledge base
-        yield {"type": "tool_start", "tool": "search_knowledge_base", "query": query}
-        try:
-            kb_result = search_knowledge_base.invoke({"query": query, "n_results": 5})
-            tool_results['knowledge_base'] = kb_result
-            preview = kb_result[:200] + "..." if len(kb_result) > 200 else kb_result
-            yield {"type": "tool_result", "content": preview}
-        except Exception as e:
-            tool_results['knowledge_base'] = f"Error: {str(e)}"
-            yield {"type": "tool_error", "content": str(e)}
-        
-        # Step 4: If knowledge base didn't have good results, search the website
-        kb_has_info = (
-            tool_results.get('knowledge_base') and 
-            "No relevant information" not in tool_results.get('knowledge_base', '') and
-            len(tool_results.get('knowledge_base', '')) > 50
-        )
-        
-        if not kb_has_info and not is_project_query:
-            yield {"type": "tool_start", "tool": "search_one_development_website", "query": query}
-            try:
-                website_result = search_one_development_website.invoke({"query": query})
-                tool_results['website_search'] = website_result
-                preview = website_result[:200] + "..." if len(website_result) > 200 else website_result
-                yield {"type": "tool_result", "content": preview}
-            except Exception as e:
-                tool_results['website_search'] = f"Error: {str(e)}"
-                yield {"type": "tool_error", "content": str(e)}
-        
-        # Step 5: For market/price questions, also get market data
-        market_keywords = ['price', 'cost', 'payment', 'plan', 'roi', 'return', 'invest', 
-                         'market', 'trend', 'average', 'typical', 'range']
-        needs_market_data = any(kw in query_lower for kw in market_keywords)
+                async for event in self._astream_tools(query, tool_results):
+                    tool_events.put_nowait(event)
+            finally:
+                tool_events.put_nowait(None)
         
-        if needs_market_data:
-            yield {"type": "tool_start", "tool": "search_web_for_market_data", "query": query}
-            try:
-                market_result = search_web_for_market_data.invoke({"query": query})
-                tool_results['market_data'] = market_result
-                preview = market_result[:200] + "..." if len(market_result) > 200 else market_result
-                yield {"type": "tool_result", "content": preview}
-            except Exception as e:
-                tool_results['market_data'] = f"Error: {str(e)}"
-        
-        # Step 6: If still no good results, do a general web search
-        has_any_good_result = any(
-            result and "No relevant" not in result and "Error" not in result and len(result) > 50
-            for result in tool_results.values()
-        )
+        prefetch = asyncio.ensure_future(prefetch_tools())
         
-        if not has_any_good_result:
-            web_query = f"One Development UAE {query}"
-            yield {"type": "tool_start", "tool": "search_web", "query": web_query}
-            try:
-                web_result = search_web.invoke({"query": web_query})
-                tool_results['web_search'] = web_result
-                preview = web_result[:200] + "..." if len(web_result) > 200 else web_result
-                yield {"type": "tool_result", "content": preview}
-            except Exception as e:
-                tool_results['web_search'] = f"Error: {str(e)}"
-        
-        # Step 7: Get general context for certain topics
-        context_keywords = ['payment', 'process', 'buy', 'invest', 'roi']
-        if any(kw in query_lower for kw in context_keywords):
+        try:
+            # ====================================================================
+            # PHASE 1: Stream thinking tokens
+            # ====================================================================
+            yield {"type": "phase", "content": "thinking"}
+            
+            thinking_prompt = self._get_thinking_prompt(query)
+            
+            thinking_stream = self.streaming_llm.astream([
+                SystemMessage(content="You are Luna, thinking through a user's question. Plan which tools to use."),
+                HumanMessage(content=thinking_prompt)
+            ])
             try:
-                context_result = get_dubai_market_context.invoke({"topic": query})
-                tool_results['market_context'] = context_result
-            except:
-                pass
+                async for chunk in thinking_stream:
+                    if chunk.content:
+                        thinking_content += chunk.content
+                        yield {"type": "thinking_token", "content": chunk.content}
+            finally:
+                # Close the LLM stream now (not at GC) if we're cancelled mid-stream
+                await thinking_stream.aclose()
+            
+            yield {"type": "thinking_complete", "content": thinking_content}
+            
+            # ====================================================================
+            # PHASE 2: Execute tools based on thinking - BE PERSISTENT!
+            # ====================================================================
+            yield {"type": "phase", "content": "searching"}
+            
+            while True:
+                event = await tool_events.get()
+                if event is None:
+                    break
+                yield event
+            await prefetch  # re-raise anything the tool phase raised
+        finally:
+            prefetch.cancel()
         
         # ====================================================================
         # PHASE 3: Stream response tokens
@@ -288,64 +369,112 @@ Respond naturally and helpfully:"""
         response_prompt = self._get_response_prompt(query, "", thinking_content, tool_results)
         response_content = ""
         
-        for chunk in self.streaming_llm.stream([
+        response_stream = self.streaming_llm.astream([
             SystemMessage(content="""You are Luna, One Development's AI assistant. 
 Be helpful, confident, and always provide value. Never leave the user without guidance.
 Use the information gathered to give the best possible answer."""),
             HumanMessage(content=response_prompt)
-        ]):
-            if chunk.content:
-                response_content += chunk.content
-                yield {"type": "response_token", "content": chunk.content}
-        
-        # ====================================================================
-        # PHASE 4: Verify and improve response (NEW!)
-        # ====================================================================
-        yield {"type": "phase", "content": "verifying"}
-        
-        # Get context for verification
+        ])
+        try:
+            async for chunk in response_stream:
+                if chunk.content:
+                    response_content += chunk.content
+                    yield {"type": "response_token", "content": chunk.content}
+        finally:
+            await response_stream.aclose()
+        
+        # Pick how much verification this answer needs before delivering it
+        policy = get_verification_policy()
+        decision = policy.choose_tier(query, response_content, retrieved_facts)
+        
+        # Context the answer is checked against (a capped copy is saved with it,
+        # for replaying verification)
         context_list = [str(result) for result in tool_results.values() if result]
         
-        # Verify the response
-        verification_system = get_verification_guardrails()
-        verification_result = verification_system.verify_response(
-            query=query,
-            response=response_content,
-            context=context_list,
-            tool_results=tool_results
-        )
-        
-        # Send verification status
+        # The answer is complete: deliver it (and let the view save it) before
+        # verification, which can take several more LLM calls
         yield {
-            "type": "verification",
-            "confidence": verification_result.confidence_score,
-            "level": verification_result.verification_level.value,
-            "sources": verification_result.sources,
-            "issues": verification_result.issues_found
+            "type": "done",
+            "full_response": response_content,
+            "verification_policy": decision.to_metadata(),
+            "context": saved_context(context_list)
         }
         
-        # If verification found issues or low confidence, improve response
-        if not verification_result.is_verified or verification_result.verification_level == VerificationLevel.LOW:
-            yield {"type": "phase", "content": "improving"}
-            
-            improved_response = verification_system.improve_response(
-                query=query,
-                response=response_content,
-                verification_result=verification_result,
-                context=context_list,
-                tool_results=tool_results
+        if decision.tier == VerificationTier.NONE:
+            return
+        
+        # ====================================================================
+        # PHASE 4: Verify and improve response - after done, off the critical path
+        # ====================================================================
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + decision.budget
+        timed_out = False
+        outcome = 'passed'
+        
+        verification_system = get_verification_guardrails()
+        try:
+            # Verify the response (local-only tier makes no LLM calls)
+            verification_result = await asyncio.wait_for(
+                run_blocking(
+                    verification_system.verify_response,
+                    query=query,
+                    response=response_content,
+                    context=context_list,
+                    tool_results=tool_results,
+                    retrieved_facts=retrieved_facts,
+                    use_llm=decision.tier == VerificationTier.FULL
+                ),
+                timeout=max(deadline - loop.time(), 0)
             )
             
-            # If improved response is different, stream the difference
-            if improved_response != response_content:
-                response_content = improved_response
-                yield {"type": "response_improved", "content": improved_response}
-        
-        yield {"type": "done", "full_response": response_content, "verification": {
-            "confidence": verification_result.confidence_score,
-            "level": verification_result.verification_level.value,
-            "sources": verification_result.sources
-        }}
+            # Send verification status
+            yield {
+                "type": "verification",
+                "confidence": verification_result.confidence_score,
+                "level": verification_result.verification_level.value,
+                "sources": verification_result.sources,
+                "issues": verification_result.issues_found
+            }
+            
+            # If verification found issues or low confidence, improve response
+            if not verification_result.is_verified or verification_result.verification_level == VerificationLevel.LOW:
+                outcome = 'issues'
+                improved_response = await asyncio.wait_for(
+                    run_blocking(
+                        verification_system.improve_response,
+                        query=query,
+                        response=response_content,
+                        verification_result=verification_result,
+                        context=context_list,
+                        tool_results=tool_results
+                    ),
+                    timeout=max(deadline - loop.time(), 0)
+                )
+                
+                # If improved response is different, send it as a revision
+                if improved_response != response_content:
+                    yield {"type": "response_improved", "content": improved_response}
+        except asyncio.TimeoutError:
+            timed_out = True
+            outcome = 'timed_out'
+        
+        # Timeouts are logged and counted apart from passes (they checked nothing)
+        elapsed = loop.time() - started
+        policy.record(decision.tier, elapsed, outcome)
+        if timed_out:
+            print(f"⚠️ Verification ({decision.tier.value}) timed out: exceeded its {decision.budget:.1f}s budget")
+        else:
+            print(f"🔍 Verification ({decision.tier.value}) {outcome} in {elapsed:.1f}s")
+        
+        # Record the tier's actual cost on the message
+        yield {
+            "type": "verification_status",
+            "tier": decision.tier.value,
+            "elapsed_ms": int(elapsed * 1000),
+            "timed_out": timed_out,
+            "outcome": outcome
+        }
 
 
 # Singleton instance
@@ -13,6 +13,8 @@ Currently implemented as enhanced tools (can be upgraded to full subagents later
 from langchain_core.tools import tool
 from typing import List, Dict, Any
 
+from agent.tool_runtime import report_partial
+
 
 # ============================================================================
 # RESEARCH SUBAGENT (as enhanced tool)
@@ -44,11 +46,13 @@ def deep_research(topic: str, aspects: List[str] = None) -> str:
     kb_result = search_knowledge_base.invoke({"query": topic, "n_results": 5})
     if kb_result and "No relevant" not in kb_result:
         results.append(f"**Internal Knowledge:**\n{kb_result}")
+        report_partial("\n\n---\n\n".join(results))
     
     # Search web for market data
     web_result = search_web_for_market_data.invoke({"query": topic})
     if web_result and "unavailable" not in web_result.lower():
         results.append(f"**Market Data:**\n{web_result}")
+        report_partial("\n\n---\n\n".join(results))
     
     # Add market context
     context = get_dubai_market_context.invoke({})
@@ -103,6 +107,7 @@ def analyze_pricing(
     kb_result = search_knowledge_base.invoke({"query": query + " One Development", "n_results": 5})
     if kb_result and "No relevant" not in kb_result:
         results.append(f"**One Development Properties:**\n{kb_result}")
+        report_partial("\n\n---\n\n".join(results))
     
     # Get market pricing
     market_query = f"{property_type} {location} price per sqft Dubai"
@@ -174,6 +179,7 @@ def compare_properties(
             item_results.append(kb_result[:500] + "...")
         
         results.append("\n".join(item_results))
+        report_partial("\n".join(results))
     
     # Add comparison summary
     comparison_table = f"""
@@ -0,0 +1,257 @@
+"""
+Tool execution policies for Luna.
+
+Tools call slow external services (DuckDuckGo, oneuae.com, Tavily, PDF hosts)
+with long fixed timeouts, and nothing limits how many run at once across
+sessions - one slow response stalls a whole turn. Every tool coroutine is
+wrapped with:
+
+- a timeout: a tool that doesn't finish returns a structured timeout result
+  instead of blocking the turn, with the best partial result we have - a
+  finished hedge attempt, or what the tool published with report_partial()
+- a per-tool concurrency limit shared by all sessions on the event loop
+- optional hedging: if the primary call is slow or fails, an alternative
+  (e.g. the DuckDuckGo HTML endpoint for search_web) is started and the first
+  good result wins
+
+Timeouts and limits can be overridden per tool with LUNA_TOOL_TIMEOUT_<NAME>
+and LUNA_TOOL_CONCURRENCY_<NAME> (NAME in upper case).
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from agent.async_runtime import run_blocking
+
+
+DEFAULT_TOOL_TIMEOUT = float(os.getenv('LUNA_TOOL_TIMEOUT', '20'))
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv('LUNA_TOOL_CONCURRENCY', '8'))
+
+# Start the hedge if the primary call hasn't returned a good result by then
+HEDGE_DELAY = float(os.getenv('LUNA_TOOL_HEDGE_DELAY', '2.5'))
+
+
+@dataclass
+class ToolPolicy:
+    """How one tool is executed"""
+    timeout: float = DEFAULT_TOOL_TIMEOUT
+    max_concurrency: int = DEFAULT_TOOL_CONCURRENCY
+    hedge_delay: float = HEDGE_DELAY
+
+
+# (timeout seconds, max concurrent calls) for tools that differ from the defaults
+_POLICY_TABLE = {
+    'search_knowledge_base': (8, 16),
+    'search_uploaded_documents': (8, 16),
+    'get_user_context': (5, 16),
+    'tavily_search': (15, 8),
+    'tavily_research': (30, 4),
+    'search_web': (10, 8),
+    'search_web_for_market_data': (12, 8),
+    'scrape_webpage': (12, 8),
+    'search_one_development_website': (12, 8),
+    'download_and_read_pdf': (30, 4),
+    'fetch_project_brochure': (30, 4),
+    'get_project_details': (20, 8),
+    'find_and_read_brochure': (30, 4),
+    'deep_research': (45, 4),
+}
+
+
+def get_policy(name: str) -> ToolPolicy:
+    """The execution policy of a tool, with env overrides applied"""
+    timeout, concurrency = _POLICY_TABLE.get(name, (DEFAULT_TOOL_TIMEOUT, DEFAULT_TOOL_CONCURRENCY))
+    return ToolPolicy(
+        timeout=float(os.getenv(f'LUNA_TOOL_TIMEOUT_{name.upper()}', timeout)),
+        max_concurrency=int(os.getenv(f'LUNA_TOOL_CONCURRENCY_{name.upper()}', concurrency))
+    )
+
+
+# ============================================================================
+# RESULTS
+# ============================================================================
+
+# Tool outputs starting like this are failures or misses, not answers
+# ("No relevant information found...", "Web search error: ...", "search_web error: ...",
+# "Search unavailable: ...", "Timeout accessing ...", "Could not access ...")
+_BAD_RESULT_START = re.compile(
+    r'\s*(?:No (?:relevant|results|web results|market data|brochures|research data|previous user context)\b'
+    r'|Error\b|[\w ]{0,40}\b(?:error|unavailable):|Could not\b|Timeout\b|I couldn\'t find\b)',
+    re.IGNORECASE
+)
+
+
+def timeout_result(name: str, timeout: float, partial: Optional[str] = None) -> str:
+    """Structured result for a tool that didn't finish in time"""
+    return json.dumps({
+        'status': 'timeout',
+        'tool': name,
+        'timeout_s': timeout,
+        'partial': partial,
+        'note': 'The tool did not finish in time. Use the other results, or try a different tool.'
+    })
+
+
+def is_timeout_result(result: str) -> bool:
+    return isinstance(result, str) and result.startswith('{"status": "timeout"')
+
+
+def is_good_result(result: str) -> bool:
+    """Whether a tool output is a usable answer (not empty, an error, a miss or a timeout)"""
+    return (
+        bool(result)
+        and len(result) > 50
+        and not is_timeout_result(result)
+        and not _BAD_RESULT_START.match(result)
+    )
+
+
+# Partial output of the tool call running in the current context
+_partial_result: contextvars.ContextVar = contextvars.ContextVar('luna_partial_result', default=None)
+
+
+def report_partial(result: str):
+    """
+    Publish what a tool has gathered so far (replacing the previous report).
+    If the tool then times out, this is returned as the timeout's partial result.
+    """
+    sink = _partial_result.get()
+    if sink is not None and result:
+        sink[:] = [result]
+
+
+# ============================================================================
+# EXECUTION
+# ============================================================================
+
+_semaphores: Dict[tuple, asyncio.Semaphore] = {}
+
+
+def _semaphore(key: str, limit: int) -> asyncio.Semaphore:
+    """Concurrency limit for a tool on the running loop, shared by all sessions"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get((loop, key))
+    if semaphore is None:
+        semaphore = _semaphores[(loop, key)] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+async def _limited(key: str, limit: int, coroutine: Callable, args: tuple, kwargs: dict) -> str:
+    async with _semaphore(key, limit):
+        return await coroutine(*args, **kwargs)
+
+
+async def _hedged(
+    name: str,
+    policy: ToolPolicy,
+    coroutine: Callable,
+    hedge: Callable,
+    args: tuple,
+    kwargs: dict,
+    attempts: List[str]
+) -> str:
+    """Race the primary call against the hedge, started once the primary is slow or fails"""
+    primary = asyncio.ensure_future(_limited(name, policy.max_concurrency, coroutine, args, kwargs))
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=policy.hedge_delay)
+        pending = set(tasks)
+        if done:
+            pending.clear()
+            result = _result_of(name, primary)
+            if is_good_result(result):
+                return result
+            attempts.append(result)
+
+        print(f"🔀 Hedging {name}")
+        hedge_task = asyncio.ensure_future(
+            _limited(f'{name}.hedge', policy.max_concurrency, hedge, args, kwargs)
+        )
+        tasks.append(hedge_task)
+        pending.add(hedge_task)
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = _result_of(name, task)
+                if is_good_result(result):
+                    return result
+                attempts.append(result)
+
+        # Neither was good - return the first answer we got
+        return attempts[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _result_of(name: str, task: asyncio.Future) -> str:
+    if task.exception() is not None:
+        return f"{name} error: {task.exception()}"
+    return task.result()
+
+
+def guard_tool(name: str, coroutine: Callable, hedge: Optional[Callable] = None) -> Callable:
+    """
+    Wrap a tool coroutine with its timeout, concurrency limit and optional hedge.
+
+    Args:
+        name: Tool name (selects the policy)
+        coroutine: The tool's async implementation
+        hedge: Alternative implementation taking the same arguments
+
+    Returns:
+        Coroutine function to attach as the tool's coroutine
+    """
+    policy = get_policy(name)
+
+    @functools.wraps(coroutine)
+    async def guarded(*args, **kwargs):
+        attempts = []
+        reported = []
+        token = _partial_result.set(reported)
+        started = time.monotonic()
+        if hedge is not None:
+            work = _hedged(name, policy, coroutine, hedge, args, kwargs, attempts)
+        else:
+            work = _limited(name, policy.max_concurrency, coroutine, args, kwargs)
+        try:
+            return await asyncio.wait_for(work, policy.timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️ {name} timed out after {time.monotonic() - started:.1f}s")
+            partial = next((attempt for attempt in attempts + reported if attempt), None)
+            return timeout_result(name, policy.timeout, partial)
+        finally:
+            _partial_result.reset(token)
+
+    guarded.luna_guarded = True
+    return guarded
+
+
+def apply_tool_policies(tools: List) -> List:
+    """
+    Guard every tool that isn't guarded yet (tools without an async
+    implementation run their sync function on the blocking pool).
+    """
+    for tool in tools:
+        if getattr(tool.coroutine, 'luna_guarded', False):
+            continue
+        coroutine = tool.coroutine
+        if coroutine is None:
+            coroutine = _blocking_coroutine(tool.func)
+        tool.coroutine = guard_tool(tool.name, coroutine)
+    return tools
+
+
+def _blocking_coroutine(func: Callable) -> Callable:
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return run
@@ -4,9 +4,54 @@ Implements actual web search, scraping, and knowledge retrieval
 """
 
 from langchain.tools import tool
+import asyncio
+import functools
 import requests
+import httpx
 from bs4 import BeautifulSoup
 import os
+from urllib.parse import urlparse
+
+from agent.async_runtime import run_blocking
+from agent.circuit_breaker import get_breaker
+from agent.html_extract import extract
+from agent.http_client import fetch, afetch
+from agent.single_flight import get_tool_flights, call_key
+from agent.tool_runtime import guard_tool, is_good_result, report_partial
+from agent.result_cache import get_tool_cache, TOOL_CACHE_ENABLED, TOOL_CACHE_TTLS
+from knowledge.fact_index import collecting_facts, merge_retrieved
+
+
+# ============================================================================
+# DEPENDENCY BREAKERS
+# ============================================================================
+# Fetches go through a circuit breaker per host, so a site that is down fails
+# fast instead of costing every caller the full timeout (agent/circuit_breaker.py).
+
+def _host_breaker(url: str):
+    """Circuit breaker for the host of a fetched URL"""
+    return get_breaker(f"fetch:{urlparse(url).netloc}")
+
+
+def _server_ok(response):
+    """Raise for server errors (they count against the host's breaker - 4xx don't)"""
+    if response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
+
+def _fetch(url: str, headers: dict, timeout: float) -> requests.Response:
+    """GET a URL over the shared session, through its host's breaker"""
+    return _host_breaker(url).call(
+        lambda: _server_ok(fetch(url, headers=headers, timeout=timeout))
+    )
+
+
+async def _afetch(url: str, timeout: float) -> httpx.Response:
+    """GET a URL over the shared client, through its host's breaker"""
+    async def get():
+        return _server_ok(await afetch(url, timeout=timeout))
+    return await _host_breaker(url).acall(get)
 
 
 # ============================================================================
@@ -43,6 +88,55 @@ def search_knowledge_base(query: str, n_results: int = 5) -> str:
     return "\n\n".join([doc.page_content for doc in results]) if results else "No relevant information found in knowledge base."
 
 
+async def _asearch_knowledge_base(query: str, n_results: int = 5) -> str:
+    prefetched = _kb_prefetches.pop((asyncio.get_running_loop(), query.strip(), n_results), None)
+    if prefetched is not None and not prefetched.cancelled():
+        try:
+            return await prefetched
+        except Exception:
+            pass  # fall through to a fresh search
+    return await _aquery_knowledge_base(query, n_results)
+
+
+async def _aquery_knowledge_base(query: str, n_results: int = 5) -> str:
+    from knowledge.vector_store import get_vector_store
+    results = await get_vector_store().asimilarity_search(query, k=n_results)
+    return "\n\n".join([doc.page_content for doc in results]) if results else "No relevant information found in knowledge base."
+
+
+# Speculative knowledge base searches, keyed by (loop, query, n_results).
+# The first LLM call almost always asks for search_knowledge_base on the raw
+# query, so the agent starts that search alongside the call and the tool
+# reuses it when the arguments match.
+KB_PREFETCH_TTL = 60.0
+_kb_prefetches = {}
+
+
+def prefetch_knowledge_base(query: str, n_results: int = 5) -> asyncio.Task:
+    """
+    Start a knowledge base search in the background on the running loop.
+    
+    A later search_knowledge_base call with the same arguments awaits this
+    task instead of searching again. Unclaimed prefetches expire after
+    KB_PREFETCH_TTL seconds.
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, query.strip(), n_results)
+    task = _kb_prefetches.get(key)
+    if task is None:
+        task = loop.create_task(_aquery_knowledge_base(query, n_results))
+        # Mark failures as retrieved - an unclaimed prefetch is allowed to fail quietly
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _kb_prefetches[key] = task
+        loop.call_later(KB_PREFETCH_TTL, _expire_prefetch, key, task)
+    return task
+
+
+def _expire_prefetch(key, task):
+    if _kb_prefetches.get(key) is task:
+        del _kb_prefetches[key]
+
+
 @tool
 def search_uploaded_documents(query: str, n_results: int = 3) -> str:
     """Search uploaded PDF documents for specific information about One Development.
@@ -55,6 +149,12 @@ def search_uploaded_documents(query: str, n_results: int = 3) -> str:
     return "\n\n".join([doc.page_content for doc in results]) if results else "No relevant information found in documents."
 
 
+async def _asearch_uploaded_documents(query: str, n_results: int = 3) -> str:
+    from knowledge.vector_store import get_vector_store
+    results = await get_vector_store().asimilarity_search(query, k=n_results)
+    return "\n\n".join([doc.page_content for doc in results]) if results else "No relevant information found in documents."
+
+
 # ============================================================================
 # TAVILY AI SEARCH - Premium Search for AI Agents
 # ============================================================================
@@ -84,7 +184,8 @@ def tavily_search(query: str, search_depth: str = "basic", max_results: int = 5)
         
         client = TavilyClient(api_key=api_key)
         
-        response = client.search(
+        response = get_breaker('tavily').call(
+            client.search,
             query=query,
             search_depth=search_depth,
             max_results=max_results,
@@ -92,27 +193,7 @@ def tavily_search(query: str, search_depth: str = "basic", max_results: int = 5)
             include_raw_content=False
         )
         
-        # Format results
-        formatted = []
-        
-        # Include AI-generated answer if available
-        if response.get('answer'):
-            formatted.append(f"**AI Summary:** {response['answer']}\n")
-        
-        # Include search results
-        results = response.get('results', [])
-        if results:
-            formatted.append("**Sources:**")
-            for i, result in enumerate(results, 1):
-                title = result.get('title', 'No title')
-                url = result.get('url', '')
-                content = result.get('content', '')[:300]
-                formatted.append(f"{i}. **{title}**\n   {content}\n   URL: {url}")
-        
-        if formatted:
-            return f"Tavily Search Results for '{query}':\n\n" + "\n\n".join(formatted)
-        
-        return f"No results found for '{query}'"
+        return _format_tavily_search(query, response)
         
     except ImportError:
         return search_web.invoke({"query": query, "max_results": max_results})
@@ -121,6 +202,55 @@ def tavily_search(query: str, search_depth: str = "basic", max_results: int = 5)
         return search_web.invoke({"query": query, "max_results": max_results})
 
 
+async def _atavily_search(query: str, search_depth: str = "basic", max_results: int = 5) -> str:
+    try:
+        from tavily import TavilyClient
+        
+        api_key = os.getenv('TAVILY_API_KEY')
+        if not api_key:
+            return await search_web.ainvoke({"query": query, "max_results": max_results})
+        
+        client = TavilyClient(api_key=api_key)
+        response = await run_blocking(
+            get_breaker('tavily').call,
+            client.search,
+            query=query,
+            search_depth=search_depth,
+            max_results=max_results,
+            include_answer=True,
+            include_raw_content=False
+        )
+        
+        return _format_tavily_search(query, response)
+        
+    except Exception:
+        return await search_web.ainvoke({"query": query, "max_results": max_results})
+
+
+def _format_tavily_search(query: str, response: dict) -> str:
+    """Format a Tavily search response for the agent"""
+    formatted = []
+    
+    # Include AI-generated answer if available
+    if response.get('answer'):
+        formatted.append(f"**AI Summary:** {response['answer']}\n")
+    
+    # Include search results
+    results = response.get('results', [])
+    if results:
+        formatted.append("**Sources:**")
+        for i, result in enumerate(results, 1):
+            title = result.get('title', 'No title')
+            url = result.get('url', '')
+            content = result.get('content', '')[:300]
+            formatted.append(f"{i}. **{title}**\n   {content}\n   URL: {url}")
+    
+    if formatted:
+        return f"Tavily Search Results for '{query}':\n\n" + "\n\n".join(formatted)
+    
+    return f"No results found for '{query}'"
+
+
 @tool
 def tavily_research(topic: str) -> str:
     """Conduct deep research on a topic using Tavily's advanced search.
@@ -144,7 +274,8 @@ def tavily_research(topic: str) -> str:
         client = TavilyClient(api_key=api_key)
         
         # Use advanced search depth for research
-        response = client.search(
+        response = get_breaker('tavily').call(
+            client.search,
             query=topic,
             search_depth="advanced",
             max_results=10,
@@ -152,27 +283,57 @@ def tavily_research(topic: str) -> str:
             include_raw_content=True
         )
         
-        formatted = [f"**Deep Research on: {topic}**\n"]
+        return _format_tavily_research(topic, response)
         
-        # AI-generated comprehensive answer
-        if response.get('answer'):
-            formatted.append(f"**Summary:**\n{response['answer']}\n")
+    except Exception as e:
+        return f"Research error: {str(e)}. Falling back to standard search.\n\n" + search_web.invoke({"query": topic, "max_results": 5})
+
+
+async def _atavily_research(topic: str) -> str:
+    try:
+        from tavily import TavilyClient
         
-        # Detailed results
-        results = response.get('results', [])
-        if results:
-            formatted.append("**Detailed Findings:**")
-            for i, result in enumerate(results[:7], 1):
-                title = result.get('title', '')
-                content = result.get('content', '')[:500]
-                url = result.get('url', '')
-                score = result.get('score', 0)
-                formatted.append(f"\n{i}. **{title}** (relevance: {score:.2f})\n{content}\nSource: {url}")
+        api_key = os.getenv('TAVILY_API_KEY')
+        if not api_key:
+            return f"Tavily API key not configured. Using standard search.\n\n" + await search_web.ainvoke({"query": topic, "max_results": 5})
+        
+        client = TavilyClient(api_key=api_key)
+        response = await run_blocking(
+            get_breaker('tavily').call,
+            client.search,
+            query=topic,
+            search_depth="advanced",
+            max_results=10,
+            include_answer=True,
+            include_raw_content=True
+        )
         
-        return "\n".join(formatted)
+        return _format_tavily_research(topic, response)
         
     except Exception as e:
-        return f"Research error: {str(e)}. Falling back to standard search.\n\n" + search_web.invoke({"query": topic, "max_results": 5})
+        return f"Research error: {str(e)}. Falling back to standard search.\n\n" + await search_web.ainvoke({"query": topic, "max_results": 5})
+
+
+def _format_tavily_research(topic: str, response: dict) -> str:
+    """Format an advanced Tavily search response as research findings"""
+    formatted = [f"**Deep Research on: {topic}**\n"]
+    
+    # AI-generated comprehensive answer
+    if response.get('answer'):
+        formatted.append(f"**Summary:**\n{response['answer']}\n")
+    
+    # Detailed results
+    results = response.get('results', [])
+    if results:
+        formatted.append("**Detailed Findings:**")
+        for i, result in enumerate(results[:7], 1):
+            title = result.get('title', '')
+            content = result.get('content', '')[:500]
+            url = result.get('url', '')
+            score = result.get('score', 0)
+            formatted.append(f"\n{i}. **{title}** (relevance: {score:.2f})\n{content}\nSource: {url}")
+    
+    return "\n".join(formatted)
 
 
 # ============================================================================
@@ -194,22 +355,8 @@ def search_web(query: str, max_results: int = 5) -> str:
         Formatted search results with titles, URLs, and snippets
     """
     try:
-        from duckduckgo_search import DDGS
-        
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            
-        if not results:
-            return f"No web results found for '{query}'. Try a different search term."
-        
-        formatted_results = []
-        for i, result in enumerate(results, 1):
-            title = result.get('title', 'No title')
-            href = result.get('href', result.get('link', 'No URL'))
-            body = result.get('body', result.get('snippet', 'No description'))
-            formatted_results.append(f"{i}. **{title}**\n   URL: {href}\n   {body}")
-        
-        return f"Web search results for '{query}':\n\n" + "\n\n".join(formatted_results)
+        results = _ddgs_text(query, max_results)
+        return _format_web_results(query, results)
         
     except ImportError:
         # Fallback to basic scraping if duckduckgo-search not installed
@@ -218,6 +365,45 @@ def search_web(query: str, max_results: int = 5) -> str:
         return f"Web search error: {str(e)}. Try rephrasing your query."
 
 
+async def _asearch_web(query: str, max_results: int = 5) -> str:
+    try:
+        results = await run_blocking(_ddgs_text, query, max_results)
+        return _format_web_results(query, results)
+    except ImportError:
+        return await _afallback_web_search(query)
+    except Exception as e:
+        return f"Web search error: {str(e)}. Try rephrasing your query."
+
+
+def _ddgs_text(query: str, max_results: int = 5) -> list:
+    """Run a DuckDuckGo text search (blocking - async callers use run_blocking)"""
+    from duckduckgo_search import DDGS
+    
+    def search():
+        with DDGS() as ddgs:
+            return list(ddgs.text(query, max_results=max_results))
+    
+    return get_breaker('ddgs').call(search)
+
+
+def _format_web_results(query: str, results: list) -> str:
+    """Format DuckDuckGo results for search_web"""
+    if not results:
+        return f"No web results found for '{query}'. Try a different search term."
+    
+    formatted_results = []
+    for i, result in enumerate(results, 1):
+        title = result.get('title', 'No title')
+        href = result.get('href', result.get('link', 'No URL'))
+        body = result.get('body', result.get('snippet', 'No description'))
+        formatted_results.append(f"{i}. **{title}**\n   URL: {href}\n   {body}")
+    
+    return f"Web search results for '{query}':\n\n" + "\n\n".join(formatted_results)
+
+
+_FALLBACK_SEARCH_URL = "https://html.duckduckgo.com/html/?q={}"
+
+
 def _fallback_web_search(query: str) -> str:
     """Fallback web search using basic scraping"""
     try:
@@ -225,26 +411,47 @@ def _fallback_web_search(query: str) -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         # Use DuckDuckGo HTML version
-        url = f"https://html.duckduckgo.com/html/?q={requests.utils.quote(query)}"
-        response = requests.get(url, headers=headers, timeout=10)
+        url = _FALLBACK_SEARCH_URL.format(requests.utils.quote(query))
+        response = _fetch(url, headers, timeout=10)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            results = []
-            for result in soup.select('.result__body')[:5]:
-                title_elem = result.select_one('.result__title')
-                snippet_elem = result.select_one('.result__snippet')
-                if title_elem and snippet_elem:
-                    results.append(f"- {title_elem.get_text(strip=True)}: {snippet_elem.get_text(strip=True)}")
-            
-            if results:
-                return f"Web results for '{query}':\n" + "\n".join(results)
+            return _parse_fallback_results(query, response.text)
         
         return f"No results found for '{query}'"
     except Exception as e:
         return f"Search unavailable: {str(e)}"
 
 
+async def _afallback_web_search(query: str) -> str:
+    """Async fallback web search over the shared HTTP client"""
+    try:
+        url = _FALLBACK_SEARCH_URL.format(requests.utils.quote(query))
+        response = await _afetch(url, timeout=10)
+        
+        if response.status_code == 200:
+            return _parse_fallback_results(query, response.text)
+        
+        return f"No results found for '{query}'"
+    except Exception as e:
+        return f"Search unavailable: {str(e)}"
+
+
+def _parse_fallback_results(query: str, html: str) -> str:
+    """Parse the DuckDuckGo HTML results page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for result in soup.select('.result__body')[:5]:
+        title_elem = result.select_one('.result__title')
+        snippet_elem = result.select_one('.result__snippet')
+        if title_elem and snippet_elem:
+            results.append(f"- {title_elem.get_text(strip=True)}: {snippet_elem.get_text(strip=True)}")
+    
+    if results:
+        return f"Web results for '{query}':\n" + "\n".join(results)
+    
+    return f"No results found for '{query}'"
+
+
 @tool
 def search_web_for_market_data(query: str) -> str:
     """Search for Dubai/UAE real estate market data and statistics.
@@ -261,28 +468,36 @@ def search_web_for_market_data(query: str) -> str:
     search_query = f"Dubai UAE real estate {query} 2024 2025"
     
     try:
-        from duckduckgo_search import DDGS
-        
-        with DDGS() as ddgs:
-            results = list(ddgs.text(search_query, max_results=5))
-        
-        if not results:
-            return "No market data found. Try a more specific query."
-        
-        formatted = ["**GENERAL MARKET DATA** (Not specific to One Development):\n"]
-        for result in results[:3]:
-            title = result.get('title', '')
-            body = result.get('body', result.get('snippet', ''))
-            formatted.append(f"• {title}\n  {body}")
-        
-        formatted.append("\n⚠️ This is general market data. For One Development specific information, contact the sales team.")
-        
-        return "\n\n".join(formatted)
-        
+        return _format_market_data(_ddgs_text(search_query, 5))
     except Exception as e:
         return f"Market data search unavailable: {str(e)}"
 
 
+async def _asearch_web_for_market_data(query: str) -> str:
+    search_query = f"Dubai UAE real estate {query} 2024 2025"
+    
+    try:
+        return _format_market_data(await run_blocking(_ddgs_text, search_query, 5))
+    except Exception as e:
+        return f"Market data search unavailable: {str(e)}"
+
+
+def _format_market_data(results: list) -> str:
+    """Format market search results, clearly labeled as general market data"""
+    if not results:
+        return "No market data found. Try a more specific query."
+    
+    formatted = ["**GENERAL MARKET DATA** (Not specific to One Development):\n"]
+    for result in results[:3]:
+        title = result.get('title', '')
+        body = result.get('body', result.get('snippet', ''))
+        formatted.append(f"• {title}\n  {body}")
+    
+    formatted.append("\n⚠️ This is general market data. For One Development specific information, contact the sales team.")
+    
+    return "\n\n".join(formatted)
+
+
 @tool 
 def scrape_webpage(url: str) -> str:
     """Scrape and extract text content from a specific webpage.
@@ -306,58 +521,10 @@ def scrape_webpage(url: str) -> str:
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
         }
-        response = requests.get(url, headers=headers, timeout=20)
+        response = _fetch(url, headers, timeout=20)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract project-related content more intelligently
-        # Look for project cards, titles, and descriptions
-        project_info = []
-        
-        # Find all headings and nearby text (likely project names)
-        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4']):
-            heading_text = heading.get_text(strip=True)
-            if heading_text and len(heading_text) > 2:
-                project_info.append(f"**{heading_text}**")
-                # Get sibling or parent text
-                parent = heading.find_parent(['div', 'section', 'article'])
-                if parent:
-                    para = parent.find('p')
-                    if para:
-                        project_info.append(para.get_text(strip=True)[:200])
-        
-        # Also extract links that might be project links
-        links_info = []
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-            text = link.get_text(strip=True)
-            if text and len(text) > 3 and len(text) < 100:
-                if any(kw in href.lower() for kw in ['development', 'project', 'property', 'residence', 'tower']):
-                    full_url = href if href.startswith('http') else f"https://oneuae.com{href}"
-                    links_info.append(f"• {text} — {full_url}")
-        
-        # Remove script and style elements for general text
-        for element in soup(['script', 'style', 'nav', 'footer']):
-            element.decompose()
-        
-        # Get general text content
-        text = soup.get_text(separator='\n', strip=True)
-        lines = [line.strip() for line in text.split('\n') if line.strip() and len(line.strip()) > 10]
-        cleaned_text = '\n'.join(lines[:80])  # First 80 meaningful lines
-        
-        # Build response
-        result = f"**Content scraped from {url}:**\n\n"
-        
-        if links_info:
-            result += "**Found Links/Projects:**\n" + '\n'.join(links_info[:15]) + "\n\n"
-        
-        if project_info:
-            result += "**Headings & Content:**\n" + '\n'.join(project_info[:20]) + "\n\n"
-        
-        result += "**Page Text:**\n" + cleaned_text[:2500]
-        
-        return result
+        return _format_scraped_page(url, response.text)
         
     except requests.exceptions.Timeout:
         return f"Timeout accessing {url}. Try again or use search_knowledge_base instead."
@@ -367,6 +534,59 @@ def scrape_webpage(url: str) -> str:
         return f"Error scraping {url}: {str(e)}. Try search_knowledge_base as backup."
 
 
+async def _ascrape_webpage(url: str) -> str:
+    try:
+        response = await _afetch(url, timeout=20)
+        response.raise_for_status()
+        
+        # Parsing is CPU-bound, keep it off the event loop
+        return await run_blocking(_format_scraped_page, url, response.text)
+        
+    except httpx.TimeoutException:
+        return f"Timeout accessing {url}. Try again or use search_knowledge_base instead."
+    except httpx.HTTPError as e:
+        return f"Could not access {url}: {str(e)}. Try search_knowledge_base as backup."
+    except Exception as e:
+        return f"Error scraping {url}: {str(e)}. Try search_knowledge_base as backup."
+
+
+def _format_scraped_page(url: str, html: str) -> str:
+    """Extract project names, links and readable text from a scraped page"""
+    page = extract(html, base_url=url)
+    
+    # Headings and the text under them (likely project names)
+    project_info = []
+    for heading, following in page.sections():
+        if len(heading) > 2:
+            project_info.append(f"**{heading}**")
+            if following:
+                project_info.append(following[:200])
+    
+    # Also extract links that might be project links
+    links_info = []
+    for text, href in page.links:
+        if len(text) > 3 and len(text) < 100:
+            if any(kw in href.lower() for kw in ['development', 'project', 'property', 'residence', 'tower']):
+                links_info.append(f"• {text} — {href}")
+    
+    # Main content, without menus and footers
+    lines = [block.text for block in page.blocks if len(block.text) > 10]
+    cleaned_text = '\n'.join(lines[:80])  # First 80 meaningful lines
+    
+    # Build response
+    result = f"**Content scraped from {url}:**\n\n"
+    
+    if links_info:
+        result += "**Found Links/Projects:**\n" + '\n'.join(links_info[:15]) + "\n\n"
+    
+    if project_info:
+        result += "**Headings & Content:**\n" + '\n'.join(project_info[:20]) + "\n\n"
+    
+    result += "**Page Text:**\n" + cleaned_text[:2500]
+    
+    return result
+
+
 @tool
 def search_one_development_website(query: str) -> str:
     """Search the official One Development website (oneuae.com) for specific information.
@@ -379,27 +599,35 @@ def search_one_development_website(query: str) -> str:
     search_query = f"site:oneuae.com {query}"
     
     try:
-        from duckduckgo_search import DDGS
-        
-        with DDGS() as ddgs:
-            results = list(ddgs.text(search_query, max_results=5))
-        
-        if not results:
-            return f"No results found on oneuae.com for '{query}'. Try contacting the sales team directly."
-        
-        formatted = [f"**Results from One Development Website (oneuae.com):**\n"]
-        for result in results:
-            title = result.get('title', '')
-            href = result.get('href', result.get('link', ''))
-            body = result.get('body', result.get('snippet', ''))
-            formatted.append(f"• **{title}**\n  {body}\n  URL: {href}")
-        
-        return "\n\n".join(formatted)
-        
+        return _format_site_results(query, _ddgs_text(search_query, 5))
+    except Exception as e:
+        return f"Could not search One Development website: {str(e)}"
+
+
+async def _asearch_one_development_website(query: str) -> str:
+    search_query = f"site:oneuae.com {query}"
+    
+    try:
+        return _format_site_results(query, await run_blocking(_ddgs_text, search_query, 5))
     except Exception as e:
         return f"Could not search One Development website: {str(e)}"
 
 
+def _format_site_results(query: str, results: list) -> str:
+    """Format site:oneuae.com search results"""
+    if not results:
+        return f"No results found on oneuae.com for '{query}'. Try contacting the sales team directly."
+    
+    formatted = [f"**Results from One Development Website (oneuae.com):**\n"]
+    for result in results:
+        title = result.get('title', '')
+        href = result.get('href', result.get('link', ''))
+        body = result.get('body', result.get('snippet', ''))
+        formatted.append(f"• **{title}**\n  {body}\n  URL: {href}")
+    
+    return "\n\n".join(formatted)
+
+
 # ============================================================================
 # PDF & DOCUMENT TOOLS - Luna can read PDFs directly!
 # ============================================================================
@@ -418,42 +646,14 @@ def download_and_read_pdf(url: str) -> str:
         Extracted text content from the PDF
     """
     try:
-        from PyPDF2 import PdfReader
-        from io import BytesIO
-        
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _fetch(url, headers, timeout=30)
         response.raise_for_status()
         
-        # Check if it's actually a PDF
-        content_type = response.headers.get('content-type', '')
-        if 'pdf' not in content_type.lower() and not url.lower().endswith('.pdf'):
-            return f"The URL does not appear to be a PDF file: {url}"
-        
-        # Read PDF from memory
-        pdf_file = BytesIO(response.content)
-        reader = PdfReader(pdf_file)
-        
-        # Extract text from all pages
-        text_content = []
-        for i, page in enumerate(reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                text_content.append(f"--- Page {i+1} ---\n{page_text}")
-        
-        if not text_content:
-            return f"PDF downloaded but no text could be extracted from {url}"
-        
-        full_text = "\n\n".join(text_content)
-        
-        # Limit output size
-        if len(full_text) > 8000:
-            full_text = full_text[:8000] + "\n\n[Content truncated - PDF has more content...]"
-        
-        return f"**PDF Content from {url}:**\n\n{full_text}"
+        return _read_pdf_content(url, response.content, response.headers.get('content-type', ''))
         
     except requests.exceptions.Timeout:
         return f"Timeout downloading PDF from {url}"
@@ -463,6 +663,55 @@ def download_and_read_pdf(url: str) -> str:
         return f"Error reading PDF: {str(e)}"
 
 
+async def _adownload_and_read_pdf(url: str) -> str:
+    try:
+        response = await _afetch(url, timeout=30)
+        response.raise_for_status()
+        
+        # PDF text extraction is CPU-bound, keep it off the event loop
+        return await run_blocking(
+            _read_pdf_content, url, response.content, response.headers.get('content-type', '')
+        )
+        
+    except httpx.TimeoutException:
+        return f"Timeout downloading PDF from {url}"
+    except httpx.HTTPError as e:
+        return f"Could not download PDF from {url}: {str(e)}"
+    except Exception as e:
+        return f"Error reading PDF: {str(e)}"
+
+
+def _read_pdf_content(url: str, content: bytes, content_type: str) -> str:
+    """Extract the text of a downloaded PDF, truncated for the agent's context"""
+    from PyPDF2 import PdfReader
+    from io import BytesIO
+    
+    # Check if it's actually a PDF
+    if 'pdf' not in content_type.lower() and not url.lower().endswith('.pdf'):
+        return f"The URL does not appear to be a PDF file: {url}"
+    
+    # Read PDF from memory
+    reader = PdfReader(BytesIO(content))
+    
+    # Extract text from all pages
+    text_content = []
+    for i, page in enumerate(reader.pages):
+        page_text = page.extract_text()
+        if page_text:
+            text_content.append(f"--- Page {i+1} ---\n{page_text}")
+    
+    if not text_content:
+        return f"PDF downloaded but no text could be extracted from {url}"
+    
+    full_text = "\n\n".join(text_content)
+    
+    # Limit output size
+    if len(full_text) > 8000:
+        full_text = full_text[:8000] + "\n\n[Content truncated - PDF has more content...]"
+    
+    return f"**PDF Content from {url}:**\n\n{full_text}"
+
+
 @tool
 def fetch_project_brochure(project_name: str) -> str:
     """Fetch and read the brochure/details for a One Development project.
@@ -476,59 +725,91 @@ def fetch_project_brochure(project_name: str) -> str:
     Returns:
         Project details and brochure content if available
     """
-    # Known project URLs and their brochure endpoints
-    projects = {
-        'laguna residence': {
-            'page': 'https://www.oneuae.com/development-detail?title=Laguna%20Residence',
-            'search_term': 'Laguna Residence One Development Dubai'
-        },
-        'laguna': {
-            'page': 'https://www.oneuae.com/development-detail?title=Laguna%20Residence',
-            'search_term': 'Laguna Residence One Development Dubai'
-        }
-    }
-    
     project_key = project_name.lower().strip()
     
     # First, try to get info from web search about the project
     try:
-        from duckduckgo_search import DDGS
+        results = _ddgs_text(_brochure_search_term(project_name, project_key), 5)
         
-        # Search for project information
-        search_term = f"One Development {project_name} Dubai brochure details"
-        if project_key in projects:
-            search_term = projects[project_key]['search_term']
+        content = [f"**Information about {project_name}:**\n"]
+        for title, body, href in _project_matches(results, project_key):
+            content.append(f"• **{title}**\n  {body}")
+            
+            # If we found a PDF link, try to read it
+            if '.pdf' in href.lower():
+                pdf_content = download_and_read_pdf.invoke({"url": href})
+                if "Error" not in pdf_content and "Could not" not in pdf_content:
+                    content.append(f"\n📄 **Brochure Content:**\n{pdf_content}")
         
-        with DDGS() as ddgs:
-            results = list(ddgs.text(search_term, max_results=5))
+        return _format_project_brochure(project_name, content)
         
-        if results:
-            content = [f"**Information about {project_name}:**\n"]
-            
-            for result in results:
-                title = result.get('title', '')
-                body = result.get('body', '')
-                href = result.get('href', '')
-                
-                if 'one' in title.lower() or 'one' in href.lower() or project_key in title.lower():
-                    content.append(f"• **{title}**\n  {body}")
-                    
-                    # If we found a PDF link, try to read it
-                    if '.pdf' in href.lower():
-                        pdf_content = download_and_read_pdf.invoke({"url": href})
-                        if "Error" not in pdf_content and "Could not" not in pdf_content:
-                            content.append(f"\n📄 **Brochure Content:**\n{pdf_content}")
+    except Exception as e:
+        return f"Error fetching project information: {str(e)}. Please visit oneuae.com for brochure downloads."
+
+
+async def _afetch_project_brochure(project_name: str) -> str:
+    project_key = project_name.lower().strip()
+    
+    try:
+        results = await run_blocking(_ddgs_text, _brochure_search_term(project_name, project_key), 5)
+        
+        content = [f"**Information about {project_name}:**\n"]
+        for title, body, href in _project_matches(results, project_key):
+            content.append(f"• **{title}**\n  {body}")
             
-            if len(content) > 1:
-                content.append(f"\n\n📍 For more details, visit: oneuae.com")
-                return "\n\n".join(content)
+            if '.pdf' in href.lower():
+                # PDF downloads are slow - keep what we have if we run out of time
+                report_partial(_format_project_brochure(project_name, list(content)))
+                pdf_content = await download_and_read_pdf.ainvoke({"url": href})
+                if "Error" not in pdf_content and "Could not" not in pdf_content:
+                    content.append(f"\n📄 **Brochure Content:**\n{pdf_content}")
         
-        return f"I couldn't find detailed information about {project_name}. Please visit oneuae.com or contact the sales team for brochures and details."
+        return _format_project_brochure(project_name, content)
         
     except Exception as e:
         return f"Error fetching project information: {str(e)}. Please visit oneuae.com for brochure downloads."
 
 
+# Known project URLs and their brochure endpoints
+_KNOWN_PROJECTS = {
+    'laguna residence': {
+        'page': 'https://www.oneuae.com/development-detail?title=Laguna%20Residence',
+        'search_term': 'Laguna Residence One Development Dubai'
+    },
+    'laguna': {
+        'page': 'https://www.oneuae.com/development-detail?title=Laguna%20Residence',
+        'search_term': 'Laguna Residence One Development Dubai'
+    }
+}
+
+
+def _brochure_search_term(project_name: str, project_key: str) -> str:
+    """Search term for a project's brochure, using the known term when we have one"""
+    if project_key in _KNOWN_PROJECTS:
+        return _KNOWN_PROJECTS[project_key]['search_term']
+    return f"One Development {project_name} Dubai brochure details"
+
+
+def _project_matches(results: list, project_key: str) -> list:
+    """(title, body, href) for search results that look like they're about the project"""
+    matches = []
+    for result in results:
+        title = result.get('title', '')
+        body = result.get('body', '')
+        href = result.get('href', '')
+        if 'one' in title.lower() or 'one' in href.lower() or project_key in title.lower():
+            matches.append((title, body, href))
+    return matches
+
+
+def _format_project_brochure(project_name: str, content: list) -> str:
+    if len(content) > 1:
+        content.append(f"\n\n📍 For more details, visit: oneuae.com")
+        return "\n\n".join(content)
+    
+    return f"I couldn't find detailed information about {project_name}. Please visit oneuae.com or contact the sales team for brochures and details."
+
+
 @tool
 def get_project_details(project_name: str) -> str:
     """Get comprehensive details about a One Development project.
@@ -544,32 +825,52 @@ def get_project_details(project_name: str) -> str:
     """
     from knowledge.vector_store import get_vector_store
     
-    results = []
-    
     # 1. Search internal knowledge base
     try:
-        vector_store = get_vector_store()
-        kb_results = vector_store.similarity_search(project_name, k=3)
-        if kb_results:
-            results.append("**From One Development Knowledge Base:**")
-            for doc in kb_results:
-                results.append(doc.page_content[:1000])
+        kb_results = get_vector_store().similarity_search(project_name, k=3)
     except:
-        pass
+        kb_results = []
     
     # 2. Search web for project info
     try:
-        from duckduckgo_search import DDGS
-        with DDGS() as ddgs:
-            web_results = list(ddgs.text(f"One Development {project_name} Dubai", max_results=3))
-        
-        if web_results:
-            results.append("\n**From Web Search:**")
-            for r in web_results:
-                if 'one' in r.get('title', '').lower() or 'one' in r.get('href', '').lower():
-                    results.append(f"• {r.get('title', '')}: {r.get('body', '')}")
+        web_results = _ddgs_text(f"One Development {project_name} Dubai", 3)
     except:
-        pass
+        web_results = []
+    
+    return _format_project_details(project_name, kb_results, web_results)
+
+
+async def _aget_project_details(project_name: str) -> str:
+    from knowledge.vector_store import get_vector_store
+    
+    # Knowledge base and web search are independent - run them side by side
+    kb_results, web_results = await asyncio.gather(
+        get_vector_store().asimilarity_search(project_name, k=3),
+        run_blocking(_ddgs_text, f"One Development {project_name} Dubai", 3),
+        return_exceptions=True
+    )
+    if isinstance(kb_results, BaseException):
+        kb_results = []
+    if isinstance(web_results, BaseException):
+        web_results = []
+    
+    return _format_project_details(project_name, kb_results, web_results)
+
+
+def _format_project_details(project_name: str, kb_results: list, web_results: list) -> str:
+    """Combine knowledge base hits, web hits and standard project context"""
+    results = []
+    
+    if kb_results:
+        results.append("**From One Development Knowledge Base:**")
+        for doc in kb_results:
+            results.append(doc.page_content[:1000])
+    
+    if web_results:
+        results.append("\n**From Web Search:**")
+        for r in web_results:
+            if 'one' in r.get('title', '').lower() or 'one' in r.get('href', '').lower():
+                results.append(f"• {r.get('title', '')}: {r.get('body', '')}")
     
     # 3. Add standard project context
     results.append(f"""
@@ -601,45 +902,67 @@ def find_and_read_brochure(search_query: str) -> str:
         Content from found brochures or guidance on how to get them
     """
     try:
-        from duckduckgo_search import DDGS
-        
         # Search for PDFs
         query = f"{search_query} filetype:pdf site:oneuae.com OR One Development"
-        
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=5))
-        
-        pdf_urls = []
-        other_results = []
-        
-        for result in results:
-            href = result.get('href', '')
-            if '.pdf' in href.lower():
-                pdf_urls.append(href)
-            else:
-                other_results.append(result)
+        pdf_urls, other_results = _split_pdf_results(_ddgs_text(query, 5))
         
         # Try to read found PDFs
-        if pdf_urls:
-            for pdf_url in pdf_urls[:2]:  # Limit to 2 PDFs
-                pdf_content = download_and_read_pdf.invoke({"url": pdf_url})
-                if "Error" not in pdf_content and "Could not" not in pdf_content:
-                    return pdf_content
+        for pdf_url in pdf_urls[:2]:  # Limit to 2 PDFs
+            pdf_content = download_and_read_pdf.invoke({"url": pdf_url})
+            if "Error" not in pdf_content and "Could not" not in pdf_content:
+                return pdf_content
         
         # If no PDFs found, return search results
+        return _format_brochure_search(search_query, other_results)
+        
+    except Exception as e:
+        return f"Error searching for brochures: {str(e)}. Visit oneuae.com for brochure downloads."
+
+
+async def _afind_and_read_brochure(search_query: str) -> str:
+    try:
+        query = f"{search_query} filetype:pdf site:oneuae.com OR One Development"
+        pdf_urls, other_results = _split_pdf_results(await run_blocking(_ddgs_text, query, 5))
         if other_results:
-            content = [f"**Search results for '{search_query}':**\n"]
-            for r in other_results[:3]:
-                content.append(f"• **{r.get('title', '')}**\n  {r.get('body', '')}\n  URL: {r.get('href', '')}")
-            content.append("\n\n📥 **To download brochures:** Visit oneuae.com and click 'Download Brochure' on any project page.")
-            return "\n\n".join(content)
+            report_partial(_format_brochure_search(search_query, other_results))
         
-        return f"No brochures found for '{search_query}'. Visit oneuae.com to download brochures directly."
+        for pdf_url in pdf_urls[:2]:
+            pdf_content = await download_and_read_pdf.ainvoke({"url": pdf_url})
+            if "Error" not in pdf_content and "Could not" not in pdf_content:
+                return pdf_content
+        
+        return _format_brochure_search(search_query, other_results)
         
     except Exception as e:
         return f"Error searching for brochures: {str(e)}. Visit oneuae.com for brochure downloads."
 
 
+def _split_pdf_results(results: list) -> tuple:
+    """Split search results into (pdf_urls, other_results)"""
+    pdf_urls = []
+    other_results = []
+    
+    for result in results:
+        href = result.get('href', '')
+        if '.pdf' in href.lower():
+            pdf_urls.append(href)
+        else:
+            other_results.append(result)
+    
+    return pdf_urls, other_results
+
+
+def _format_brochure_search(search_query: str, other_results: list) -> str:
+    if other_results:
+        content = [f"**Search results for '{search_query}':**\n"]
+        for r in other_results[:3]:
+            content.append(f"• **{r.get('title', '')}**\n  {r.get('body', '')}\n  URL: {r.get('href', '')}")
+        content.append("\n\n📥 **To download brochures:** Visit oneuae.com and click 'Download Brochure' on any project page.")
+        return "\n\n".join(content)
+    
+    return f"No brochures found for '{search_query}'. Visit oneuae.com to download brochures directly."
+
+
 
 
 # ============================================================================
@@ -726,6 +1049,17 @@ def get_user_context(session_id: str) -> str:
         return "User context not available."
 
 
+async def _aget_user_context(session_id: str) -> str:
+    try:
+        from knowledge.vector_store import get_vector_store
+        results = await get_vector_store().asimilarity_search(f"user preferences session {session_id}", k=2)
+        if results:
+            return f"User context: {results[0].page_content}"
+        return "No previous user context found."
+    except:
+        return "User context not available."
+
+
 @tool
 def save_user_information(session_id: str, information: str) -> str:
     """Save user preferences or important information for future reference.
@@ -742,6 +1076,112 @@ def save_user_information(session_id: str, information: str) -> str:
         return f"Could not save user information: {str(e)}"
 
 
+# ============================================================================
+# ASYNC IMPLEMENTATIONS
+# ============================================================================
+# Attach the async variants so tool.ainvoke (and ToolNode under agent.ainvoke)
+# awaits them directly instead of parking every call on a worker thread.
+# Identical concurrent calls (same tool and arguments, e.g. many users asking
+# the same question at once) share one in-flight call. Each call runs under
+# its tool's timeout and concurrency limit (see agent/tool_runtime.py). Good
+# results of web, search and scrape tools are cached across sessions for a
+# per-tool TTL (see agent/result_cache.py).
+
+# Tools whose calls are per-session and cheap - not worth coalescing
+_PER_SESSION_TOOLS = ('get_user_context',)
+
+
+def _single_flight(name: str, coroutine):
+    """
+    Wrap a tool coroutine so identical in-flight calls are made only once.
+    
+    The shared call collects the facts of the KB chunks it retrieves on its
+    own, and every caller (not just the one that started it) merges them into
+    its turn's facts.
+    """
+    async def shared_call(*args, **kwargs):
+        with collecting_facts() as facts:
+            return await coroutine(*args, **kwargs), facts
+    
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        result, facts = await get_tool_flights().do(call_key(name, *args, **kwargs), shared_call, *args, **kwargs)
+        merge_retrieved(facts)
+        return result
+    return wrapper
+
+
+def _cached(name: str, coroutine):
+    """Wrap a tool coroutine so good results are served from the shared cache"""
+    ttl = TOOL_CACHE_TTLS.get(name)
+    if not TOOL_CACHE_ENABLED or ttl is None:
+        return coroutine
+    
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        cache = get_tool_cache()
+        key = call_key(name, *args, **kwargs)
+        result = await cache.aget(name, key)
+        if result is None:
+            result = await coroutine(*args, **kwargs)
+            if is_good_result(result):
+                await cache.aset(name, key, result, ttl)
+        return result
+    return wrapper
+
+
+def _cached_sync(name: str, func):
+    """Sync counterpart of _cached for a tool's blocking implementation"""
+    ttl = TOOL_CACHE_TTLS.get(name)
+    if not TOOL_CACHE_ENABLED or ttl is None:
+        return func
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = get_tool_cache()
+        key = call_key(name, *args, **kwargs)
+        result = cache.get(name, key)
+        if result is None:
+            result = func(*args, **kwargs)
+            if is_good_result(result):
+                cache.set(name, key, result, ttl)
+        return result
+    return wrapper
+
+
+async def _ahedge_web_search(query: str, max_results: int = 5) -> str:
+    """Hedge for search_web: the DuckDuckGo HTML endpoint"""
+    return await _afallback_web_search(query)
+
+
+# Alternatives raced against a slow or failing primary
+_HEDGES = {
+    'search_web': _ahedge_web_search,
+}
+
+
+for _tool, _coroutine in (
+    (search_knowledge_base, _asearch_knowledge_base),
+    (search_uploaded_documents, _asearch_uploaded_documents),
+    (tavily_search, _atavily_search),
+    (tavily_research, _atavily_research),
+    (search_web, _asearch_web),
+    (search_web_for_market_data, _asearch_web_for_market_data),
+    (scrape_webpage, _ascrape_webpage),
+    (search_one_development_website, _asearch_one_development_website),
+    (download_and_read_pdf, _adownload_and_read_pdf),
+    (fetch_project_brochure, _afetch_project_brochure),
+    (get_project_details, _aget_project_details),
+    (find_and_read_brochure, _afind_and_read_brochure),
+    (get_user_context, _aget_user_context),
+):
+    _coroutine = guard_tool(_tool.name, _coroutine, hedge=_HEDGES.get(_tool.name))
+    if _tool.name not in _PER_SESSION_TOOLS:
+        _coroutine = _single_flight(_tool.name, _coroutine)
+    _tool.coroutine = _cached(_tool.name, _coroutine)
+    _tool.func = _cached_sync(_tool.name, _tool.func)
+
+
 # ============================================================================
 # TOOL GETTERS
 # ============================================================================
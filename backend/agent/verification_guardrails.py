@@ -18,11 +18,18 @@ Key Features:
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from collections import OrderedDict
+import copy
+import hashlib
 import re
+import threading
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 import os
 
+from agent.claim_support import get_claim_support_scorer
+from knowledge.fact_index import FactSet, bare_numbers, extract_facts
+
 
 class VerificationLevel(Enum):
     """Levels of verification confidence"""
@@ -43,6 +50,107 @@ class VerificationResult:
     corrections: List[Dict[str, str]]
     needs_disclaimer: bool
     suggested_improvements: List[str]
+    patched_response: Optional[str] = None  # Corrected response from the structured check
+
+
+# Use one structured-output LLM call for claims, corrections and the patched
+# response instead of three free-text calls (falls back to those on failure)
+STRUCTURED_VERIFICATION = os.getenv('LUNA_STRUCTURED_VERIFICATION', 'True') == 'True'
+
+VERIFICATION_SCHEMA = {
+    "title": "verification_report",
+    "description": "Fact-check of an assistant response against its context",
+    "type": "object",
+    "properties": {
+        "unsupported_claims": {
+            "type": "array",
+            "description": "Specific claims, numbers, dates or facts NOT supported by the context",
+            "items": {"type": "string"}
+        },
+        "corrections": {
+            "type": "array",
+            "description": "One correction per issue (unsupported claims and already flagged issues)",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "issue": {"type": "string"},
+                    "correction": {"type": "string"}
+                },
+                "required": ["issue", "correction"],
+                "additionalProperties": False
+            }
+        },
+        "patched_response": {
+            "type": "string",
+            "description": "The response with all corrections applied, or the original response if nothing needs fixing"
+        }
+    },
+    "required": ["unsupported_claims", "corrections", "patched_response"],
+    "additionalProperties": False
+}
+
+
+# Maximum number of memoized verification results (LRU)
+VERIFICATION_CACHE_SIZE = int(os.getenv('LUNA_VERIFICATION_CACHE_SIZE', '512'))
+
+
+class VerificationCache:
+    """
+    Bounded LRU of verification results.
+    
+    Keyed by a fingerprint of the normalized response, the hashes of the
+    context and tool results it was checked against, and the knowledge base
+    generation - so a repeated answer over the same retrieved content
+    verifies instantly and identically, and any KB change invalidates it.
+    """
+    
+    def __init__(self, max_size: int = VERIFICATION_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def fingerprint(
+        response: str,
+        context: List[str],
+        tool_results: Dict[str, str],
+        kb_generation: str,
+        *flags
+    ) -> str:
+        """Fingerprint of everything a verification result depends on"""
+        def digest(text):
+            return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+        
+        normalized_response = ' '.join(response.split())
+        parts = [
+            digest(normalized_response),
+            *sorted(digest(chunk) for chunk in context),
+            '--',
+            *sorted(f"{name}:{digest(result)}" for name, result in tool_results.items()),
+            '--',
+            kb_generation,
+            *(str(flag) for flag in flags)
+        ]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional['VerificationResult']:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)
+    
+    def put(self, key: str, result: 'VerificationResult'):
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
 
 
 class VerificationGuardrails:
@@ -71,13 +179,21 @@ class VerificationGuardrails:
             'location', 'address', 'career', 'job', 'hiring',
             'phone', 'email', 'contact'
         ]
+        
+        self.structured_llm = self.llm.with_structured_output(
+            VERIFICATION_SCHEMA, method="json_schema", strict=True
+        )
+        
+        self.cache = VerificationCache()
     
     def verify_response(
         self,
         query: str,
         response: str,
         context: List[str],
-        tool_results: Dict[str, str]
+        tool_results: Dict[str, str],
+        retrieved_facts: Optional[FactSet] = None,
+        use_llm: bool = True
     ) -> VerificationResult:
         """
         Comprehensive verification of Luna's response.
@@ -87,32 +203,98 @@ class VerificationGuardrails:
             response: Luna's proposed response
             context: Context retrieved from knowledge base
             tool_results: Results from tools used
+            retrieved_facts: Indexed facts of the KB chunks retrieved this turn
+            use_llm: False runs only the local checks (no LLM calls)
             
         Returns:
             VerificationResult with verification status and suggestions
         """
+        is_critical = any(topic in query.lower() for topic in self.critical_topics)
+        
+        try:
+            from knowledge.vector_store import get_vector_store
+            kb_generation = get_vector_store().generation
+        except Exception:
+            kb_generation = None
+        
+        # Same response over the same retrieved content: reuse the earlier result
+        cache_key = None
+        if kb_generation is not None:
+            cache_key = self.cache.fingerprint(
+                response, context, tool_results, kb_generation, is_critical, use_llm
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        result = self._verify_response(query, response, context, tool_results, retrieved_facts, use_llm)
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+    
+    def _verify_response(
+        self,
+        query: str,
+        response: str,
+        context: List[str],
+        tool_results: Dict[str, str],
+        retrieved_facts: Optional[FactSet],
+        use_llm: bool
+    ) -> VerificationResult:
+        """Run the verification checks (uncached)"""
         issues_found = []
         corrections = []
         sources = []
         suggested_improvements = []
         
-        # 1. Check for unsupported claims
-        unsupported_claims = self._detect_unsupported_claims(
-            response, context, tool_results
-        )
-        if unsupported_claims:
-            issues_found.extend(unsupported_claims)
-        
-        # 2. Check for hallucinations
-        hallucinations = self._detect_hallucinations(response, context)
-        if hallucinations:
-            issues_found.extend([f"Potential hallucination: {h}" for h in hallucinations])
+        # 1. Check for hallucinations (local pattern checks run first so the
+        #    LLM check can correct what they flag)
+        hallucinations = [
+            f"Potential hallucination: {h}"
+            for h in self._detect_hallucinations(response, context, retrieved_facts)
+        ]
         
-        # 3. Verify specific facts
+        # 2. Verify specific facts
         fact_checks = self._verify_specific_facts(response, tool_results)
         sources.extend(fact_checks['sources'])
-        if fact_checks['unverified_facts']:
-            issues_found.extend(fact_checks['unverified_facts'])
+        local_issues = hallucinations + fact_checks['unverified_facts']
+        
+        # 3. Check for unsupported claims. Sentences are scored against the
+        #    context locally; only low-scoring ones go to the LLM fact-checker
+        support = get_claim_support_scorer().check(
+            response, context or list(tool_results.values())
+        )
+        sentences_to_check = [sentence for sentence, _ in support['unsupported']]
+        
+        structured = None
+        if not sentences_to_check and not local_issues:
+            # Everything is supported by the context - no LLM call needed
+            structured = {'unsupported_claims': [], 'corrections': [], 'patched_response': response}
+        elif not use_llm:
+            # Local-only tier: low-support sentences are the issues, nothing is patched
+            structured = {
+                'unsupported_claims': [f"Weakly supported: {sentence}" for sentence in sentences_to_check],
+                'corrections': [],
+                'patched_response': response
+            }
+        elif STRUCTURED_VERIFICATION:
+            # One structured call that also returns corrections and a patched response
+            structured = self._structured_check(
+                query, response, context, tool_results, local_issues, sentences_to_check
+            )
+        
+        if structured is not None:
+            issues_found.extend(structured['unsupported_claims'])
+            issues_found.extend(local_issues)
+            corrections = structured['corrections'] if issues_found else []
+        else:
+            # Fallback: free-text claim detection (corrections follow in step 8)
+            if sentences_to_check:
+                issues_found.extend(self._detect_unsupported_claims(
+                    ' '.join(sentences_to_check), context, tool_results
+                ))
+            issues_found.extend(local_issues)
         
         # 4. Check for critical topic confidence
         is_critical = any(topic in query.lower() for topic in self.critical_topics)
@@ -137,8 +319,8 @@ class VerificationGuardrails:
             is_critical and verification_level in [VerificationLevel.LOW, VerificationLevel.UNVERIFIED]
         ) or len(issues_found) > 2
         
-        # 8. Generate corrections if needed
-        if issues_found:
+        # 8. Generate corrections if needed (fallback path only)
+        if issues_found and structured is None:
             corrections = self._generate_corrections(
                 query, response, issues_found, context, tool_results
             )
@@ -161,9 +343,72 @@ class VerificationGuardrails:
             issues_found=issues_found,
             corrections=corrections,
             needs_disclaimer=needs_disclaimer,
-            suggested_improvements=suggested_improvements
+            suggested_improvements=suggested_improvements,
+            patched_response=structured['patched_response'] if structured and corrections else None
         )
     
+    def _structured_check(
+        self,
+        query: str,
+        response: str,
+        context: List[str],
+        tool_results: Dict[str, str],
+        flagged_issues: List[str],
+        sentences_to_check: List[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find unsupported claims, correct them and patch the response in one call.
+        
+        Replaces _detect_unsupported_claims, _generate_corrections and
+        _regenerate_with_corrections, which each re-sent the response and
+        context and parsed free text.
+        
+        Returns:
+            Dict matching VERIFICATION_SCHEMA, or None if the call failed
+        """
+        
+        check_prompt = f"""You are a fact-checker and editor for Luna, One Development's AI assistant.
+
+USER QUERY: {query}
+
+RESPONSE TO CHECK:
+{response}
+
+AVAILABLE CONTEXT:
+{chr(10).join(context) if context else "No context available"}
+
+TOOL RESULTS:
+{chr(10).join([f"{k}: {v[:200]}..." for k, v in tool_results.items()]) if tool_results else "No tool results"}
+
+ALREADY FLAGGED ISSUES:
+{chr(10).join(f"- {issue}" for issue in flagged_issues) if flagged_issues else "None"}
+
+SENTENCES TO CHECK (the rest of the response already matches the context):
+{chr(10).join(f"- {sentence}" for sentence in sentences_to_check) if sentences_to_check else "All sentences"}
+
+TASK:
+1. unsupported_claims: list specific claims, numbers, dates or facts in the sentences to check that are NOT clearly supported by the context. Empty if everything is supported or the response appropriately admits uncertainty.
+2. corrections: for each unsupported claim and each already flagged issue, a specific, actionable correction.
+3. patched_response: the response with all corrections applied - keep Luna's helpful, professional tone and formatting, be honest about what isn't known, and keep the next steps. If nothing needs fixing, return the response unchanged.
+"""
+        
+        try:
+            result = self.structured_llm.invoke([
+                SystemMessage(content="You are a precise fact-checker and careful editor."),
+                HumanMessage(content=check_prompt)
+            ])
+            return {
+                'unsupported_claims': [c.strip() for c in result.get('unsupported_claims', []) if c.strip()],
+                'corrections': [
+                    {'issue': c['issue'].strip(), 'correction': c['correction'].strip()}
+                    for c in result.get('corrections', [])
+                ],
+                'patched_response': (result.get('patched_response') or '').strip() or response
+            }
+        except Exception as e:
+            print(f"⚠️ Structured verification failed, using fallback: {e}")
+            return None
+    
     def _detect_unsupported_claims(
         self,
         response: str,
@@ -209,10 +454,14 @@ Format: Return only a comma-separated list of unsupported claims, or "NONE".
     def _detect_hallucinations(
         self,
         response: str,
-        context: List[str]
+        context: List[str],
+        retrieved_facts: Optional[FactSet] = None
     ) -> List[str]:
         """Detect potential hallucinations using pattern matching"""
         
+        if retrieved_facts:
+            return self._check_facts(response, context, retrieved_facts)
+        
         hallucinations = []
         
         # Check for specific numbers without context support
@@ -243,6 +492,54 @@ Format: Return only a comma-separated list of unsupported claims, or "NONE".
         
         return hallucinations
     
+    # Fact kinds checked against the fact index, with how they are reported
+    FACT_LABELS = [
+        ('prices', "Unverified Specific price: AED {}"),
+        ('areas', "Unverified Specific square footage: {} sqft"),
+        ('bedrooms', "Unverified Specific bedroom count: {}"),
+        ('phones', "Unverified phone number: {}"),
+        ('emails', "Unverified email: {}"),
+        ('numbers', "Unverified number: {}"),
+    ]
+    
+    # Where a bare number from the response may be found in the sources
+    NUMBER_KINDS = ('numbers', 'prices', 'areas')
+    
+    def _check_facts(
+        self,
+        response: str,
+        context: List[str],
+        retrieved_facts: FactSet
+    ) -> List[str]:
+        """
+        Check the response's facts with set lookups against the fact index.
+        
+        Facts were normalized at ingestion, so "1,200 sq.ft" matches "1200 sqft".
+        Only when a fact isn't in the retrieved chunks (e.g. it came from a web
+        result) is the rest of the context scanned - once, lazily.
+        """
+        hallucinations = []
+        response_facts = extract_facts(response)
+        # Numbers inside a price, area or phone are checked as that, not again on their own
+        response_facts['numbers'] = bare_numbers(response)
+        years = response_facts.get('years', set())
+        context_facts = None
+        
+        for kind, label in self.FACT_LABELS:
+            # A bare number may be written as a price or area in the sources ("1,200,000" vs "AED 1.2M")
+            lookup_kinds = self.NUMBER_KINDS if kind == 'numbers' else (kind,)
+            for value in sorted(response_facts.get(kind, ())):
+                if kind == 'numbers' and value in years:
+                    continue  # Years are acceptable
+                if any(retrieved_facts.contains(lookup, value) for lookup in lookup_kinds):
+                    continue
+                if context_facts is None:
+                    context_facts = extract_facts('\n'.join(context))
+                if not any(value in context_facts.get(lookup, ()) for lookup in lookup_kinds):
+                    hallucinations.append(label.format(value))
+        
+        return hallucinations
+    
     def _verify_specific_facts(
         self,
         response: str,
@@ -477,6 +774,10 @@ CORRECTION: [specific correction]
     ) -> str:
         """Regenerate response incorporating corrections"""
         
+        # The structured check already produced the corrected response
+        if verification_result.patched_response:
+            return verification_result.patched_response
+        
         corrections_text = "\n".join([
             f"- {c['issue']}: {c['correction']}"
             for c in verification_result.corrections
@@ -0,0 +1,190 @@
+"""
+Risk-tiered verification policy for Luna's streamed answers.
+
+Not every answer needs the full verification pipeline. A greeting has nothing
+to check; an answer that restates well-retrieved KB content only needs the
+local checks; a payment-plan answer full of prices gets the LLM fact-checker.
+
+The tier is picked per turn from:
+- topic criticality (the guardrails' critical_topics)
+- retrieval quality (distance of the closest retrieved KB chunk)
+- the number of factual tokens (prices, sizes, phones, ...) in the answer
+
+Each tier has a latency budget; verification that overruns it is abandoned.
+The configured budget is a floor: once enough runs of a tier have been timed,
+its budget follows their p95 (with headroom, up to a cap), so a slow
+fact-checker doesn't get every FULL verification cut off. Outcomes - passed,
+found issues, timed out - are counted separately per tier.
+"""
+
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional
+
+from knowledge.fact_index import FactSet, extract_facts
+
+
+class VerificationTier(Enum):
+    """How much verification an answer gets"""
+    NONE = "none"    # Nothing checkable - skip verification
+    LOCAL = "local"  # In-process checks only (fact index, claim support)
+    FULL = "full"    # Local checks plus the LLM fact-checker
+
+
+# Minimum latency budget per tier, in seconds. FULL covers the structured
+# fact-check call plus, when it finds issues, the rewrite - each streams a full
+# answer from gpt-4o-mini, roughly 6-10 s apiece.
+TIER_BUDGETS = {
+    VerificationTier.NONE: 0.0,
+    VerificationTier.LOCAL: float(os.getenv('LUNA_VERIFY_BUDGET_LOCAL', '1.0')),
+    VerificationTier.FULL: float(os.getenv('LUNA_VERIFY_BUDGET_FULL', '25.0')),
+}
+
+# Upper bound for budgets raised from measured latencies
+TIER_BUDGET_CAPS = {
+    VerificationTier.NONE: 0.0,
+    VerificationTier.LOCAL: float(os.getenv('LUNA_VERIFY_BUDGET_CAP_LOCAL', '5.0')),
+    VerificationTier.FULL: float(os.getenv('LUNA_VERIFY_BUDGET_CAP_FULL', '60.0')),
+}
+
+# Recent runs per tier the budget is sized from, and how many are needed first
+LATENCY_WINDOW = int(os.getenv('LUNA_VERIFY_LATENCY_WINDOW', '100'))
+LATENCY_MIN_SAMPLES = 10
+
+# Budget = p95 of recent runs times this
+BUDGET_HEADROOM = 1.25
+
+VERIFICATION_OUTCOMES = ('passed', 'issues', 'timed_out')
+
+# This many factual tokens always gets the full tier
+FULL_TIER_FACTS = int(os.getenv('LUNA_VERIFY_FULL_TIER_FACTS', '5'))
+
+# Retrieval weaker than this (Chroma L2 distance) counts as a miss
+WEAK_RETRIEVAL_DISTANCE = float(os.getenv('LUNA_VERIFY_WEAK_RETRIEVAL_DISTANCE', '1.2'))
+
+# Fact kinds that count as factual tokens (years alone are not risky)
+_RISKY_KINDS = ('prices', 'areas', 'bedrooms', 'phones', 'emails', 'numbers')
+
+
+@dataclass
+class TierDecision:
+    """The chosen tier, its budget and why it was chosen"""
+    tier: VerificationTier
+    budget: float
+    reasons: List[str] = field(default_factory=list)
+
+    def to_metadata(self) -> dict:
+        return {
+            'tier': self.tier.value,
+            'budget_ms': int(self.budget * 1000),
+            'reasons': self.reasons
+        }
+
+
+class VerificationPolicy:
+    """Picks a verification tier for each answer"""
+
+    def __init__(self, critical_topics: List[str]):
+        self.critical_topics = critical_topics
+        self._latencies = {tier: deque(maxlen=LATENCY_WINDOW) for tier in VerificationTier}
+        self._outcomes = {tier: dict.fromkeys(VERIFICATION_OUTCOMES, 0) for tier in VerificationTier}
+        self._lock = threading.Lock()
+
+    def choose_tier(
+        self,
+        query: str,
+        response: str,
+        retrieved_facts: Optional[FactSet] = None
+    ) -> TierDecision:
+        """
+        Pick the verification tier for one answer.
+
+        Args:
+            query: User's question
+            response: Luna's answer
+            retrieved_facts: Facts and distances of the KB chunks retrieved this turn
+
+        Returns:
+            TierDecision with the tier, its latency budget and the reasons
+        """
+        response_facts = extract_facts(response)
+        years = response_facts.get('years', set())
+        fact_count = sum(
+            len(response_facts.get(kind, set()) - (years if kind == 'numbers' else set()))
+            for kind in _RISKY_KINDS
+        )
+
+        query_lower = query.lower()
+        critical = [topic for topic in self.critical_topics if topic in query_lower]
+
+        best_distance = retrieved_facts.best_distance if retrieved_facts is not None else None
+        weak_retrieval = best_distance is None or best_distance > WEAK_RETRIEVAL_DISTANCE
+
+        reasons = [f'{fact_count} factual tokens']
+        if critical:
+            reasons.append(f"critical topic: {', '.join(critical)}")
+        reasons.append('weak retrieval' if weak_retrieval else f'retrieval distance {best_distance:.2f}')
+
+        if fact_count == 0 and not critical:
+            tier = VerificationTier.NONE
+        elif (critical and fact_count > 0) or fact_count >= FULL_TIER_FACTS or (weak_retrieval and fact_count > 0):
+            tier = VerificationTier.FULL
+        else:
+            tier = VerificationTier.LOCAL
+
+        return TierDecision(tier=tier, budget=self.budget(tier), reasons=reasons)
+
+    def budget(self, tier: VerificationTier) -> float:
+        """Latency budget of a tier: the configured floor, or the measured p95 with headroom"""
+        floor = TIER_BUDGETS[tier]
+        with self._lock:
+            latencies = sorted(self._latencies[tier])
+        if len(latencies) < LATENCY_MIN_SAMPLES:
+            return floor
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return min(max(floor, p95 * BUDGET_HEADROOM), max(floor, TIER_BUDGET_CAPS[tier]))
+
+    def record(self, tier: VerificationTier, elapsed: float, outcome: str):
+        """
+        Record how a verification run ended.
+
+        Args:
+            tier: The run's tier
+            elapsed: Seconds spent (for a timeout, at least the budget - so
+                repeated timeouts raise the budget, up to the cap)
+            outcome: 'passed', 'issues' or 'timed_out'
+        """
+        with self._lock:
+            self._latencies[tier].append(elapsed)
+            self._outcomes[tier][outcome] += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """Outcome counts, latencies and current budget per tier (NONE is never run)"""
+        stats = {}
+        for tier in (VerificationTier.LOCAL, VerificationTier.FULL):
+            with self._lock:
+                latencies = sorted(self._latencies[tier])
+                outcomes = dict(self._outcomes[tier])
+            stats[tier.value] = {
+                **outcomes,
+                'p50_ms': int(latencies[len(latencies) // 2] * 1000) if latencies else None,
+                'p95_ms': int(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000) if latencies else None,
+                'budget_ms': int(self.budget(tier) * 1000)
+            }
+        return stats
+
+
+# Singleton instance
+_verification_policy = None
+
+
+def get_verification_policy() -> VerificationPolicy:
+    """Get singleton instance of the verification policy"""
+    global _verification_policy
+    if _verification_policy is None:
+        from agent.verification_guardrails import get_verification_guardrails
+        _verification_policy = VerificationPolicy(get_verification_guardrails().critical_topics)
+    return _verification_policy
@@ -3,12 +3,163 @@ Web Access Tools for Real-time Fact Checking
 Allows the agent to access websites and verify information
 """
 
-import requests
-from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+import os
 import re
 from urllib.parse import urlparse, urljoin
 
+from agent.html_extract import extract_text
+from agent.http_client import fetch
+from agent.result_cache import get_tool_cache, TOOL_CACHE_TTLS
+
+
+# Overall seconds a multi-source search waits for its sources
+WEB_SOURCES_DEADLINE = float(os.getenv('LUNA_WEB_SOURCES_DEADLINE', '12'))
+
+# Snippets kept from a multi-source search
+MAX_SNIPPETS = 12
+
+# Shared by all fan-outs; fetches are I/O-bound
+_source_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('LUNA_WEB_SOURCE_WORKERS', '16')),
+    thread_name_prefix='luna-web-source'
+)
+
+PORTAL_SOURCES = ('property_finder', 'bayut', 'dubai_properties')
+NEWS_SOURCES = ('gulf_news_property', 'arabianbusiness_property', 'zawya_property')
+
+SOURCE_NAMES = {
+    'company_website': 'Company Website',
+    'linkedin': 'LinkedIn',
+    'property_finder': 'Property Finder',
+    'bayut': 'Bayut',
+    'dubai_properties': 'Dubai Properties',
+    'gulf_news_property': 'Gulf News',
+    'arabianbusiness_property': 'Arabian Business',
+    'zawya_property': 'Zawya',
+}
+
+SOURCE_TYPES = {
+    'company_website': 'Official Source',
+    'linkedin': 'Company Profile',
+    'property_finder': 'Market Data',
+    'bayut': 'Market Data',
+    'dubai_properties': 'Market Data',
+    'gulf_news_property': 'News',
+    'arabianbusiness_property': 'News',
+    'zawya_property': 'News',
+}
+
+# How much a snippet from each kind of source is trusted when ranking
+SOURCE_TYPE_WEIGHTS = {
+    'Official Source': 1.0,
+    'Market Data': 0.8,
+    'News': 0.7,
+    'Company Profile': 0.6,
+}
+
+MARKET_KEYWORDS = ('price', 'cost', 'investment', 'roi', 'payment', 'market', 'location')
+
+_STOPWORDS = {
+    'the', 'and', 'for', 'are', 'what', 'which', 'who', 'how', 'does', 'with',
+    'about', 'this', 'that', 'from', 'have', 'has', 'its', 'their', 'one', 'development',
+}
+
+MARKET_CONTEXT = '''
+UAE Real Estate Market Context:
+
+Dubai remains one of the world's most dynamic property markets, with luxury developments
+setting new standards in design and amenities. The market has seen steady growth with
+average luxury property prices ranging from AED 1.5M to AED 10M+ depending on location
+and specifications.
+
+Key Dubai Areas:
+- Dubai Marina: Premium waterfront living, prices typically AED 1,200-2,500 per sq ft
+- Downtown Dubai: Luxury urban lifestyle, prices typically AED 1,500-3,000 per sq ft
+- Palm Jumeirah: Exclusive island living, prices typically AED 1,800-3,500 per sq ft
+- Business Bay: Business hub with residential options, AED 1,000-2,000 per sq ft
+
+Investment Returns: Typical ROI in Dubai ranges from 5-8% annually for rental properties.
+
+Payment Plans: Most developers offer flexible payment plans, often with 10-20% down payment
+and remaining amount payable over 2-4 years, sometimes post-handover.
+'''
+
+
+def _query_terms(query: str) -> List[str]:
+    """Distinct content words of a query"""
+    words = re.findall(r'[a-z0-9]+', query.lower())
+    return list(dict.fromkeys(word for word in words if len(word) > 2 and word not in _STOPWORDS))
+
+
+# Lines taken from the top of a source when the query has no usable terms
+LEAD_SNIPPETS = 3
+
+
+def _snippet_lines(text: str) -> Iterator[str]:
+    """Sentences / lines of a source's text that are snippet-sized"""
+    for sentence in re.split(r'(?<=[.!?])\s+|\n', text):
+        sentence = sentence.strip()
+        if 30 <= len(sentence) <= 400:
+            yield sentence
+
+
+def _snippets(name: str, url: str, text: str, terms: List[str]) -> List[Dict[str, Any]]:
+    """
+    Sentences of a source's text that mention the query, scored by term overlap and source
+    
+    Terms match whole words (plurals included). With no terms (e.g. "Who is
+    One Development?") the source's leading lines are returned instead.
+    """
+    weight = SOURCE_TYPE_WEIGHTS[SOURCE_TYPES[name]]
+    if not terms:
+        return _lead_snippets(name, url, text)
+    
+    term_pattern = re.compile(r'\b(' + '|'.join(map(re.escape, terms)) + r')(?:s|es)?\b', re.IGNORECASE)
+    snippets = []
+    for sentence in _snippet_lines(text):
+        matched = len({term.lower() for term in term_pattern.findall(sentence)})
+        if not matched:
+            continue
+        snippets.append({
+            'text': sentence,
+            'source': SOURCE_NAMES[name],
+            'url': url,
+            'score': round(weight * matched / len(terms), 3)
+        })
+    return snippets
+
+
+def _lead_snippets(name: str, url: str, text: str) -> List[Dict[str, Any]]:
+    """The first few lines of a source, scored below any query match"""
+    weight = SOURCE_TYPE_WEIGHTS[SOURCE_TYPES[name]]
+    snippets = []
+    for position, sentence in enumerate(_snippet_lines(text)):
+        if position >= LEAD_SNIPPETS:
+            break
+        snippets.append({
+            'text': sentence,
+            'source': SOURCE_NAMES[name],
+            'url': url,
+            'score': round(weight * 0.1 / (position + 1), 3)
+        })
+    return snippets
+
+
+def _rank_snippets(snippets: List[Dict[str, Any]], limit: int = MAX_SNIPPETS) -> List[Dict[str, Any]]:
+    """Best snippets first, keeping one copy of text found on several sources"""
+    ranked, seen = [], set()
+    for snippet in sorted(snippets, key=lambda snippet: snippet['score'], reverse=True):
+        key = ' '.join(re.findall(r'\w+', snippet['text'].lower()))[:80]
+        if key in seen:
+            continue
+        seen.add(key)
+        ranked.append(snippet)
+        if len(ranked) >= limit:
+            break
+    return ranked
+
 
 class WebAccessTool:
     """Tool for accessing websites and extracting information from web"""
@@ -32,9 +183,6 @@ class WebAccessTool:
             'arabianbusiness_property': 'https://www.arabianbusiness.com/industries/property',
             'zawya_property': 'https://www.zawya.com/en/markets/real-estate'
         }
-        
-        # Cache for web results (simple memory cache)
-        self._cache = {}
     
     def fetch_page(self, url: str, timeout: int = 10) -> Optional[str]:
         """
@@ -48,7 +196,7 @@ class WebAccessTool:
             Page content as text or None if failed
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=timeout)
+            response = fetch(url, headers=self.headers, timeout=timeout)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -57,7 +205,7 @@ class WebAccessTool:
     
     def extract_text_from_html(self, html: str) -> str:
         """
-        Extract clean text from HTML content
+        Extract the main text from HTML content
         
         Args:
             html: HTML content
@@ -65,14 +213,8 @@ class WebAccessTool:
         Returns:
             Cleaned text content
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-            element.decompose()
-        
-        # Get text
-        text = soup.get_text(separator=' ', strip=True)
+        # Main content only (menus, footers and other boilerplate are dropped)
+        text = extract_text(html)
         
         # Clean up whitespace
         text = re.sub(r'\s+', ' ', text).strip()
@@ -187,128 +329,217 @@ class WebAccessTool:
                 'error': str(e)
             }
     
-    def search_property_portals(self, query: str) -> Dict[str, Any]:
+    def _read_source(self, url: str, timeout: float) -> Optional[str]:
+        """Fetch a page and extract its main text, one block per line (runs on a worker thread)"""
+        html = self.fetch_page(url, timeout=timeout)
+        return extract_text(html) if html else None
+    
+    def fan_out(self, sources: Dict[str, str], deadline: float = WEB_SOURCES_DEADLINE) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Fetch several sources concurrently under one overall deadline
+        
+        Args:
+            sources: Source name -> URL
+            deadline: Seconds to wait for all of them
+            
+        Yields:
+            (source name, main text or None) as each source finishes - sources
+            still pending at the deadline are not yielded
+        """
+        futures = {
+            _source_executor.submit(self._read_source, url, min(10, deadline)): name
+            for name, url in sources.items()
+        }
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                try:
+                    yield name, future.result()
+                except Exception as e:
+                    print(f"Could not search {SOURCE_NAMES.get(name, name)}: {str(e)}")
+                    yield name, None
+        except FuturesTimeout:
+            pending = [SOURCE_NAMES.get(futures[f], futures[f]) for f in futures if not f.done()]
+            print(f"⏱️  Deadline reached, still waiting on: {', '.join(pending)}")
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def _portal_results(self, texts: Dict[str, Optional[str]], query: str) -> Dict[str, Any]:
+        """Portal results in the shape search_property_portals returns"""
+        results = {
+            'success': False,
+            'content': '',
+            'sources_checked': [],
+            'snippets': []
+        }
+        terms = _query_terms(query)
+        for name in PORTAL_SOURCES:
+            text = texts.get(name)
+            if not text or len(text) <= 100:
+                continue
+            summary = re.sub(r'\s+', ' ', text)[:500]
+            results['content'] += f"[{SOURCE_NAMES[name]} Data]: {summary}...\n"
+            results['sources_checked'].append(SOURCE_NAMES[name])
+            results['snippets'].extend(_snippets(name, self.additional_sources[name], text, terms))
+            results['success'] = True
+        results['snippets'] = _rank_snippets(results['snippets'])
+        return results
+    
+    def search_property_portals(self, query: str, deadline: float = WEB_SOURCES_DEADLINE) -> Dict[str, Any]:
         """
         Search UAE property portals for One Development information
         
+        The portals are fetched concurrently; any still loading at the
+        deadline are left out.
+        
         Args:
             query: What to search for
+            deadline: Seconds to wait for the portals
             
         Returns:
             Dictionary with results from property portals
         """
-        # Check cache first
-        cache_key = f"portals_{query.lower().replace(' ', '_')}"
-        if cache_key in self._cache:
+        # Check the shared tool cache first
+        cache = get_tool_cache()
+        cache_key = query.lower().strip()
+        cached = cache.get('property_portals', cache_key)
+        if cached is not None:
             print("📦 Using cached property portal results")
-            return self._cache[cache_key]
+            return cached
         
-        results = {
-            'success': False,
-            'content': '',
-            'sources_checked': []
-        }
-        
-        # Try Property Finder
-        try:
-            print("🏘️  Searching Property Finder...")
-            pf_url = self.additional_sources['property_finder']
-            html = self.fetch_page(pf_url)
-            if html:
-                text = self.extract_text_from_html(html)
-                if len(text) > 100:
-                    results['content'] += f"[Property Finder Data]: {text[:500]}...\n"
-                    results['sources_checked'].append('Property Finder')
-                    results['success'] = True
-        except Exception as e:
-            print(f"Could not search Property Finder: {str(e)}")
+        print("🏘️  Searching property portals...")
+        portals = {name: self.additional_sources[name] for name in PORTAL_SOURCES}
+        results = self._portal_results(dict(self.fan_out(portals, deadline)), query)
         
         # Cache the results
         if results['success']:
-            self._cache[cache_key] = results
+            cache.set('property_portals', cache_key, results, TOOL_CACHE_TTLS['property_portals'])
         
         return results
     
-    def get_market_context(self) -> Dict[str, Any]:
+    def _market_context(self, texts: Dict[str, Optional[str]], query: str) -> Dict[str, Any]:
+        """Static market overview plus the most relevant recent property news"""
+        terms = _query_terms(query) or _query_terms(' '.join(MARKET_KEYWORDS))
+        snippets = []
+        for name in NEWS_SOURCES:
+            if texts.get(name):
+                snippets.extend(_snippets(name, self.additional_sources[name], texts[name], terms))
+        snippets = _rank_snippets(snippets, limit=5)
+        
+        content = MARKET_CONTEXT
+        if snippets:
+            content += "\nRecent property news:\n" + '\n'.join(
+                f"- {snippet['text']} ({snippet['source']})" for snippet in snippets
+            ) + "\n"
+        
+        return {
+            'success': True,
+            'content': content,
+            'snippets': snippets,
+            'type': 'Market Intelligence'
+        }
+    
+    def get_market_context(self, query: str = '', deadline: float = WEB_SOURCES_DEADLINE) -> Dict[str, Any]:
         """
         Get general UAE/Dubai real estate market context
         
+        The static overview is complemented with matching lines from the
+        property news sources, fetched concurrently.
+        
+        Args:
+            query: What the context is for (ranks the news)
+            deadline: Seconds to wait for the news sources
+            
         Returns:
             Dictionary with market context and trends
         """
-        context = {
-            'success': True,
-            'content': '''
-            UAE Real Estate Market Context:
-            
-            Dubai remains one of the world's most dynamic property markets, with luxury developments 
-            setting new standards in design and amenities. The market has seen steady growth with 
-            average luxury property prices ranging from AED 1.5M to AED 10M+ depending on location 
-            and specifications.
-            
-            Key Dubai Areas:
-            - Dubai Marina: Premium waterfront living, prices typically AED 1,200-2,500 per sq ft
-            - Downtown Dubai: Luxury urban lifestyle, prices typically AED 1,500-3,000 per sq ft
-            - Palm Jumeirah: Exclusive island living, prices typically AED 1,800-3,500 per sq ft
-            - Business Bay: Business hub with residential options, AED 1,000-2,000 per sq ft
-            
-            Investment Returns: Typical ROI in Dubai ranges from 5-8% annually for rental properties.
-            
-            Payment Plans: Most developers offer flexible payment plans, often with 10-20% down payment
-            and remaining amount payable over 2-4 years, sometimes post-handover.
-            ''',
-            'type': 'Market Intelligence'
-        }
-        
-        return context
+        news = {name: self.additional_sources[name] for name in NEWS_SOURCES}
+        return self._market_context(dict(self.fan_out(news, deadline)), query)
     
-    def search_multiple_sources(self, query: str) -> Dict[str, Any]:
+    def search_multiple_sources(
+        self,
+        query: str,
+        deadline: float = WEB_SOURCES_DEADLINE,
+        on_source: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
         """
         Search multiple web sources for information (Enhanced Version)
         
+        The company website, LinkedIn, the property portals and (for market
+        questions) property news are all fetched at once, so the search takes
+        as long as the slowest source - or the deadline, whichever is first.
+        
         Args:
             query: What to search for
+            deadline: Seconds to wait for all sources
+            on_source: Called with (source name, its snippets) as each source finishes
             
         Returns:
-            Combined results from multiple sources
+            Combined results from multiple sources, with the snippets of every
+            source merged, deduplicated and ranked
         """
         results = {
             'sources': [],
             'combined_text': '',
+            'snippets': [],
+            'timed_out': [],
             'success': False,
             'has_market_context': False
         }
+        terms = _query_terms(query)
+        market_query = any(keyword in query.lower() for keyword in MARKET_KEYWORDS)
         
-        # Search company website first
-        print("🌐 Searching company website...")
-        website_result = self.search_company_website(query)
-        if website_result.get('success'):
-            results['sources'].append({
-                'name': 'Company Website',
-                'url': self.company_website,
-                'type': 'Official Source'
-            })
-            results['combined_text'] += f"\n[From Company Website]:\n{website_result.get('relevant_info', website_result.get('full_text', ''))}\n\n"
-            results['success'] = True
+        sources = {'company_website': self.company_website, 'linkedin': self.linkedin_url}
+        cached_portals = get_tool_cache().get('property_portals', query.lower().strip())
+        if cached_portals is None:
+            sources.update({name: self.additional_sources[name] for name in PORTAL_SOURCES})
+        if market_query:
+            sources.update({name: self.additional_sources[name] for name in NEWS_SOURCES})
         
-        # Search property portals for additional context
-        print("🏘️  Searching property portals...")
-        portal_result = self.search_property_portals(query)
-        if portal_result.get('success'):
-            results['sources'].append({
-                'name': 'Property Portals',
-                'type': 'Market Data'
-            })
-            results['combined_text'] += f"\n[From Property Portals]:\n{portal_result.get('content', '')}\n\n"
+        print(f"🌐 Searching {len(sources)} web sources...")
+        texts = {}
+        snippets = []
+        for name, text in self.fan_out(sources, deadline):
+            texts[name] = text
+            found = _snippets(name, sources[name], text, terms) if text else []
+            snippets.extend(found)
+            if text:
+                results['sources'].append({
+                    'name': SOURCE_NAMES[name],
+                    'url': sources[name],
+                    'type': SOURCE_TYPES[name]
+                })
+            if on_source is not None:
+                on_source(SOURCE_NAMES[name], found)
+        results['timed_out'] = [SOURCE_NAMES[name] for name in sources if name not in texts]
+        
+        # Portal results are shared with search_property_portals through the cache
+        if cached_portals is None:
+            portal_results = self._portal_results(texts, query)
+            if portal_results['success']:
+                get_tool_cache().set('property_portals', query.lower().strip(), portal_results, TOOL_CACHE_TTLS['property_portals'])
+        else:
+            snippets.extend(cached_portals.get('snippets', []))
+        
+        # Nothing mentions the query - fall back to what each source leads with
+        if not snippets:
+            for name, text in texts.items():
+                if text:
+                    snippets.extend(_lead_snippets(name, sources[name], text))
+        
+        results['snippets'] = _rank_snippets(snippets)
+        if results['snippets']:
+            results['combined_text'] = '\n'.join(
+                f"[From {snippet['source']}]: {snippet['text']}" for snippet in results['snippets']
+            ) + "\n\n"
             results['success'] = True
         
         # Add market context for relevant queries
-        if any(keyword in query.lower() for keyword in ['price', 'cost', 'investment', 'roi', 'payment', 'market', 'location']):
-            print("📊 Adding market context...")
-            market_context = self.get_market_context()
-            results['combined_text'] += f"\n[Market Context]:\n{market_context.get('content', '')}\n\n"
+        if market_query:
+            market_context = self._market_context(texts, query)
+            results['combined_text'] += f"\n[Market Context]:\n{market_context['content']}\n\n"
             results['has_market_context'] = True
             results['success'] = True
         
         return results
-
@@ -0,0 +1,260 @@
+"""
+Async chat endpoints for ASGI deployments.
+
+Served when ASYNC_CHAT_VIEWS is enabled (see api/urls.py). Each request awaits the
+LLM and its tools instead of pinning a worker thread, so one uvicorn worker can
+hold many streaming conversations open at once. Streams are resumable (see
+api/stream_runs.py).
+
+DRF's @api_view has no async support, so these are plain Django views that keep
+the same request/response contract as their counterparts in api/views.py.
+"""
+
+import asyncio
+import json
+import uuid
+import traceback
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from agent.checkpointer import get_checkpointer
+from agent.models import Conversation, Message
+from agent.streaming_agent import get_streaming_agent
+from .serializers import ChatRequestSerializer
+from .disconnect import get_disconnect_event
+from .stream_runs import start_run, get_run, parse_last_event_id
+from .views import (
+    get_agent, _generate_suggested_actions_from_response, _apply_verification_event,
+    _partial_save_plan, _sse_payload
+)
+
+
+def _async_post_view(view):
+    """
+    Mark an async view as POST-only and CSRF exempt.
+
+    Django 4.2's csrf_exempt / require_http_methods wrap views in sync
+    functions, which would hide the coroutine from the handler.
+    """
+    async def wrapped(request, *args, **kwargs):
+        if request.method != 'POST':
+            return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        return await view(request, *args, **kwargs)
+
+    wrapped.__name__ = view.__name__
+    wrapped.__doc__ = view.__doc__
+    wrapped.csrf_exempt = True
+    return wrapped
+
+
+def _parse_body(request) -> dict:
+    """Parse a JSON (or form-encoded) request body"""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST.dict()
+
+
+@_async_post_view
+async def chat(request):
+    """
+    Async version of views.chat.
+
+    POST /api/chat/
+    {
+        "message": "Tell me about One Development",
+        "session_id": "optional-session-id"
+    }
+    """
+    serializer = ChatRequestSerializer(data=_parse_body(request))
+
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    message = serializer.validated_data['message']
+    session_id = serializer.validated_data.get('session_id') or str(uuid.uuid4())
+
+    # Get or create conversation
+    conversation, created = await Conversation.objects.aget_or_create(
+        session_id=session_id,
+        defaults={'metadata': {'agent_type': 'deepagent'}}
+    )
+
+    # Save user message
+    await Message.objects.acreate(
+        conversation=conversation,
+        message_type='human',
+        content=message
+    )
+
+    agent = get_agent()
+
+    # Sessions with saved graph state resume it - only load history for the rest
+    history = None
+    if not await agent.ahas_session_state(session_id):
+        history = [
+            item async for item in
+            conversation.messages.order_by('created_at').values('message_type', 'content')
+        ]
+
+    # Process through agent
+    result = await agent.aprocess_query(
+        query=message,
+        session_id=session_id,
+        conversation_history=history
+    )
+
+    # Build metadata from DeepAgent response
+    metadata = {
+        'reasoning_steps': result.get('reasoning_steps', 0),
+        'tools_used': result.get('tools_used', 0),
+        'agent_type': 'deepagent',
+        'thinking': result.get('thinking', []),
+        'tools_info': result.get('tools_info', []),
+        'budget': result.get('budget', {})
+    }
+    suggested_actions = _generate_suggested_actions_from_response(result['response'])
+
+    # Save AI response
+    await Message.objects.acreate(
+        conversation=conversation,
+        message_type='ai',
+        content=result['response'],
+        metadata=metadata
+    )
+
+    return JsonResponse({
+        'response': result['response'],
+        'session_id': session_id,
+        'suggested_actions': suggested_actions,
+        'timestamp': timezone.now(),
+        'metadata': metadata
+    })
+
+
+@_async_post_view
+async def chat_stream(request):
+    """
+    Async version of views.chat_stream - same SSE events, no thread per stream.
+
+    POST /api/chat/stream/
+    {
+        "message": "Tell me about One Development",
+        "session_id": "optional-session-id"
+    }
+
+    The agent run outlives the connection: a client that drops mid-answer can
+    POST again with a Last-Event-ID header to replay the frames it missed and
+    follow the live run (410 if the run is gone).
+    """
+    disconnected = get_disconnect_event(request)
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id:
+        resume = parse_last_event_id(last_event_id)
+        run = get_run(resume[0]) if resume else None
+        if run is None:
+            return JsonResponse({'error': 'Stream expired, send the message again'}, status=410)
+        print(f"🔁 Resuming stream {run.stream_id} after event {resume[1]}")
+        return _sse_response(run.subscribe(resume[1], stop=disconnected))
+
+    data = _parse_body(request)
+    message = data.get('message', '')
+    session_id = data.get('session_id') or str(uuid.uuid4())
+
+    if not message:
+        return JsonResponse({'error': 'Message is required'}, status=400)
+
+    async def run_agent():
+        """Run the agent, yielding SSE event payloads; cancelled once the stream is abandoned"""
+        full_response = ""
+        ai_message = None
+        phase = None
+        conversation = None
+
+        try:
+            # Get or create conversation
+            conversation, _ = await Conversation.objects.aget_or_create(
+                session_id=session_id,
+                defaults={'metadata': {'agent_type': 'streaming'}}
+            )
+
+            # Save user message
+            await Message.objects.acreate(
+                conversation=conversation,
+                message_type='human',
+                content=message
+            )
+            # The streamed turn isn't in the DeepAgent checkpoint (see views.chat_stream)
+            await get_checkpointer().aforget(session_id)
+
+            agent = get_streaming_agent()
+
+            async for event in agent.astream_thinking_and_response(message, session_id):
+                event_type = event.get('type')
+
+                if event_type == 'phase':
+                    phase = event['content']
+
+                elif event_type == 'response_token':
+                    full_response += event['content']
+
+                elif event_type == 'done':
+                    full_response = event.get('full_response', full_response)
+
+                    # Save AI response
+                    ai_message = await Message.objects.acreate(
+                        conversation=conversation,
+                        message_type='ai',
+                        content=full_response,
+                        metadata={
+                            'agent_type': 'streaming',
+                            'verification_policy': event.get('verification_policy', {}),
+                            'context': event.get('context', [])
+                        }
+                    )
+
+                    yield {'type': 'done', 'suggested_actions': _generate_suggested_actions_from_response(full_response)}
+                    continue
+
+                elif ai_message is not None:
+                    # Verification arrives after done: revise the saved message
+                    update_fields = _apply_verification_event(ai_message, event)
+                    if update_fields:
+                        await ai_message.asave(update_fields=update_fields)
+
+                payload = _sse_payload(event)
+                if payload is not None:
+                    yield payload
+
+        except asyncio.CancelledError:
+            # Client went away for good: the agent's LLM streams and tools were
+            # cancelled with us - keep what was streamed
+            if conversation is not None:
+                new_message, update_fields = _partial_save_plan(full_response, phase, ai_message)
+                if new_message:
+                    await Message.objects.acreate(conversation=conversation, **new_message)
+                elif update_fields:
+                    await ai_message.asave(update_fields=update_fields)
+            raise
+
+        except Exception as e:
+            traceback.print_exc()
+            yield {'type': 'error', 'content': str(e)}
+
+    run = start_run(run_agent())
+    return _sse_response(run.subscribe(stop=disconnected))
+
+
+def _sse_response(frames) -> StreamingHttpResponse:
+    """Wrap an async iterator of SSE frames in a streaming response"""
+    response = StreamingHttpResponse(
+        frames,
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
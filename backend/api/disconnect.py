@@ -0,0 +1,50 @@
+"""
+Client disconnect detection for async streaming views.
+
+Django 4.2's ASGI handler stops reading from the client once the request body
+is in, so a view streaming SSE never learns that the browser tab was closed -
+it keeps running LLM streams and tools until done. DisconnectMiddleware keeps
+listening for the ASGI 'http.disconnect' message and exposes it to views as an
+asyncio.Event on the request scope.
+"""
+
+import asyncio
+
+
+SCOPE_KEY = 'luna.disconnected'
+
+
+class DisconnectMiddleware:
+    """ASGI middleware that flags client disconnects on scope[SCOPE_KEY]"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        messages = asyncio.Queue()
+        scope[SCOPE_KEY] = disconnected
+
+        async def pump():
+            # Keep reading after the body so the disconnect isn't missed
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+
+        pump_task = asyncio.ensure_future(pump())
+        try:
+            return await self.app(scope, messages.get, send)
+        finally:
+            pump_task.cancel()
+
+
+def get_disconnect_event(request):
+    """The request's disconnect event, or None when not served through DisconnectMiddleware"""
+    scope = getattr(request, 'scope', None)
+    return scope.get(SCOPE_KEY) if scope else None
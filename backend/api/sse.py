@@ -0,0 +1,121 @@
+"""
+Server-Sent Events encoding for Luna's chat stream.
+
+Emitting one frame per LLM token means thousands of tiny writes (and json.dumps
+calls) per answer. SSEEncoder coalesces consecutive thinking/response tokens
+into one frame per flush window or byte threshold, and numbers every frame with
+an SSE id of the form "<stream_id>:<seq>" so a reconnect can name the stream it
+is resuming (see stream_runs). The frontend contract is unchanged: a coalesced
+frame is just a 'thinking' or 'response' event with a longer token.
+"""
+
+import json
+import time
+import uuid
+
+from django.conf import settings
+
+try:
+    import orjson
+
+    def _dumps(payload: dict) -> str:
+        return orjson.dumps(payload).decode('utf-8')
+except ImportError:
+    def _dumps(payload: dict) -> str:
+        return json.dumps(payload, separators=(',', ':'))
+
+
+# Event types whose 'token' fields can be merged into one frame
+COALESCED_TYPES = ('thinking', 'response')
+
+
+class SSEEncoder:
+    """
+    Turns event payloads into SSE frames, coalescing token events.
+
+    push() returns the text to write now ('' while tokens are being buffered);
+    flush() returns whatever is still buffered. Async callers can use
+    seconds_until_flush() to flush on time even when no new event arrives.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = None,
+        max_bytes: int = None,
+        first_id: int = 0,
+        id_prefix: str = ''
+    ):
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else settings.SSE_FLUSH_INTERVAL_MS / 1000
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else settings.SSE_MAX_BUFFER_BYTES
+        self.last_id = first_id
+        self.id_prefix = id_prefix
+
+        self._pending_type = None
+        self._pending_tokens = []
+        self._pending_bytes = 0
+        self._pending_since = 0.0
+
+    def frame(self, payload: dict) -> str:
+        """Encode one payload as an SSE frame with the next event id"""
+        self.last_id += 1
+        return f"id: {self.id_prefix}{self.last_id}\ndata: {_dumps(payload)}\n\n"
+
+    def push(self, payload: dict) -> str:
+        """Add an event; returns the frames that are ready to be written"""
+        event_type = payload.get('type')
+
+        if event_type not in COALESCED_TYPES or set(payload) != {'type', 'token'}:
+            # Anything else goes out immediately, after the buffered tokens
+            return self.flush() + self.frame(payload)
+
+        out = ''
+        if self._pending_type != event_type:
+            out = self.flush()
+            self._pending_type = event_type
+            self._pending_since = time.monotonic()
+
+        self._pending_tokens.append(payload['token'])
+        self._pending_bytes += len(payload['token'])
+
+        if self._pending_bytes >= self.max_bytes or self.seconds_until_flush() == 0:
+            out += self.flush()
+        return out
+
+    def flush(self) -> str:
+        """Emit the buffered tokens as one frame ('' if nothing is buffered)"""
+        if self._pending_type is None:
+            return ''
+        payload = {'type': self._pending_type, 'token': ''.join(self._pending_tokens)}
+        self._pending_type = None
+        self._pending_tokens = []
+        self._pending_bytes = 0
+        return self.frame(payload)
+
+    def seconds_until_flush(self):
+        """Time left in the current flush window, or None when nothing is buffered"""
+        if self._pending_type is None:
+            return None
+        return max(0.0, self._pending_since + self.flush_interval - time.monotonic())
+
+
+def encode_sse_stream(payloads):
+    """
+    Encode a (sync) stream of event payloads as coalesced SSE frames.
+
+    Closing the returned generator closes the payload generator too, so its
+    disconnect handling still runs. Streams served this way are not resumable,
+    but their ids have the same "<stream_id>:<seq>" shape.
+    """
+    encoder = SSEEncoder(id_prefix=f"{uuid.uuid4().hex}:")
+    try:
+        for payload in payloads:
+            chunk = encoder.push(payload)
+            if chunk:
+                yield chunk
+        tail = encoder.flush()
+        if tail:
+            yield tail
+    finally:
+        payloads.close()
@@ -0,0 +1,189 @@
+"""
+Resumable chat streams.
+
+An agent run is decoupled from the HTTP connection that started it: the run
+encodes its SSE frames into a bounded per-stream event log (a ring buffer),
+and each connection is just a subscriber reading from that log. A client that
+drops mid-answer reconnects with Last-Event-ID ("<stream_id>:<seq>"), gets the
+frames it missed replayed, and then follows the live run - no new agent run,
+no re-billed LLM calls.
+
+A run with no subscribers is cancelled after SSE_RESUME_GRACE_SECONDS, so
+abandoned streams still free their capacity.
+
+The registry is in-process, so reconnects must reach the process that owns
+the run; otherwise the stream is reported as expired. The backend therefore
+runs a single ASGI worker per container (docker-compose.yml) and scales by
+replicas behind a load balancer with sticky sessions - never by gunicorn
+--workers, which balances connections without affinity.
+"""
+
+import asyncio
+import uuid
+from collections import deque
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .sse import SSEEncoder
+
+
+class StreamLog:
+    """Bounded, append-only log of one stream's SSE frames"""
+
+    def __init__(self, max_frames: int):
+        self.frames = deque(maxlen=max_frames)  # (seq, frame)
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def append(self, seq: int, frame: str):
+        self.frames.append((seq, frame))
+        self._notify()
+
+    def close(self):
+        self.closed = True
+        self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, after: int = 0, stop: asyncio.Event = None) -> AsyncIterator[str]:
+        """
+        Replay frames after seq `after`, then yield new ones until the log closes.
+
+        Args:
+            after: Last seq the reader already has (0 for the whole stream)
+            stop: Optional event that ends the read early (client disconnected)
+        """
+        while True:
+            if self.frames and self.frames[0][0] > after + 1:
+                print(f"⚠️ Stream log overflowed: frames {after + 1}-{self.frames[0][0] - 1} are gone")
+
+            changed = self._changed
+            for seq, frame in list(self.frames):
+                if seq > after:
+                    after = seq
+                    yield frame
+
+            if self.closed or (stop is not None and stop.is_set()):
+                return
+            await _wait_any(changed, stop)
+
+
+async def _wait_any(*events: Optional[asyncio.Event]):
+    """Wait until any of the given events is set"""
+    waiters = [asyncio.ensure_future(event.wait()) for event in events if event is not None]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+class StreamRun:
+    """One agent run and the event log its subscribers read from"""
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.log = StreamLog(settings.SSE_STREAM_LOG_FRAMES)
+        self.encoder = SSEEncoder(id_prefix=f"{stream_id}:")
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+        self._grace_timer = None
+
+    def start(self, payloads: AsyncIterator[dict]):
+        """Run the payload producer in the background, encoding into the log"""
+        self.task = asyncio.ensure_future(self._pump(payloads))
+
+    async def _pump(self, payloads: AsyncIterator[dict]):
+        queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                async for payload in payloads:
+                    queue.put_nowait(payload)
+            finally:
+                queue.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                # Wake up at the end of the flush window even if no new event arrives
+                timeout = self.encoder.seconds_until_flush()
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout) if timeout is not None else await queue.get()
+                except asyncio.TimeoutError:
+                    self._write(self.encoder.flush())
+                    continue
+
+                if payload is None:
+                    break
+                self._write(self.encoder.push(payload))
+            self._write(self.encoder.flush())
+        finally:
+            producer.cancel()
+            self.log.close()
+            _schedule_removal(self)
+
+    def _write(self, frames: str):
+        """Append encoded frames to the log, one entry per SSE id"""
+        chunks = frames.split('\n\n')[:-1]
+        first_seq = self.encoder.last_id - len(chunks) + 1
+        for seq, frame in enumerate(chunks, first_seq):
+            self.log.append(seq, frame + '\n\n')
+
+    async def subscribe(self, after: int = 0, stop: asyncio.Event = None) -> AsyncIterator[str]:
+        """Stream this run's frames to one connection, replaying those after `after`"""
+        self.subscribers += 1
+        if self._grace_timer is not None:
+            self._grace_timer.cancel()
+            self._grace_timer = None
+        try:
+            async for frame in self.log.follow(after, stop):
+                yield frame
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.task.done():
+                # Give the client a chance to reconnect before cancelling the run
+                self._grace_timer = asyncio.get_running_loop().call_later(
+                    settings.SSE_RESUME_GRACE_SECONDS, self.cancel
+                )
+
+    def cancel(self):
+        if self.subscribers == 0 and self.task is not None and not self.task.done():
+            print(f"🔌 Stream {self.stream_id} abandoned - cancelling its agent run")
+            self.task.cancel()
+
+
+_runs: Dict[str, StreamRun] = {}
+
+
+def _schedule_removal(run: StreamRun):
+    """Keep a finished run's log around briefly for late reconnects"""
+    asyncio.get_running_loop().call_later(
+        settings.SSE_STREAM_LOG_TTL_SECONDS, _runs.pop, run.stream_id, None
+    )
+
+
+def start_run(payloads: AsyncIterator[dict]) -> StreamRun:
+    """Start a new resumable run for a stream of event payloads"""
+    run = StreamRun(uuid.uuid4().hex)
+    _runs[run.stream_id] = run
+    run.start(payloads)
+    return run
+
+
+def parse_last_event_id(value: str) -> Optional[Tuple[str, int]]:
+    """Split a Last-Event-ID of the form "<stream_id>:<seq>" """
+    if not value or ':' not in value:
+        return None
+    stream_id, _, seq = value.rpartition(':')
+    try:
+        return stream_id, int(seq)
+    except ValueError:
+        return None
+
+
+def get_run(stream_id: str) -> Optional[StreamRun]:
+    return _runs.get(stream_id)
@@ -1,7 +1,14 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 
+# Async chat views only help under ASGI; under WSGI Django would buffer their streams
+if settings.ASYNC_CHAT_VIEWS:
+    from . import async_views as chat_views
+else:
+    chat_views = views
+
 router = DefaultRouter()
 router.register(r'knowledge', views.KnowledgeBaseViewSet, basename='knowledge')
 router.register(r'conversations', views.ConversationViewSet, basename='conversation')
@@ -9,8 +16,8 @@ router.register(r'pdf-documents', views.PDFDocumentViewSet, basename='pdf-docume
 
 urlpatterns = [
     path('', include(router.urls)),
-    path('chat/', views.chat, name='chat'),
-    path('chat/stream/', views.chat_stream, name='chat-stream'),
+    path('chat/', chat_views.chat, name='chat'),
+    path('chat/stream/', chat_views.chat_stream, name='chat-stream'),
     path('suggested-questions/', views.get_suggested_questions, name='suggested-questions'),
     path('conversations/<str:session_id>/', views.get_conversation_history, name='conversation-history'),
     path('ingest-data/', views.ingest_data, name='ingest-data'),
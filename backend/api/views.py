@@ -2,15 +2,22 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.conf import settings
 from django.utils import timezone
 from django.http import HttpResponse
 from agent.models import Conversation, Message, KnowledgeBase, SuggestedQuestion, PDFDocument
+from .sse import encode_sse_stream
 from .serializers import (
     ConversationSerializer, MessageSerializer, ChatRequestSerializer,
     ChatResponseSerializer, SuggestedQuestionSerializer, KnowledgeBaseSerializer,
     PDFDocumentSerializer
 )
 from agent import get_luna_agent, LunaDeepAgent  # Using DeepAgent implementation
+from agent.checkpointer import get_checkpointer
+from agent.circuit_breaker import get_breaker, breaker_stats, CircuitOpenError
+from agent.result_cache import get_tool_cache
+from agent.verification_policy import get_verification_policy
+from agent.http_client import get_sync_session
 from agent.data_ingestor import OneDevelopmentDataIngestor
 from agent.pdf_processor import PDFProcessor
 import uuid
@@ -85,13 +92,16 @@ def chat(request):
         content=message
     )
     
-    # Get conversation history
-    history = list(
-        conversation.messages.order_by('created_at').values('message_type', 'content')
-    )
+    agent = get_agent()
+    
+    # Sessions with saved graph state resume it - only load history for the rest
+    history = None
+    if not agent.has_session_state(session_id):
+        history = list(
+            conversation.messages.order_by('created_at').values('message_type', 'content')
+        )
     
     # Process through agent
-    agent = get_agent()
     result = agent.process_query(
         query=message,
         session_id=session_id,
@@ -104,7 +114,8 @@ def chat(request):
         'tools_used': result.get('tools_used', 0),
         'agent_type': 'deepagent',
         'thinking': result.get('thinking', []),
-        'tools_info': result.get('tools_info', [])
+        'tools_info': result.get('tools_info', []),
+        'budget': result.get('budget', {})
     }
     suggested_actions = _generate_suggested_actions_from_response(result['response'])
     
@@ -150,7 +161,11 @@ def chat_stream(request):
     """
     from django.http import StreamingHttpResponse
     from agent.streaming_agent import get_streaming_agent
-    import json
+    
+    if request.headers.get('Last-Event-ID'):
+        # Runs served by this view are tied to their connection - only the
+        # async views (ASYNC_CHAT_VIEWS) can resume a stream
+        return Response({'error': 'Stream expired, send the message again'}, status=status.HTTP_410_GONE)
     
     message = request.data.get('message', '')
     session_id = request.data.get('session_id') or str(uuid.uuid4())
@@ -159,7 +174,7 @@ def chat_stream(request):
         return Response({'error': 'Message is required'}, status=status.HTTP_400_BAD_REQUEST)
     
     def generate_stream():
-        """Generator that yields SSE events with actual LLM tokens"""
+        """Generator that yields SSE event payloads with actual LLM tokens"""
         try:
             # Get or create conversation
             conversation, _ = Conversation.objects.get_or_create(
@@ -173,60 +188,78 @@ def chat_stream(request):
                 message_type='human',
                 content=message
             )
+            # This turn goes through the streaming agent, not the DeepAgent graph,
+            # so its checkpoint no longer matches the history - the next /chat/
+            # rebuilds from the database. Cleared up front so aborted streams count too
+            get_checkpointer().forget(session_id)
             
             # Get streaming agent
             agent = get_streaming_agent()
             
             full_response = ""
+            ai_message = None
+            phase = None
+            events = agent.stream_thinking_and_response(message, session_id)
             
-            # Stream actual thinking and response tokens
-            for event in agent.stream_thinking_and_response(message, session_id):
-                event_type = event.get('type')
-                
-                if event_type == 'phase':
-                    yield f"data: {json.dumps({'type': 'phase', 'phase': event['content']})}\n\n"
-                
-                elif event_type == 'thinking_token':
-                    # Stream each thinking token
-                    yield f"data: {json.dumps({'type': 'thinking', 'token': event['content']})}\n\n"
-                
-                elif event_type == 'thinking_complete':
-                    yield f"data: {json.dumps({'type': 'thinking_done'})}\n\n"
-                
-                elif event_type == 'tool_start':
-                    yield f"data: {json.dumps({'type': 'tool', 'action': 'start', 'tool': event['tool'], 'query': event.get('query', '')})}\n\n"
-                
-                elif event_type == 'tool_result':
-                    yield f"data: {json.dumps({'type': 'tool', 'action': 'result', 'content': event['content']})}\n\n"
-                
-                elif event_type == 'tool_error':
-                    yield f"data: {json.dumps({'type': 'tool', 'action': 'error', 'content': event['content']})}\n\n"
-                
-                elif event_type == 'response_token':
-                    # Stream each response token
-                    full_response += event['content']
-                    yield f"data: {json.dumps({'type': 'response', 'token': event['content']})}\n\n"
-                
-                elif event_type == 'done':
-                    full_response = event.get('full_response', full_response)
+            try:
+                # Stream actual thinking and response tokens
+                for event in events:
+                    event_type = event.get('type')
+                    
+                    if event_type == 'phase':
+                        phase = event['content']
+                    
+                    elif event_type == 'response_token':
+                        full_response += event['content']
                     
-                    # Save AI response
-                    Message.objects.create(
-                        conversation=conversation,
-                        message_type='ai',
-                        content=full_response,
-                        metadata={'agent_type': 'streaming'}
-                    )
+                    elif event_type == 'done':
+                        full_response = event.get('full_response', full_response)
+                        
+                        # Save AI response
+                        ai_message = Message.objects.create(
+                            conversation=conversation,
+                            message_type='ai',
+                            content=full_response,
+                            metadata={
+                                'agent_type': 'streaming',
+                                'verification_policy': event.get('verification_policy', {}),
+                                'context': event.get('context', [])
+                            }
+                        )
+                        
+                        yield {'type': 'done', 'suggested_actions': _generate_suggested_actions_from_response(full_response)}
+                        continue
                     
-                    yield f"data: {json.dumps({'type': 'done', 'suggested_actions': _generate_suggested_actions_from_response(full_response)})}\n\n"
+                    elif ai_message is not None:
+                        # Verification arrives after done: revise the saved message
+                        update_fields = _apply_verification_event(ai_message, event)
+                        if update_fields:
+                            ai_message.save(update_fields=update_fields)
+                    
+                    payload = _sse_payload(event)
+                    if payload is not None:
+                        yield payload
+                
+            except GeneratorExit:
+                # Client disconnected (WSGI closes the response on a failed write):
+                # keep what was streamed, then stop the agent below
+                new_message, update_fields = _partial_save_plan(full_response, phase, ai_message)
+                if new_message:
+                    Message.objects.create(conversation=conversation, **new_message)
+                elif update_fields:
+                    ai_message.save(update_fields=update_fields)
+                raise
+            finally:
+                # Closing the generator cancels the agent's LLM streams and tools
+                events.close()
             
         except Exception as e:
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+            yield {'type': 'error', 'content': str(e)}
     
     response = StreamingHttpResponse(
-        generate_stream(),
+        encode_sse_stream(generate_stream()),
         content_type='text/event-stream'
     )
     response['Cache-Control'] = 'no-cache'
@@ -234,6 +267,120 @@ def chat_stream(request):
     return response
 
 
+def _sse_payload(event: dict):
+    """
+    Map a streaming agent event to the payload the frontend expects.
+    
+    Returns None for events the stream does not forward. 'done' is left to the
+    views since it also persists the AI message.
+    """
+    event_type = event.get('type')
+    
+    if event_type == 'phase':
+        return {'type': 'phase', 'phase': event['content']}
+    if event_type == 'thinking_token':
+        return {'type': 'thinking', 'token': event['content']}
+    if event_type == 'thinking_complete':
+        return {'type': 'thinking_done'}
+    if event_type == 'tool_start':
+        return {'type': 'tool', 'action': 'start', 'tool': event['tool'], 'query': event.get('query', '')}
+    if event_type == 'tool_result':
+        return {'type': 'tool', 'action': 'result', 'content': event['content']}
+    if event_type == 'tool_error':
+        return {'type': 'tool', 'action': 'error', 'content': event['content']}
+    if event_type == 'response_token':
+        return {'type': 'response', 'token': event['content']}
+    if event_type == 'verification':
+        return {
+            'type': 'verification',
+            'confidence': event['confidence'],
+            'level': event['level'],
+            'sources': event.get('sources', []),
+            'issues': event.get('issues', [])
+        }
+    if event_type == 'response_improved':
+        return {'type': 'response_improved', 'content': event['content']}
+    return None
+
+
+def _partial_save_plan(full_response: str, phase: str, ai_message: Message = None):
+    """
+    Partial-message save policy for a stream the client abandoned.
+    
+    - Before done: save the answer streamed so far (if any) flagged as partial,
+      unless SAVE_PARTIAL_RESPONSES is off
+    - After done: the answer is already saved; if verification was still
+      running (a tier was chosen and its verification_status hasn't arrived),
+      note that it was cut short
+    
+    Returns:
+        (fields for a new AI message or None, fields to save on ai_message or None)
+    """
+    if ai_message is not None:
+        policy = ai_message.metadata.setdefault('verification_policy', {})
+        if policy.get('tier', 'none') == 'none' or 'elapsed_ms' in policy:
+            return None, None
+        policy['cancelled'] = True
+        return None, ['metadata']
+    
+    if not settings.SAVE_PARTIAL_RESPONSES or not full_response.strip():
+        return None, None
+    
+    return {
+        'message_type': 'ai',
+        'content': full_response,
+        'metadata': {
+            'agent_type': 'streaming',
+            'partial': True,
+            'cancelled_in_phase': phase
+        }
+    }, None
+
+
+def _apply_verification_event(ai_message: Message, event: dict) -> list:
+    """
+    Record a post-done verification event on the already saved AI message.
+    
+    Verification runs after 'done', so its outcome is stored as a revision:
+    the verification summary goes into metadata and an improved response
+    replaces the content, keeping the original under metadata['revisions'].
+    The tier's time spent goes into metadata['verification_policy'].
+    
+    Returns:
+        Fields to save (empty if the event doesn't touch the message)
+    """
+    event_type = event.get('type')
+    
+    if event_type == 'verification':
+        ai_message.metadata['verification'] = {
+            'confidence': event['confidence'],
+            'level': event['level'],
+            'sources': event.get('sources', []),
+            'issues': event.get('issues', [])
+        }
+        return ['metadata']
+    
+    if event_type == 'response_improved':
+        ai_message.metadata.setdefault('revisions', []).append({
+            'content': ai_message.content,
+            'reason': 'verification',
+            'revised_at': timezone.now().isoformat()
+        })
+        ai_message.content = event['content']
+        return ['content', 'metadata']
+    
+    if event_type == 'verification_status':
+        ai_message.metadata.setdefault('verification_policy', {}).update({
+            'tier': event['tier'],
+            'elapsed_ms': event['elapsed_ms'],
+            'timed_out': event['timed_out'],
+            'outcome': event['outcome']
+        })
+        return ['metadata']
+    
+    return []
+
+
 def _generate_suggested_actions_from_response(response: str) -> list:
     """
     Generate contextual suggested actions based on Luna's response.
@@ -330,8 +477,20 @@ def ingest_data(request):
     agent = get_agent()
     
     if source == 'website':
-        # Scrape website
-        data = ingestor.scrape_website(max_pages=20)
+        # Incremental recrawl - only new and changed pages are written and re-embedded
+        report = ingestor.recrawl_website(max_pages=20)
+        count = report['added'] + report['changed']
+        return Response(
+            {
+                'message': (
+                    f"Website recrawled: {report['added']} added, {report['changed']} changed, "
+                    f"{report['unchanged']} unchanged"
+                ),
+                'count': count,
+                'report': report
+            },
+            status=status.HTTP_200_OK
+        )
     elif source == 'linkedin':
         # Get LinkedIn data
         data = [ingestor.scrape_linkedin_company()]
@@ -401,6 +560,9 @@ def health_check(request):
             'name': 'Luna',
             'tools_available': tools_count
         },
+        'dependencies': breaker_stats(),
+        'tool_cache': get_tool_cache().stats(),
+        'verification': get_verification_policy().stats(),
         'version': '3.0.0'  # DeepAgent implementation
     }, status=status.HTTP_200_OK)
 
@@ -438,6 +600,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
         """Delete a conversation and all its messages"""
         try:
             conversation = self.get_object()
+            get_checkpointer().forget(conversation.session_id)
             conversation.delete()
             return Response(
                 {'message': 'Conversation deleted successfully'},
@@ -455,6 +618,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
         try:
             conversation = self.get_object()
             conversation.messages.all().delete()
+            get_checkpointer().forget(conversation.session_id)
             return Response(
                 {'message': 'Conversation history cleared'},
                 status=status.HTTP_200_OK
@@ -468,6 +632,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['delete'], url_path='delete-all')
     def delete_all(self, request):
         """Delete all conversations and their messages"""
+        get_checkpointer().forget()
         deleted_count, _ = Conversation.objects.all().delete()
         if deleted_count == 0:
             return Response(
@@ -541,6 +706,30 @@ class PDFDocumentViewSet(viewsets.ModelViewSet):
 # AVATAR SERVICE INTEGRATION
 # ============================================================================
 
+def _probe_avatar_service():
+    """Health probe for the avatar GPU service (run in the background)"""
+    avatar_service_url = os.getenv('AVATAR_SERVICE_URL')
+    if not avatar_service_url:
+        return False, 'Avatar service not configured'
+    response = get_sync_session().get(f"{avatar_service_url}/health", timeout=5)
+    if response.status_code == 200:
+        return True, response.json()
+    return False, f'Service responded with error ({response.status_code})'
+
+
+def get_avatar_breaker():
+    """Circuit breaker (with cached background health) for the avatar service"""
+    return get_breaker('avatar', probe=_probe_avatar_service)
+
+
+def _avatar_unavailable(breaker) -> dict:
+    return {
+        'error': f'Avatar service unavailable (retrying in {breaker.retry_in():.0f}s)',
+        'last_error': breaker.last_error,
+        'fallback': True
+    }
+
+
 @api_view(['POST'])
 def generate_avatar(request):
     """
@@ -577,11 +766,16 @@ def generate_avatar(request):
             'error': 'Text is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    # Fail fast while the service is down instead of holding a worker for 2 minutes
+    breaker = get_avatar_breaker()
+    if not breaker.allow():
+        return Response(_avatar_unavailable(breaker), status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
     try:
         # Call the avatar GPU service
         logger.info(f"Requesting avatar generation for text: {text[:50]}...")
         
-        response = requests.post(
+        response = get_sync_session().post(
             f"{avatar_service_url}/generate",
             json={
                 'text': text,
@@ -592,6 +786,11 @@ def generate_avatar(request):
             timeout=120  # 2 minute timeout - fast mode should be quick
         )
         
+        if response.status_code >= 500:
+            breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            breaker.record_success()
+        
         if response.status_code == 200:
             data = response.json()
             logger.info(f"Avatar generated successfully: {data.get('video_id')}")
@@ -618,14 +817,16 @@ def generate_avatar(request):
                 'fallback': True
             }, status=response.status_code)
             
-    except requests.exceptions.Timeout:
+    except requests.exceptions.Timeout as e:
+        breaker.record_failure(e)
         logger.error("Avatar service timeout")
         return Response({
             'error': 'Avatar generation timed out',
             'fallback': True
         }, status=status.HTTP_504_GATEWAY_TIMEOUT)
         
-    except requests.exceptions.ConnectionError:
+    except requests.exceptions.ConnectionError as e:
+        breaker.record_failure(e)
         logger.error("Cannot connect to avatar service")
         return Response({
             'error': 'Avatar service unavailable. Make sure the GPU service is running and tunnel is active.',
@@ -633,6 +834,7 @@ def generate_avatar(request):
         }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         
     except Exception as e:
+        breaker.record_failure(e)
         logger.error(f"Unexpected error in avatar generation: {str(e)}")
         return Response({
             'error': f'Avatar generation error: {str(e)}',
@@ -655,27 +857,25 @@ def avatar_health(request):
             'message': 'Avatar service not configured'
         }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     
-    try:
-        response = requests.get(f"{avatar_service_url}/health", timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return Response({
-                'status': 'healthy',
-                'service_info': data,
-                'url': avatar_service_url
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                'status': 'unhealthy',
-                'message': 'Service responded with error'
-            }, status=response.status_code)
-            
-    except Exception as e:
+    # Probed in the background and cached - not checked on every request
+    breaker = get_avatar_breaker()
+    health = breaker.cached_health()
+    
+    if health['healthy']:
         return Response({
-            'status': 'unavailable',
-            'message': str(e)
-        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            'status': 'healthy',
+            'service_info': health['detail'],
+            'url': avatar_service_url,
+            'circuit': breaker.state,
+            'checked_at': health['checked_at']
+        }, status=status.HTTP_200_OK)
+    
+    return Response({
+        'status': 'unavailable',
+        'message': str(health['detail']),
+        'circuit': breaker.state,
+        'checked_at': health['checked_at']
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 
 from django.http import StreamingHttpResponse, HttpResponse
@@ -695,12 +895,21 @@ def avatar_video_proxy(request, video_id):
     if not avatar_service_url:
         return HttpResponse('Avatar service not configured', status=503)
     
+    breaker = get_avatar_breaker()
+    if not breaker.allow():
+        return HttpResponse('Avatar service unavailable', status=503)
+    
     try:
         # Stream video from local avatar service
         video_url = f"{avatar_service_url}/videos/{video_id}"
         logger.info(f"Proxying video from: {video_url}")
         
-        response = requests.get(video_url, stream=True, timeout=30)
+        response = get_sync_session().get(video_url, stream=True, timeout=30)
+        
+        if response.status_code >= 500:
+            breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            breaker.record_success()
         
         if response.status_code == 200:
             def generate():
@@ -724,10 +933,12 @@ def avatar_video_proxy(request, video_id):
             logger.error(f"Video not found: {video_id}")
             return HttpResponse('Video not found', status=404)
             
-    except requests.exceptions.ConnectionError:
+    except requests.exceptions.ConnectionError as e:
+        breaker.record_failure(e)
         logger.error("Cannot connect to avatar service for video")
         return HttpResponse('Avatar service unavailable', status=503)
     except Exception as e:
+        breaker.record_failure(e)
         logger.error(f"Error proxying video: {str(e)}")
         return HttpResponse(f'Error: {str(e)}', status=500)
 
@@ -790,7 +1001,8 @@ def generate_tts(request):
         logger.info(f"Generating TTS with OpenAI voice '{voice}' for text: {text[:50]}...")
         
         # Generate speech using OpenAI TTS
-        response = client.audio.speech.create(
+        response = get_breaker('openai_tts').call(
+            client.audio.speech.create,
             model="tts-1",  # Use "tts-1-hd" for even higher quality (but slower)
             voice=voice,
             input=text,
@@ -813,6 +1025,11 @@ def generate_tts(request):
         
         return http_response
         
+    except CircuitOpenError as e:
+        logger.warning(f"OpenAI TTS skipped: {str(e)}")
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as e:
         logger.error(f"OpenAI TTS error: {str(e)}")
         return Response({
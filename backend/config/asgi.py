@@ -1,12 +1,18 @@
 """
 ASGI config for OneDevelopment Agent project.
+
+Run with uvicorn workers (gunicorn -k uvicorn.workers.UvicornWorker) and
+ASYNC_CHAT_VIEWS=True so chat streams are served by the async views.
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
 
+from api.disconnect import DisconnectMiddleware
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+# DisconnectMiddleware lets streaming views cancel their work when the client goes away
+application = DisconnectMiddleware(get_asgi_application())
 
@@ -135,6 +135,22 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Serve chat/ and chat/stream/ with the async views (requires running under ASGI)
+ASYNC_CHAT_VIEWS = os.getenv('ASYNC_CHAT_VIEWS', 'False') == 'True'
+
+# SSE token coalescing: flush buffered tokens every N ms or once this many bytes are buffered
+SSE_FLUSH_INTERVAL_MS = int(os.getenv('SSE_FLUSH_INTERVAL_MS', '30'))
+SSE_MAX_BUFFER_BYTES = int(os.getenv('SSE_MAX_BUFFER_BYTES', '4096'))
+
+# Resumable streams (async views): frames kept per stream for Last-Event-ID replay,
+# how long a run without clients waits for a reconnect, and how long a finished log is kept
+SSE_STREAM_LOG_FRAMES = int(os.getenv('SSE_STREAM_LOG_FRAMES', '2048'))
+SSE_RESUME_GRACE_SECONDS = float(os.getenv('SSE_RESUME_GRACE_SECONDS', '15'))
+SSE_STREAM_LOG_TTL_SECONDS = float(os.getenv('SSE_STREAM_LOG_TTL_SECONDS', '60'))
+
+# Keep the answer streamed so far (flagged partial) when a client disconnects mid-stream
+SAVE_PARTIAL_RESPONSES = os.getenv('SAVE_PARTIAL_RESPONSES', 'True') == 'True'
+
 # OpenAI API Key
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
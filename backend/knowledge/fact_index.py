@@ -0,0 +1,224 @@
+"""
+Fact Index for One Development Knowledge Base
+
+Structured facts (AED prices, sizes, bedroom counts, years, phone numbers,
+emails and other numbers) are extracted and normalized once per chunk at
+ingestion and stored in the chunk's metadata. Verification then checks the
+facts in a response with set lookups against the chunks that were actually
+retrieved, instead of scanning the whole context with regexes per request.
+
+Normalization makes "AED 1.2M", "1,200,000 AED" and "AED 1200000" the same
+fact, and "1,200 sq.ft" the same as "1200 sqft".
+"""
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Set
+
+
+FACT_KINDS = ('prices', 'areas', 'bedrooms', 'years', 'phones', 'emails', 'numbers')
+
+# Chroma metadata values must be scalars, so each kind is stored as one string
+METADATA_PREFIX = 'facts_'
+METADATA_SEPARATOR = '|'
+
+_MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'mn': 1_000_000, 'million': 1_000_000}
+
+_NUMBER = r'\d[\d,]*(?:\.\d+)?'
+
+_PRICE_PATTERNS = [
+    re.compile(rf'(?:AED|Dhs?\.?)\s*({_NUMBER})\s*(million|mn|m|thousand|k)?\b', re.IGNORECASE),
+    re.compile(rf'({_NUMBER})\s*(million|mn|m|thousand|k)?\s*(?:AED|Dhs?\b)', re.IGNORECASE),
+]
+_AREA_PATTERN = re.compile(rf'({_NUMBER})\s*(?:sq\.?\s*ft\.?|sqft|square\s+f(?:ee|oo)t)', re.IGNORECASE)
+_BEDROOM_PATTERN = re.compile(r'\b(\d{1,2})\s*[- ]?(?:bed(?:room)?s?|br)\b', re.IGNORECASE)
+_STUDIO_PATTERN = re.compile(r'\bstudios?\b', re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r'\b((?:19|20)\d{2})\b')
+_PHONE_PATTERN = re.compile(r'\+?\d[\d\s\-()]{7,}\d')
+_EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_NUMBER_PATTERN = re.compile(_NUMBER)
+
+
+def _to_number(text: str, unit: Optional[str] = None) -> str:
+    """Normalize '1,200', '1200.0' or '1.2' + 'million' to a canonical string"""
+    value = float(text.replace(',', '').rstrip('.'))
+    if unit:
+        value *= _MULTIPLIERS.get(unit.lower(), 1)
+    return str(int(value)) if value == int(value) else ('%f' % value).rstrip('0')
+
+
+def _normalize_phone(text: str) -> str:
+    """Normalize a phone number to its national digits (drops +971 / 00971 / 0 prefixes)"""
+    digits = re.sub(r'\D', '', text)
+    digits = re.sub(r'^00', '', digits)
+    digits = re.sub(r'^971', '', digits)
+    return digits.lstrip('0')
+
+
+def extract_facts(text: str) -> Dict[str, Set[str]]:
+    """
+    Extract normalized facts from text.
+
+    Returns:
+        Dict of fact kind -> set of normalized values (empty kinds omitted)
+    """
+    facts = {kind: set() for kind in FACT_KINDS}
+
+    for pattern in _PRICE_PATTERNS:
+        for number, unit in pattern.findall(text):
+            facts['prices'].add(_to_number(number, unit))
+    for number in _AREA_PATTERN.findall(text):
+        facts['areas'].add(_to_number(number))
+    for count in _BEDROOM_PATTERN.findall(text):
+        facts['bedrooms'].add(str(int(count)))
+    if _STUDIO_PATTERN.search(text):
+        facts['bedrooms'].add('0')
+    facts['years'].update(_YEAR_PATTERN.findall(text))
+    for phone in _PHONE_PATTERN.findall(text):
+        if len(re.sub(r'\D', '', phone)) >= 9:
+            facts['phones'].add(_normalize_phone(phone))
+    facts['emails'].update(email.lower() for email in _EMAIL_PATTERN.findall(text))
+    facts['numbers'] = _numbers(text)
+
+    return {kind: values for kind, values in facts.items() if values}
+
+
+def _numbers(text: str) -> Set[str]:
+    numbers = set()
+    for number in _NUMBER_PATTERN.findall(text):
+        normalized = _to_number(number)
+        if len(normalized.replace('.', '')) > 2:
+            numbers.add(normalized)
+    return numbers
+
+
+def bare_numbers(text: str) -> Set[str]:
+    """
+    Normalized numbers in text that aren't part of a price, area, phone number or email.
+
+    Those are checked as their own kind, so "AED 1,200,000" shouldn't also
+    be checked as the number 1200000.
+    """
+    spans = [match.span() for pattern in (*_PRICE_PATTERNS, _AREA_PATTERN, _EMAIL_PATTERN) for match in pattern.finditer(text)]
+    spans.extend(
+        match.span() for match in _PHONE_PATTERN.finditer(text)
+        if len(re.sub(r'\D', '', match.group())) >= 9
+    )
+    pieces, position = [], 0
+    for start, end in sorted(spans):
+        if start > position:
+            pieces.append(text[position:start])
+        position = max(position, end)
+    pieces.append(text[position:])
+    return _numbers(' '.join(pieces))
+
+
+def facts_to_metadata(facts: Dict[str, Set[str]]) -> Dict[str, str]:
+    """Flatten extracted facts into Chroma-compatible metadata fields"""
+    return {
+        f'{METADATA_PREFIX}{kind}': METADATA_SEPARATOR.join(sorted(values))
+        for kind, values in facts.items() if values
+    }
+
+
+def facts_from_metadata(metadata: Dict) -> Optional[Dict[str, Set[str]]]:
+    """Read facts back from chunk metadata (None if the chunk predates the index)"""
+    if not metadata or not metadata.get(f'{METADATA_PREFIX}indexed'):
+        return None
+    return {
+        kind: set(metadata[f'{METADATA_PREFIX}{kind}'].split(METADATA_SEPARATOR))
+        for kind in FACT_KINDS if metadata.get(f'{METADATA_PREFIX}{kind}')
+    }
+
+
+def index_metadata(text: str, metadata: Dict = None) -> Dict:
+    """Return chunk metadata with the chunk's facts added (used at ingestion)"""
+    indexed = dict(metadata or {})
+    indexed.update(facts_to_metadata(extract_facts(text)))
+    indexed[f'{METADATA_PREFIX}indexed'] = True
+    return indexed
+
+
+class FactSet:
+    """Facts (and retrieval distances) of the chunks retrieved for one turn"""
+
+    def __init__(self):
+        self.facts = {kind: set() for kind in FACT_KINDS}
+        self.chunks = 0
+        self.distances = []
+
+    def add(self, facts: Dict[str, Iterable[str]]):
+        for kind, values in facts.items():
+            self.facts.setdefault(kind, set()).update(values)
+        self.chunks += 1
+
+    def add_document(self, content: str, metadata: Dict = None):
+        """Add a retrieved chunk's facts (extracting them for chunks indexed before the fact index)"""
+        facts = facts_from_metadata(metadata)
+        self.add(facts if facts is not None else extract_facts(content))
+
+    def merge(self, other: 'FactSet'):
+        """Add the facts and distances collected in another FactSet"""
+        for kind, values in other.facts.items():
+            self.facts.setdefault(kind, set()).update(values)
+        self.chunks += other.chunks
+        self.distances.extend(other.distances)
+
+    def contains(self, kind: str, value: str) -> bool:
+        return value in self.facts.get(kind, ())
+
+    @property
+    def best_distance(self) -> Optional[float]:
+        """Vector distance of the closest retrieved chunk (lower is better)"""
+        return min(self.distances) if self.distances else None
+
+    def __bool__(self):
+        return self.chunks > 0
+
+
+# Facts of the chunks retrieved during the current turn. Set by the caller
+# (e.g. the streaming agent) before its tools run; tasks started afterwards
+# share the same FactSet.
+_retrieved_facts = ContextVar('retrieved_facts', default=None)
+
+
+def start_fact_collection() -> FactSet:
+    """Start collecting the facts of retrieved chunks for this turn"""
+    facts = FactSet()
+    _retrieved_facts.set(facts)
+    return facts
+
+
+def record_retrieved(documents, distances=None):
+    """Add retrieved documents' facts to the current turn's FactSet, if one is active"""
+    facts = _retrieved_facts.get()
+    if facts is None:
+        return
+    for doc in documents:
+        facts.add_document(doc.page_content, doc.metadata)
+    if distances:
+        facts.distances.extend(distances)
+
+
+@contextmanager
+def collecting_facts():
+    """
+    Collect retrieved facts into a separate FactSet while the block runs.
+
+    For work shared by several turns (a coalesced tool call): each turn
+    merges the yielded FactSet into its own with merge_retrieved.
+    """
+    facts = FactSet()
+    token = _retrieved_facts.set(facts)
+    try:
+        yield facts
+    finally:
+        _retrieved_facts.reset(token)
+
+
+def merge_retrieved(facts: FactSet):
+    """Add facts collected elsewhere to the current turn's FactSet, if one is active"""
+    current = _retrieved_facts.get()
+    if current is not None and current is not facts:
+        current.merge(facts)
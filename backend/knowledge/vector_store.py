@@ -5,11 +5,23 @@ Provides a unified interface to ChromaDB for storing and retrieving documents.
 
 import chromadb
 from chromadb.config import Settings
+import asyncio
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from knowledge.fact_index import index_metadata, record_retrieved
 
 # Singleton instance
 _vector_store = None
 
+# ChromaDB queries (and their embedding step) are blocking and CPU-heavy, so async
+# callers go through a small dedicated pool instead of the event loop
+_search_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('VECTOR_STORE_WORKERS', '8')),
+    thread_name_prefix='vector-store'
+)
+
 
 class VectorStore:
     """Wrapper around ChromaDB for knowledge base operations"""
@@ -41,6 +53,9 @@ class VectorStore:
                 metadata={"description": "Knowledge base for One Development"}
             )
         
+        # Rewritten on every write, by any process sharing this store; see generation
+        self._generation_path = os.path.join(self.db_path, 'generation')
+        
         print(f"✅ VectorStore initialized with {self.collection.count()} documents")
     
     def add_texts(self, texts: list, metadatas: list = None):
@@ -49,23 +64,51 @@ class VectorStore:
             return
         
         # Generate unique IDs
-        import uuid
         ids = [str(uuid.uuid4()) for _ in texts]
         
         # Ensure metadatas is the right length
         if metadatas is None:
             metadatas = [{}] * len(texts)
         
+        # Index each chunk's facts once, here, so verification can use set lookups
+        metadatas = [index_metadata(text, metadata) for text, metadata in zip(texts, metadatas)]
+        
         self.collection.add(
             documents=texts,
             metadatas=metadatas,
             ids=ids
         )
+        self._bump_generation()
         
         return ids
-    
+
+    def delete_texts(self, ids: list = None, where: dict = None):
+        """Delete documents by id, or by metadata filter (e.g. {'url': ...})"""
+        if not ids and not where:
+            return
+
+        if ids:
+            self.collection.delete(ids=ids)
+        else:
+            self.collection.delete(where=where)
+        self._bump_generation()
+
+    def update_metadatas(self, ids: list, metadatas: list):
+        """Replace the metadata of existing documents"""
+        if not ids:
+            return
+
+        self.collection.update(ids=ids, metadatas=metadatas)
+        self._bump_generation()
+
     def similarity_search(self, query: str, k: int = 5):
         """Search for similar documents"""
+        documents, distances = self._query(query, k)
+        record_retrieved(documents, distances)
+        return documents
+    
+    def _query(self, query: str, k: int):
+        """Run the Chroma query, returning (documents, distances)"""
         try:
             results = self.collection.query(
                 query_texts=[query],
@@ -85,11 +128,47 @@ class VectorStore:
                     metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
                     documents.append(Document(doc, metadata))
             
-            return documents
+            distances = results['distances'][0] if results.get('distances') else None
+            return documents, distances
             
         except Exception as e:
             print(f"Search error: {str(e)}")
-            return []
+            return [], None
+    
+    async def asimilarity_search(self, query: str, k: int = 5):
+        """Async version of similarity_search, run on the vector store thread pool"""
+        loop = asyncio.get_running_loop()
+        documents, distances = await loop.run_in_executor(_search_executor, self._query, query, k)
+        # The executor thread doesn't see the caller's context, so record the facts here
+        record_retrieved(documents, distances)
+        return documents
+    
+    @property
+    def generation(self) -> str:
+        """
+        Identifier of the knowledge base's current contents.
+        
+        A token persisted next to the Chroma files and replaced on every add,
+        delete or update - by any process using the store, including in-place
+        replacements that leave the document count unchanged - so caches
+        derived from the KB can key on it.
+        """
+        try:
+            with open(self._generation_path) as f:
+                token = f.read().strip()
+        except OSError:
+            token = ''
+        # The count also catches writes that bypassed this class
+        return f"{self.collection.count()}.{token}"
+    
+    def _bump_generation(self):
+        """Persist a new generation token (atomically, so readers never see a partial file)"""
+        token = uuid.uuid4().hex
+        # A temp file per call - threads of one process must not share it
+        temp_path = f"{self._generation_path}.{token}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(token)
+        os.replace(temp_path, self._generation_path)
     
     def get_count(self):
         """Get number of documents in the store"""
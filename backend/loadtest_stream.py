@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Load test for Luna's streaming chat endpoint.
+
+Opens N concurrent SSE streams against /api/chat/stream/ and reports time to
+first event, total stream time and errors. Use it to compare the WSGI (sync)
+and ASGI (ASYNC_CHAT_VIEWS=True) deployments.
+
+Usage:
+    python loadtest_stream.py --url http://localhost:8000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+
+DEFAULT_QUESTIONS = [
+    "Tell me about One Development",
+    "What projects does One Development have in Dubai?",
+    "What are the payment plans for Laguna Residence?",
+    "How is the Dubai property market doing?",
+]
+
+
+async def run_stream(client: httpx.AsyncClient, url: str, question: str) -> dict:
+    """Run one streaming conversation and time it"""
+    started = time.perf_counter()
+    first_event = None
+    events = 0
+    error = None
+
+    try:
+        async with client.stream(
+            'POST',
+            url,
+            json={'message': question, 'session_id': f'loadtest-{uuid.uuid4()}'}
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith('data: '):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - started
+                events += 1
+                event = json.loads(line[6:])
+                if event.get('type') == 'error':
+                    error = event.get('content')
+                if event.get('type') in ('done', 'error'):
+                    break
+    except Exception as e:
+        error = str(e)
+
+    return {
+        'ttfb': first_event,
+        'total': time.perf_counter() - started,
+        'events': events,
+        'error': error,
+    }
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run_load_test(base_url: str, concurrency: int, timeout: float) -> int:
+    url = base_url.rstrip('/') + '/api/chat/stream/'
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    print(f"🚀 Opening {concurrency} concurrent streams to {url}")
+    print("-" * 60)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            run_stream(client, url, DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)])
+            for i in range(concurrency)
+        ])
+        wall = time.perf_counter() - started
+
+    ok = [r for r in results if not r['error']]
+    failed = [r for r in results if r['error']]
+    ttfb = [r['ttfb'] for r in ok if r['ttfb'] is not None]
+    totals = [r['total'] for r in ok]
+
+    print(f"✅ Completed: {len(ok)}/{len(results)} in {wall:.1f}s wall time")
+    if ttfb:
+        print(f"⏱️  Time to first event: p50 {statistics.median(ttfb):.2f}s  "
+              f"p95 {_percentile(ttfb, 0.95):.2f}s  max {max(ttfb):.2f}s")
+    if totals:
+        print(f"⏱️  Stream duration:     p50 {statistics.median(totals):.2f}s  "
+              f"p95 {_percentile(totals, 0.95):.2f}s  max {max(totals):.2f}s")
+    if failed:
+        print(f"❌ Errors: {len(failed)}")
+        for r in failed[:5]:
+            print(f"   - {r['error']}")
+
+    return 0 if not failed else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test Luna streaming chat')
+    parser.add_argument('--url', default='http://localhost:8000', help='Backend base URL')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent streams')
+    parser.add_argument('--timeout', type=float, default=180.0, help='Per-stream timeout (seconds)')
+    args = parser.parse_args()
+
+    return asyncio.run(run_load_test(args.url, args.concurrency, args.timeout))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -618,12 +618,12 @@ const ChatInterface = () => {
               break;
             
             case 'verification':
-              // Handle verification results
-              setCurrentAction({ type: 'verifying', detail: `Confidence: ${(event.confidence * 100).toFixed(0)}%` });
+              // Verification arrives after 'done', once the message is finalized,
+              // so target the message by its id rather than the streaming ref
               flushSync(() => {
                 setMessages(prev =>
                   prev.map(m =>
-                    m.id === streamingMessageIdRef.current
+                    m.id === streamingId
                       ? {
                           ...m,
                           verification: {
@@ -640,12 +640,11 @@ const ChatInterface = () => {
               break;
             
             case 'response_improved':
-              // Response was improved after verification
-              responseRef.current = event.content;
+              // Response was improved after verification (also after 'done')
               flushSync(() => {
                 setMessages(prev =>
                   prev.map(m =>
-                    m.id === streamingMessageIdRef.current
+                    m.id === streamingId
                       ? {
                           ...m,
                           content: event.content,
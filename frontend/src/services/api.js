@@ -30,81 +30,113 @@ export const chatService = {
     }
   },
 
-  // Streaming chat - shows Luna's thinking in real-time
+  // Streaming chat - shows Luna's thinking in real-time.
+  // If the connection drops mid-stream, reconnects with Last-Event-ID so the
+  // server replays the missed events and the same run continues.
   sendMessageStream: (message, sessionId, onEvent) => {
     const baseUrl = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+    const MAX_RECONNECTS = 3;
     
     console.log('[Stream] Starting stream to:', `${baseUrl}/chat/stream/`);
     
     return new Promise((resolve, reject) => {
-      fetch(`${baseUrl}/chat/stream/`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          message,
-          session_id: sessionId,
-        }),
-      }).then(response => {
-        console.log('[Stream] Response received, status:', response.status);
-        
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
+      let lastEventId = null;
+      let reconnects = 0;
+      let eventCount = 0;
+      
+      function reconnectOr(err) {
+        if (lastEventId && reconnects < MAX_RECONNECTS) {
+          reconnects++;
+          console.warn(`[Stream] Connection lost, resuming after ${lastEventId} (attempt ${reconnects})`);
+          setTimeout(connect, 500 * reconnects);
+          return;
+        }
+        reject(err);
+      }
+      
+      function connect() {
+        const headers = { 'Content-Type': 'application/json' };
+        if (lastEventId) {
+          headers['Last-Event-ID'] = lastEventId;
         }
         
-        const reader = response.body.getReader();
-        const decoder = new TextDecoder();
-        let buffer = '';
-        let eventCount = 0;
-        
-        function processStream() {
-          reader.read().then(({ done, value }) => {
-            if (done) {
-              console.log('[Stream] Complete, total events:', eventCount);
-              resolve();
-              return;
-            }
-            
-            buffer += decoder.decode(value, { stream: true });
-            const lines = buffer.split('\n');
-            buffer = lines.pop(); // Keep incomplete line in buffer
-            
-            for (const line of lines) {
-              if (line.startsWith('data: ')) {
-                try {
-                  const data = JSON.parse(line.slice(6));
-                  eventCount++;
-                  
-                  // Log first few events and phase changes
-                  if (eventCount <= 5 || data.type === 'phase' || data.type === 'done') {
-                    console.log(`[Stream] Event ${eventCount}:`, data.type, data.phase || data.token?.substring(0, 20) || '');
-                  }
-                  
-                  onEvent(data);
-                  
-                  if (data.type === 'done') {
-                    console.log('[Stream] Done event received');
-                    resolve(data);
+        fetch(`${baseUrl}/chat/stream/`, {
+          method: 'POST',
+          headers,
+          body: JSON.stringify({
+            message,
+            session_id: sessionId,
+          }),
+        }).then(response => {
+          console.log('[Stream] Response received, status:', response.status);
+          
+          if (!response.ok) {
+            const error = new Error(`HTTP error! status: ${response.status}`);
+            error.status = response.status;
+            throw error;
+          }
+          
+          const reader = response.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = '';
+          
+          function processStream() {
+            reader.read().then(({ done, value }) => {
+              if (done) {
+                console.log('[Stream] Complete, total events:', eventCount);
+                resolve();
+                return;
+              }
+              
+              buffer += decoder.decode(value, { stream: true });
+              const lines = buffer.split('\n');
+              buffer = lines.pop(); // Keep incomplete line in buffer
+              
+              for (const line of lines) {
+                if (line.startsWith('id: ')) {
+                  lastEventId = line.slice(4);
+                } else if (line.startsWith('data: ')) {
+                  try {
+                    const data = JSON.parse(line.slice(6));
+                    eventCount++;
+                    
+                    // Log first few events and phase changes
+                    if (eventCount <= 5 || data.type === 'phase' || data.type === 'done') {
+                      console.log(`[Stream] Event ${eventCount}:`, data.type, data.phase || data.token?.substring(0, 20) || '');
+                    }
+                    
+                    onEvent(data);
+                    
+                    if (data.type === 'done') {
+                      console.log('[Stream] Done event received');
+                      resolve(data);
+                    }
+                  } catch (e) {
+                    console.error('[Stream] Error parsing SSE:', e, line);
                   }
-                } catch (e) {
-                  console.error('[Stream] Error parsing SSE:', e, line);
                 }
               }
-            }
-            
-            processStream();
-          }).catch(err => {
-            console.error('[Stream] Read error:', err);
+              
+              processStream();
+            }).catch(err => {
+              console.error('[Stream] Read error:', err);
+              reconnectOr(err);
+            });
+          }
+          
+          processStream();
+        }).catch(err => {
+          console.error('[Stream] Fetch error:', err);
+          // 4xx (e.g. 410 stream expired) won't get better by retrying
+          if (err.status && err.status < 500) {
             reject(err);
-          });
-        }
-        
-        processStream();
-      }).catch(err => {
-        console.error('[Stream] Fetch error:', err);
-        reject(err);
-      });
+          } else {
+            reconnectOr(err);
+          }
+        });
+      }
+      
+      connect();
     });
   },
 